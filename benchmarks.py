@@ -0,0 +1,459 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for the Canada Selfie frame processing hot paths
+
+Usage:
+    python benchmarks.py                 # run every benchmark
+    python benchmarks.py compositing     # run selected benchmarks
+"""
+
+import random
+import sys
+import time
+
+import cv2
+import numpy as np
+import sentry_sdk
+import sentry_sdk.transport
+
+import canada_selfie_app as app
+
+RESOLUTIONS = [
+    ("480p", 640, 480),
+    ("720p", 1280, 720),
+    ("1080p", 1920, 1080),
+]
+
+
+def time_ms(func, repeat=50, warmup=5):
+    """Return the mean wall time of func() in milliseconds"""
+    for _ in range(warmup):
+        func()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def report(name, before_ms, after_ms):
+    speedup = before_ms / after_ms if after_ms > 0 else float('inf')
+    print(f"  {name:<14} before {before_ms:8.2f} ms   after {after_ms:8.2f} ms   x{speedup:5.1f}")
+
+
+def legacy_composite(frame, mask, bg):
+    """The original float64 blend from BackgroundRemovalWorker.process_frame"""
+    mask_3ch = cv2.cvtColor(mask, cv2.COLOR_GRAY2BGR)
+    fg = frame.astype(float) * (mask_3ch.astype(float) / 255.0)
+    bg = bg.astype(float) * (1.0 - mask_3ch.astype(float) / 255.0)
+    return (fg + bg).astype(np.uint8)
+
+
+def bench_compositing():
+    """Alpha compositing: float64 blend vs AlphaCompositor"""
+    compositor = app.AlphaCompositor()
+    for label, w, h in RESOLUTIONS:
+        frame = np.random.randint(0, 256, (h, w, 3), dtype=np.uint8)
+        bg = np.random.randint(0, 256, (h, w, 3), dtype=np.uint8)
+        mask = np.random.randint(0, 256, (h, w), dtype=np.uint8)
+
+        before = time_ms(lambda: legacy_composite(frame, mask, bg))
+        after = time_ms(lambda: compositor.composite(frame, mask, bg))
+        report(label, before, after)
+
+        diff = np.abs(legacy_composite(frame, mask, bg).astype(int)
+                      - compositor.composite(frame, mask, bg).astype(int)).max()
+        if diff > 1:
+            print(f"[ERROR] {label}: compositor differs from reference by {diff}")
+            sys.exit(1)
+
+
+def legacy_overlay_emoji(frame, emoji, x, y, size):
+    """The original per-call resize and per-channel float blend from overlay_emoji"""
+    emoji_resized = cv2.resize(emoji, (size, size))
+    y1 = max(0, y - size//2)
+    y2 = min(frame.shape[0], y + size//2)
+    x1 = max(0, x - size//2)
+    x2 = min(frame.shape[1], x + size//2)
+    if y2 <= y1 or x2 <= x1:
+        return False
+    emoji_y1 = max(0, size//2 - y)
+    emoji_y2 = emoji_y1 + (y2 - y1)
+    emoji_x1 = max(0, size//2 - x)
+    emoji_x2 = emoji_x1 + (x2 - x1)
+    emoji_crop = emoji_resized[emoji_y1:emoji_y2, emoji_x1:emoji_x2]
+    alpha = emoji_crop[:, :, 3] / 255.0
+    for c in range(3):
+        frame[y1:y2, x1:x2, c] = (1 - alpha) * frame[y1:y2, x1:x2, c] + alpha * emoji_crop[:, :, c]
+    return True
+
+
+def load_icons():
+    icons = {}
+    for name in ["maple_leaf", "snowflake", "hockey", "coffee", "star",
+                 "flag", "beaver", "moose", "smiley"]:
+        icons[name] = cv2.imread(app.resource_path(f"emoji_icons/{name}.png"), cv2.IMREAD_UNCHANGED)
+    return icons
+
+
+# effect -> (sprite, size, sprites drawn per frame), as in apply_effect_overlay
+EFFECT_SPRITES = {
+    "maple_rain": ("maple_leaf", 50, 15),
+    "snow_fall": ("snowflake", 35, 25),
+    "hockey_sticks": ("hockey", 80, 4),
+    "beaver_dam": ("beaver", 60, 5),
+    "flag_frame": ("flag", 70, 4),
+    "tim_hortons": ("coffee", 60, 3),
+    "moose_trail": ("moose", 70, 5),
+    "northern_stars": ("star", 25, 15),
+    "smiley_rain": ("smiley", 40, 20),
+}
+
+
+def bench_sprites():
+    """Per-frame sprite cost of each effect: resize + float blend vs SpriteAtlas"""
+    icons = load_icons()
+    atlas = app.SpriteAtlas(icons, {name: [size] for name, size, _ in EFFECT_SPRITES.values()})
+    frame = np.random.randint(0, 256, (480, 640, 3), dtype=np.uint8)
+    rng = np.random.default_rng(0)
+
+    for effect, (name, size, count) in EFFECT_SPRITES.items():
+        if icons[name] is None:
+            print(f"  {effect:<14} skipped (emoji_icons/{name}.png missing)")
+            continue
+        positions = [(int(x), int(y)) for x, y in zip(rng.integers(0, 640, count),
+                                                       rng.integers(-20, 500, count))]
+
+        def before():
+            for x, y in positions:
+                legacy_overlay_emoji(frame, icons[name], x, y, size)
+
+        def after():
+            for x, y in positions:
+                atlas.blit(frame, name, x, y, size)
+
+        report(effect, time_ms(before), time_ms(after))
+
+
+def bench_particles():
+    """Falling-sprite effects: per-sprite randint loop vs FallingSpriteSystem"""
+    icons = load_icons()
+    atlas = app.SpriteAtlas(icons, {"maple_leaf": [50]})
+    frame = np.random.randint(0, 256, (480, 640, 3), dtype=np.uint8)
+    h, w = frame.shape[:2]
+
+    for count in [15, 100, 300, 500]:
+        counter = [0]
+
+        def before():
+            counter[0] += 1
+            for i in range(count):
+                x = np.random.randint(20, w - 20)
+                y = int((counter[0] * 3 + i * 100) % (h + 100) - 50)
+                atlas.blit(frame, "maple_leaf", x, y, 50)
+
+        system = app.FallingSpriteSystem(["maple_leaf"], [50], count, 3.0, seed=0)
+
+        def after():
+            system.step(w, h)
+            system.draw(frame, atlas)
+
+        report(f"{count} sprites", time_ms(before), time_ms(after))
+
+
+class LegacyFirework:
+    """The original dict-per-particle Firework, kept as the benchmark baseline"""
+
+    def __init__(self, x, y, color):
+        self.x = x
+        self.y = y
+        self.original_y = y
+        self.color = color
+        self.particles = []
+        self.exploded = False
+        self.life = 100
+        self.rise_speed = 8
+        
+        # Create explosion particles
+        for i in range(random.randint(8, 15)):
+            angle = random.uniform(0, 2 * np.pi)
+            speed = random.uniform(2, 8)
+            self.particles.append({
+                'x': x,
+                'y': y,
+                'vx': speed * np.cos(angle),
+                'vy': speed * np.sin(angle),
+                'life': random.randint(30, 60),
+                'size': random.randint(2, 6)
+            })
+    
+    def update(self):
+        if not self.exploded:
+            # Rising phase
+            self.y -= self.rise_speed
+            if self.y <= self.original_y - random.randint(100, 200):
+                self.exploded = True
+        else:
+            # Explosion phase
+            for particle in self.particles:
+                particle['x'] += particle['vx']
+                particle['y'] += particle['vy']
+                particle['vy'] += 0.3  # Gravity
+                particle['life'] -= 1
+                particle['vx'] *= 0.98  # Air resistance
+            
+            # Remove dead particles
+            self.particles = [p for p in self.particles if p['life'] > 0]
+            self.life -= 1
+        
+        return len(self.particles) > 0 and self.life > 0
+    
+    def draw(self, frame):
+        if not self.exploded:
+            # Draw rising firework
+            cv2.circle(frame, (int(self.x), int(self.y)), 3, self.color, -1)
+            # Trail effect
+            for i in range(5):
+                trail_y = int(self.y + i * 5)
+                if trail_y < frame.shape[0]:
+                    alpha = 1.0 - (i * 0.2)
+                    color = tuple(int(c * alpha) for c in self.color)
+                    cv2.circle(frame, (int(self.x), trail_y), 2, color, -1)
+        else:
+            # Draw explosion particles
+            for particle in self.particles:
+                if particle['life'] > 0:
+                    alpha = particle['life'] / 60.0
+                    color = tuple(int(c * alpha) for c in self.color)
+                    cv2.circle(frame, (int(particle['x']), int(particle['y'])), 
+                             particle['size'], color, -1)
+
+
+def bench_fireworks():
+    """Fireworks show, mean frame cost: dict-per-particle Firework vs FireworksSystem"""
+    frames = 300
+    w, h = 640, 480
+    colors = [(0, 0, 255), (255, 255, 255), (255, 215, 0), (0, 255, 255)]
+
+    for scale in [1, 10]:
+        frame = np.zeros((h, w, 3), dtype=np.uint8)
+        random.seed(0)
+
+        def before():
+            fireworks = [LegacyFirework(random.randint(50, w - 50), h - 50, random.choice(colors))
+                         for _ in range(5 * scale)]
+            for _ in range(frames):
+                fireworks = [fw for fw in fireworks if fw.update()]
+                for _ in range(scale):
+                    if random.random() < 0.3:
+                        fireworks.append(LegacyFirework(random.randint(50, w - 50), h - 50,
+                                                        random.choice(colors)))
+                for firework in fireworks:
+                    firework.draw(frame)
+
+        def after():
+            system = app.FireworksSystem(seed=0)
+            palette = np.array(colors)
+            system.launch(np.random.randint(50, w - 50, 5 * scale), h - 50,
+                          palette[np.random.randint(0, len(palette), 5 * scale)], 5 * scale)
+            for _ in range(frames):
+                system.update()
+                count = np.random.binomial(scale, 0.3)
+                if count:
+                    system.launch(np.random.randint(50, w - 50, count), h - 50,
+                                  palette[np.random.randint(0, len(palette), count)], count)
+                system.draw(frame)
+
+        before_ms = time_ms(before, repeat=3, warmup=1) / frames
+        after_ms = time_ms(after, repeat=3, warmup=1) / frames
+        report(f"{scale}x show", before_ms, after_ms)
+
+
+def legacy_red_filter(frame):
+    """The original per-channel float clip from apply_red_filter_to_frame"""
+    frame[:,:,0] = np.clip(frame[:,:,0] * 0.3, 0, 255)
+    frame[:,:,1] = np.clip(frame[:,:,1] * 0.3, 0, 255)
+    frame[:,:,2] = np.clip(frame[:,:,2] * 1.5, 0, 255)
+    return frame
+
+
+def legacy_hockey_filter(frame):
+    """The original apply_hockey_effect_to_frame with a fresh random mask per frame"""
+    frame[:,:,0] = np.clip(frame[:,:,0] * 1.3, 0, 255)
+    frame[:,:,1] = np.clip(frame[:,:,1] * 0.8, 0, 255)
+    frame[:,:,2] = np.clip(frame[:,:,2] * 0.8, 0, 255)
+    mask = np.random.random(frame.shape[:2]) > 0.95
+    frame[mask] = np.clip(frame[mask] * 1.5, 0, 255)
+    return frame
+
+
+def bench_filters():
+    """Colour filters: per-channel float clipping vs ColorFilter LUTs"""
+    filters = app.create_color_filters()
+    for label, w, h in RESOLUTIONS:
+        source = np.random.randint(0, 256, (h, w, 3), dtype=np.uint8)
+        frame = source.copy()
+
+        report(f"red {label}", time_ms(lambda: legacy_red_filter(frame)),
+               time_ms(lambda: filters["red"].apply(frame)))
+        report(f"hockey {label}", time_ms(lambda: legacy_hockey_filter(frame)),
+               time_ms(lambda: filters["hockey"].apply(frame)))
+
+        if not np.array_equal(legacy_red_filter(source.copy()), filters["red"].apply(source.copy())):
+            print(f"[ERROR] {label}: red LUT differs from the reference filter")
+            sys.exit(1)
+
+
+class DiscardTransport(sentry_sdk.transport.Transport):
+    """Sentry transport that drops envelopes, so only in-process cost is measured"""
+
+    def capture_envelope(self, envelope):
+        pass
+
+
+def bench_tracing():
+    """Tracing overhead per frame on an empty 6-stage pipeline: off / aggregate / Sentry sampling"""
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    pipeline = app.FramePipeline([app.FrameStage(name, lambda f: f) for name in
+                                  ["segmentation", "background", "filter", "effect", "fireworks", "stats"]])
+    sentry_sdk.init(dsn="https://public@localhost/1", transport=DiscardTransport,
+                    traces_sample_rate=1.0, profiles_sample_rate=0.0)
+
+    def frame_loop(tracer):
+        def run():
+            with tracer.start_transaction(op="video.frame_update", name="update_frame") as transaction:
+                pipeline.run(frame, 'preview', span=transaction)
+                with transaction.start_child(op="video.convert_display"):
+                    pass
+        return run
+
+    base = time_ms(lambda: pipeline.run(frame, 'preview'), repeat=2000, warmup=50)
+    print(f"  {'untraced':<14} {base:8.3f} ms/frame")
+    for name, tracer in [("off", app.Tracer()),
+                         ("aggregate", app.AggregateTracer(flush_interval=3600)),
+                         ("sentry 1%", app.SentryTracer(0.01)),
+                         ("sentry 100%", app.SentryTracer(1.0))]:
+        ms = time_ms(frame_loop(tracer), repeat=2000, warmup=50)
+        print(f"  {name:<14} {ms:8.3f} ms/frame   overhead {ms - base:+.3f} ms")
+
+
+class _SyntheticInput:
+    name = "input.1"
+    shape = [1, 3, 320, 320]
+
+
+class SyntheticSession:
+    """Stand-in for the u2netp session: a CPU-bound blur cascade instead of the model"""
+
+    def get_inputs(self):
+        return [_SyntheticInput()]
+
+    def run(self, output_names, feed):
+        x = feed["input.1"][0, 0]
+        for _ in range(40):
+            x = cv2.GaussianBlur(x, (9, 9), 0)
+        return [x[None, None]]
+
+
+def bench_render_scaling():
+    """Offline render throughput: sequential OfflineRenderer vs ParallelRenderer with N processes"""
+    import os
+    import shutil
+    import tempfile
+
+    frames = 90
+    workdir = tempfile.mkdtemp(prefix="canada_bench_")
+    try:
+        source = os.path.join(workdir, "input.avi")
+        writer = cv2.VideoWriter(source, cv2.VideoWriter_fourcc(*"MJPG"), 30, (640, 480))
+        for i in range(frames):
+            writer.write(np.random.randint(0, 256, (480, 640, 3), dtype=np.uint8))
+        writer.release()
+        options = dict(effect="maple_rain", color_filter="red", background="maple")
+
+        start = time.perf_counter()
+        app.OfflineRenderer(session=SyntheticSession(), seed=0, **options).render(
+            source, os.path.join(workdir, "sequential.avi"), codec="MJPG")
+        base_fps = frames / (time.perf_counter() - start)
+        print(f"  {'sequential':<14} {base_fps:6.1f} fps")
+
+        cores = os.cpu_count() or 1
+        counts = sorted({1, 2} | {n for n in (4, 8, 16) if n <= cores} | {cores})
+        for workers in counts:
+            renderer = app.ParallelRenderer(workers=workers, session_factory=SyntheticSession, **options)
+            start = time.perf_counter()
+            renderer.render(source, os.path.join(workdir, f"parallel_{workers}.avi"), codec="MJPG")
+            fps = frames / (time.perf_counter() - start)
+            print(f"  {f'{workers} workers':<14} {fps:6.1f} fps   x{fps / base_fps:4.2f}   ({cores} CPUs)")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def bench_segmentation_pipeline():
+    """Segmentation throughput and latency: one frame at a time vs the 3-stage pipeline"""
+    import threading
+
+    frame = np.random.randint(0, 256, (720, 1280, 3), dtype=np.uint8)
+    frames = 120
+    engine = app.SegmentationEngine(SyntheticSession())
+    for _ in range(5):
+        engine.predict_mask(frame)
+
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(frames):
+        t0 = time.perf_counter()
+        engine.predict_mask(frame)
+        latencies.append((time.perf_counter() - t0) * 1000)
+    fps = frames / (time.perf_counter() - start)
+    print(f"  {'sequential':<14} {fps:6.1f} fps   latency p50 {np.percentile(latencies, 50):6.2f} ms")
+
+    for in_flight in (1, 2, 3):
+        latencies = []
+        free = threading.Semaphore(in_flight)
+
+        def on_result(mask):
+            latencies.append(pipeline.last_latency_ms)
+            free.release()
+
+        pipeline = app.SegmentationPipeline(engine, on_result, in_flight=in_flight, drop_policy='drop-newest')
+        pipeline.start()
+        start = time.perf_counter()
+        # Submit a frame whenever a slot frees up
+        for _ in range(frames):
+            free.acquire()
+            pipeline.submit(frame)
+        for _ in range(in_flight):
+            free.acquire()
+        fps = frames / (time.perf_counter() - start)
+        pipeline.stop()
+        print(f"  {f'{in_flight} in flight':<14} {fps:6.1f} fps   latency p50 {np.percentile(latencies, 50):6.2f} ms")
+
+
+BENCHMARKS = {
+    "compositing": bench_compositing,
+    "sprites": bench_sprites,
+    "particles": bench_particles,
+    "fireworks": bench_fireworks,
+    "filters": bench_filters,
+    "tracing": bench_tracing,
+    "render": bench_render_scaling,
+    "segpipeline": bench_segmentation_pipeline,
+}
+
+
+def main():
+    names = sys.argv[1:] or list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        print(f"[ERROR] Unknown benchmarks: {unknown} (available: {list(BENCHMARKS)})")
+        sys.exit(1)
+
+    for name in names:
+        print(f"\n{name}: {BENCHMARKS[name].__doc__}")
+        BENCHMARKS[name]()
+
+    print("\n[OK] Benchmarks finished")
+
+
+if __name__ == "__main__":
+    main()
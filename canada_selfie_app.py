@@ -4,29 +4,38 @@ Canada Selfie Webcam App
 A PyQt5 application with webcam functionality and Canadian theme
 """
 
+import time
+_LAUNCH_TIME = time.perf_counter()  # Start of the startup report's clock
+
 import sys
 import os
 import logging
+import importlib
+import importlib.util
+from contextlib import contextmanager
 from datetime import datetime
 import platform
-import sentry_sdk
-from sentry_sdk.integrations.logging import LoggingIntegration
 
 # Suppress OpenCV warnings
 os.environ['OPENCV_LOG_LEVEL'] = 'ERROR'
 
-# Setup logging
-def setup_logging():
-    """Setup logging configuration with platform-specific log paths"""
+def app_data_dir():
+    """Platform-specific directory for logs and other app files (created if missing)"""
     if platform.system() == 'Windows':
         # Use AppData on Windows
-        log_dir = os.path.join(os.environ.get('APPDATA', ''), 'CanadaSelfieApp')
+        data_dir = os.path.join(os.environ.get('APPDATA', ''), 'CanadaSelfieApp')
     else:
         # Use home directory on other platforms
-        log_dir = os.path.join(os.path.expanduser('~'), '.canada_selfie')
+        data_dir = os.path.join(os.path.expanduser('~'), '.canada_selfie')
     
     # Create directory if it doesn't exist
-    os.makedirs(log_dir, exist_ok=True)
+    os.makedirs(data_dir, exist_ok=True)
+    return data_dir
+
+# Setup logging
+def setup_logging():
+    """Setup logging configuration with platform-specific log paths"""
+    log_dir = app_data_dir()
     
     # Log file with timestamp
     log_file = os.path.join(log_dir, f'canada_selfie_{datetime.now().strftime("%Y%m%d_%H%M%S")}.log')
@@ -63,6 +72,66 @@ def setup_logging():
 # Initialize logging
 logger = setup_logging()
 
+class StartupReport:
+    """Measured cost of each launch stage, in milliseconds since the module started loading.
+
+    imports() times a group of imports (like python -X importtime, but
+    only for the heavy packages); mark() records the first time a
+    milestone (window shown, first preview frame, ...) is reached.
+    """
+    TARGET_FIRST_FRAME_MS = 1000
+
+    def __init__(self, start):
+        self.start = start
+        self.imports = {}
+        self.milestones = {}
+
+    @contextmanager
+    def measure_import(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            # The first import of a package is the one that costs anything
+            self.imports.setdefault(name, round((time.perf_counter() - start) * 1000, 1))
+
+    def mark(self, name):
+        if name not in self.milestones:
+            self.milestones[name] = round((time.perf_counter() - self.start) * 1000, 1)
+
+    def summary(self):
+        return {'imports_ms': dict(self.imports), 'milestones_ms': dict(self.milestones),
+                'target_first_frame_ms': self.TARGET_FIRST_FRAME_MS}
+
+    def format(self):
+        lines = ["Startup report (ms since launch):"]
+        lines += [f"  import {name:<22} {ms:8.1f}" for name, ms in self.imports.items()]
+        lines += [f"  {name:<29} {ms:8.1f}" for name, ms in self.milestones.items()]
+        return "\n".join(lines)
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.summary(), f, indent=2)
+
+STARTUP = StartupReport(_LAUNCH_TIME)
+
+class LazyModule:
+    """Imports a module on first attribute access, so its import cost leaves the startup path"""
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            # import_module holds the import lock, so threads racing here import it once
+            with STARTUP.measure_import(self._name):
+                self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+# Only used for error reports and sampled traces; initialized after the window is up
+sentry_sdk = LazyModule('sentry_sdk')
+
 def resource_path(relative_path):
     """Get absolute path to resource, works for dev and for PyInstaller"""
     try:
@@ -73,231 +142,1412 @@ def resource_path(relative_path):
     
     return os.path.join(base_path, relative_path)
 
-import cv2
-import numpy as np
-from PyQt5.QtWidgets import (QApplication, QMainWindow, QVBoxLayout, QHBoxLayout, 
-                           QWidget, QPushButton, QLabel, QFrame, QMessageBox, 
-                           QSlider, QComboBox, QGroupBox, QGridLayout, QProgressDialog)
-from PyQt5.QtCore import QTimer, Qt, pyqtSignal, QUrl, QThread, pyqtSlot
-from PyQt5.QtGui import QImage, QPixmap, QFont, QPalette, QColor, QIcon
+with STARTUP.measure_import('numpy'):
+    import numpy as np
+with STARTUP.measure_import('cv2'):
+    import cv2
+with STARTUP.measure_import('PyQt5'):
+    from PyQt5.QtWidgets import (QApplication, QMainWindow, QVBoxLayout, QHBoxLayout, 
+                               QWidget, QPushButton, QLabel, QFrame, QMessageBox, 
+                               QSlider, QComboBox, QGroupBox, QGridLayout, QProgressDialog)
+    from PyQt5.QtCore import QTimer, Qt, pyqtSignal, QUrl, QThread, QObject, pyqtSlot, QRect
+    from PyQt5.QtGui import QImage, QFont, QPalette, QColor, QIcon, QPainter
 import random
+import re
 import threading
 import queue
 from concurrent.futures import ThreadPoolExecutor
-import time
+import json
+from collections import OrderedDict, deque
 from pathlib import Path
-try:
-    logger.info("Attempting to import rembg...")
-    logger.info(f"sys.executable: {sys.executable}")
-    logger.info(f"sys.prefix: {sys.prefix}")
-    if hasattr(sys, '_MEIPASS'):
-        logger.info(f"PyInstaller _MEIPASS: {sys._MEIPASS}")
-    
-    # Try importing onnxruntime first to get better error messages
-    try:
-        logger.info("Testing onnxruntime import...")
-        import onnxruntime
-        logger.info(f"✅ onnxruntime version: {onnxruntime.__version__}")
-    except Exception as e:
-        logger.error(f"❌ onnxruntime import failed: {e}")
-        raise
-    
-    import rembg
-    from rembg import remove, new_session
-    REMBG_AVAILABLE = True
-    logger.info("✅ rembg imported successfully")
-    
-    # For PyInstaller builds, set custom model path to user's home directory
-    if hasattr(sys, '_MEIPASS'):
-        # Use home directory for downloaded models (writable location)
-        u2net_path = str(Path.home() / '.u2net')
-        os.environ['U2NET_HOME'] = u2net_path
-        logger.info(f"PyInstaller detected, setting U2NET_HOME to: {u2net_path}")
-    else:
-        logger.info(f"Development mode, U2NET_HOME: {os.environ.get('U2NET_HOME', 'Not set')}")
-        
-except ImportError as e:
-    REMBG_AVAILABLE = False
-    logger.error(f"❌ rembg import failed: {e}")
-    logger.exception("Full traceback:")
-    # Silent - no warning printed
-
-class Firework:
-    def __init__(self, x, y, color):
-        self.x = x
-        self.y = y
-        self.original_y = y
-        self.color = color
-        self.particles = []
-        self.exploded = False
-        self.life = 100
-        self.rise_speed = 8
-        
-        # Create explosion particles
-        for i in range(random.randint(8, 15)):
-            angle = random.uniform(0, 2 * np.pi)
-            speed = random.uniform(2, 8)
-            self.particles.append({
-                'x': x,
-                'y': y,
-                'vx': speed * np.cos(angle),
-                'vy': speed * np.sin(angle),
-                'life': random.randint(30, 60),
-                'size': random.randint(2, 6)
-            })
-    
+
+# The segmentation stack (onnxruntime; rembg only for models outside
+# MODEL_REGISTRY, as it pulls in scipy, numba and pymatting) is imported on a
+# worker thread after the window is up. Here we only check that it is installed.
+REMBG_AVAILABLE = all(importlib.util.find_spec(name) is not None for name in ('onnxruntime', 'rembg'))
+_segmentation_import_lock = threading.Lock()
+_segmentation_imported = False
+
+# For PyInstaller builds, set custom model path to user's home directory
+if hasattr(sys, '_MEIPASS'):
+    # Use home directory for downloaded models (writable location)
+    u2net_path = str(Path.home() / '.u2net')
+    os.environ['U2NET_HOME'] = u2net_path
+    logger.info(f"PyInstaller detected, setting U2NET_HOME to: {u2net_path}")
+else:
+    logger.info(f"Development mode, U2NET_HOME: {os.environ.get('U2NET_HOME', 'Not set')}")
+
+def import_segmentation_stack():
+    """Import onnxruntime (once, from any thread); returns False if it cannot be loaded"""
+    global REMBG_AVAILABLE, _segmentation_imported
+    with _segmentation_import_lock:
+        if _segmentation_imported or not REMBG_AVAILABLE:
+            return REMBG_AVAILABLE
+        try:
+            logger.info("Importing onnxruntime...")
+            logger.info(f"sys.executable: {sys.executable}")
+            if hasattr(sys, '_MEIPASS'):
+                logger.info(f"PyInstaller _MEIPASS: {sys._MEIPASS}")
+            with STARTUP.measure_import('onnxruntime'):
+                import onnxruntime
+            logger.info(f"✅ onnxruntime version: {onnxruntime.__version__}")
+            _segmentation_imported = True
+        except Exception as e:
+            REMBG_AVAILABLE = False
+            logger.error(f"❌ onnxruntime import failed: {e}")
+            logger.exception("Full traceback:")
+        return REMBG_AVAILABLE
+
+STARTUP.mark('module_imports')
+
+class FrameStage:
+    """One step of a FramePipeline.
+
+    func(frame) modifies the frame in place and returns it. enabled() is
+    checked every run, and modes limits the stage to some pipeline modes
+    (e.g. only 'preview' or only 'capture').
+    """
+
+    def __init__(self, name, func, enabled=None, modes=None, op=None):
+        self.name = name
+        self.func = func
+        self.enabled = enabled or (lambda: True)
+        self.modes = set(modes) if modes else None
+        self.op = op or f"video.{name}"
+
+    def runs_in(self, mode):
+        return self.modes is None or mode in self.modes
+
+class FramePipeline:
+    """Ordered list of frame stages that share preallocated frame buffers.
+
+    The camera frame is (optionally mirrored and) copied once into one of
+    the pipeline's buffers, and every stage then works on it in place.
+    Buffers rotate between runs so the previous result stays valid while
+    the next frame is being processed. The durations of the stages that ran
+    in the last run are kept in timings (milliseconds).
+    """
+
+    def __init__(self, stages, mirror=True, buffers=2):
+        self.stages = list(stages)
+        self.mirror = mirror
+        self._buffers = [None] * buffers
+        self._next_buffer = 0
+        self.timings = {}
+
+    def _buffer_for(self, frame):
+        index = self._next_buffer
+        self._next_buffer = (index + 1) % len(self._buffers)
+        buffer = self._buffers[index]
+        if buffer is None or buffer.shape != frame.shape:
+            buffer = np.empty_like(frame)
+            self._buffers[index] = buffer
+        return buffer
+
+    def run(self, source, mode='preview', span=None):
+        """Process a camera frame and return the pipeline-owned result.
+
+        span may be a Sentry span; every stage then gets a child span.
+        """
+        timings = {}
+        start = time.perf_counter()
+        frame = self._buffer_for(source)
+        if self.mirror:
+            # Flip frame horizontally for selfie effect
+            cv2.flip(source, 1, dst=frame)
+        else:
+            np.copyto(frame, source)
+        timings['input'] = (time.perf_counter() - start) * 1000
+
+        for stage in self.stages:
+            if not stage.runs_in(mode) or not stage.enabled():
+                continue
+            start = time.perf_counter()
+            if span is not None:
+                with span.start_child(op=stage.op):
+                    frame = stage.func(frame)
+            else:
+                frame = stage.func(frame)
+            timings[stage.name] = (time.perf_counter() - start) * 1000
+        self.timings = timings
+        return frame
+
+class ColorFilter:
+    """Colour filter declared as per-channel curves and applied with cv2.LUT.
+
+    Each curve is either a gain or a callable mapping the 0-255 input levels
+    to output levels; the result is baked into one 256-entry BGR table.
+    Optional sparkle brightens a fixed fraction of pixels through a second
+    table, using a cached noise texture instead of fresh random numbers.
+    """
+    NOISE_TILE = 256
+
+    def __init__(self, blue=1.0, green=1.0, red=1.0, sparkle=None, seed=None):
+        self.lut = self._build_lut((blue, green, red))
+        self.sparkle_lut = None
+        self.sparkle_fraction = 0.0
+        if sparkle:
+            # sparkle = (fraction of pixels, extra gain on top of the curves)
+            self.sparkle_fraction, gain = sparkle
+            boosted = np.clip(self.lut.astype(np.float32) * gain, 0, 255)
+            self.sparkle_lut = boosted.astype(np.uint8)
+        self.rng = np.random.default_rng(seed)
+        self._noise = None
+        self._buffer = None
+
+    @staticmethod
+    def _build_lut(curves):
+        levels = np.arange(256, dtype=np.float32)
+        channels = []
+        for curve in curves:
+            values = curve(levels) if callable(curve) else levels * curve
+            channels.append(np.clip(values, 0, 255).astype(np.uint8))
+        return np.dstack(channels).reshape(256, 1, 3)
+
+    def _sparkle_mask(self, h, w):
+        """Random-looking mask taken at a random offset into a cached noise texture"""
+        if self._noise is None or self._noise.shape[0] < h + self.NOISE_TILE or self._noise.shape[1] < w + self.NOISE_TILE:
+            tile = (self.rng.random((self.NOISE_TILE, self.NOISE_TILE)) < self.sparkle_fraction).astype(np.uint8)
+            reps_y = -(-h // self.NOISE_TILE) + 1
+            reps_x = -(-w // self.NOISE_TILE) + 1
+            self._noise = np.tile(tile, (reps_y, reps_x))
+        oy, ox = self.rng.integers(0, self.NOISE_TILE, 2)
+        return self._noise[oy:oy + h, ox:ox + w]
+
+    def skip_frames(self, count, h, w):
+        """Draw the sparkle offsets of count frames without filtering them"""
+        if self.sparkle_lut is not None:
+            for _ in range(count):
+                self._sparkle_mask(h, w)
+
+    def apply(self, frame):
+        """Filter the frame in place and return it"""
+        if self.sparkle_lut is not None:
+            if self._buffer is None or self._buffer.shape != frame.shape:
+                self._buffer = np.empty_like(frame)
+            cv2.LUT(frame, self.sparkle_lut, dst=self._buffer)
+            cv2.LUT(frame, self.lut, dst=frame)
+            cv2.copyTo(self._buffer, self._sparkle_mask(*frame.shape[:2]), frame)
+        else:
+            cv2.LUT(frame, self.lut, dst=frame)
+        return frame
+
+def create_color_filters(seed=None):
+    """The app's colour filters, declared as channel curves"""
+    return {
+        # Increase red channel, decrease others
+        "red": ColorFilter(blue=0.3, green=0.3, red=1.5),
+        # Blue tint with "ice" sparkle on 5% of pixels
+        "hockey": ColorFilter(blue=1.3, green=0.8, red=0.8, sparkle=(0.05, 1.5), seed=seed),
+    }
+
+class _ParallelArrays:
+    """Parallel NumPy arrays with spare capacity at the end.
+
+    Appending writes into the spare rows (the capacity doubles when it runs
+    out) and keep() compacts in place, so neither allocates per frame.
+    Indexing by field name returns a view of the rows in use.
+    """
+
+    def __init__(self, fields, capacity=64):
+        # fields: {name: (dtype, shape of one entry)}
+        self.count = 0
+        self.arrays = {name: np.zeros((capacity,) + shape, dtype) for name, (dtype, shape) in fields.items()}
+
+    def __getitem__(self, name):
+        return self.arrays[name][:self.count]
+
+    def __len__(self):
+        return self.count
+
+    def append(self, count, **values):
+        """Add count entries; each value is broadcast to count rows"""
+        end = self.count + count
+        capacity = len(next(iter(self.arrays.values())))
+        if end > capacity:
+            capacity = max(2 * capacity, end)
+            for name, array in self.arrays.items():
+                grown = np.zeros((capacity,) + array.shape[1:], array.dtype)
+                grown[:self.count] = array[:self.count]
+                self.arrays[name] = grown
+        for name, value in values.items():
+            self.arrays[name][self.count:end] = value
+        self.count = end
+
+    def keep(self, mask):
+        """Drop the entries where mask is False, keeping the others in order"""
+        kept = int(np.count_nonzero(mask))
+        for array in self.arrays.values():
+            array[:kept] = array[:self.count][mask]
+        self.count = kept
+
+class FireworksSystem:
+    """Fireworks simulated as structure-of-arrays across every rocket.
+
+    Rockets and explosion particles each live in parallel NumPy arrays, so
+    a frame costs a fixed number of vectorized operations no matter how many
+    rockets are in the air. The arrays keep spare capacity, so launches and
+    explosions write in place; burnt-out particles are skipped while drawing
+    and only compacted away once enough of them pile up. Drawing culls
+    off-screen particles and computes every faded colour in NumPy, leaving
+    only the cv2.circle calls per particle.
+    """
+    GRAVITY = 0.3
+    AIR_RESISTANCE = 0.98
+    RISE_SPEED = 8
+    TRAIL_LENGTH = 5
+    COMPACT_AT = 256  # Dead particles tolerated before they are compacted away
+
+    def __init__(self, seed=None):
+        self.rng = np.random.default_rng(seed)
+        self.clear()
+
+    def clear(self):
+        """Remove every rocket and particle"""
+        vector = (np.float32, ())
+        self.rockets = _ParallelArrays({'x': vector, 'y': vector, 'burst_y': vector,
+                                        'color': (np.float32, (3,))}, capacity=16)
+        # Explosion particles; dead ones (life <= 0) stay until the next compaction
+        self.particles = _ParallelArrays({'x': vector, 'y': vector, 'vx': vector, 'vy': vector,
+                                          'life': vector, 'size': (np.int32, ()),
+                                          'color': (np.float32, (3,))}, capacity=256)
+
+    def __len__(self):
+        """Number of rockets and particles still alive"""
+        return len(self.rockets) + int(np.count_nonzero(self.particles['life'] > 0))
+
+    def launch(self, x, y, color, count=1):
+        """Launch count rockets from (x, y); x may be an array of positions"""
+        burst_y = y - self.rng.integers(100, 200, count, endpoint=True)
+        self.rockets.append(count, x=x, y=y, burst_y=burst_y, color=color)
+
+    def _explode(self, x, y, colors):
+        """Spawn 8-15 particles for each exploding rocket"""
+        per_rocket = self.rng.integers(8, 15, len(x), endpoint=True)
+        total = int(per_rocket.sum())
+        angle = self.rng.uniform(0, 2 * np.pi, total)
+        speed = self.rng.uniform(2, 8, total)
+        self.particles.append(total,
+                              x=np.repeat(x, per_rocket),
+                              y=np.repeat(y, per_rocket),
+                              vx=speed * np.cos(angle),
+                              vy=speed * np.sin(angle),
+                              life=self.rng.integers(30, 60, total, endpoint=True),
+                              size=self.rng.integers(2, 6, total, endpoint=True),
+                              color=np.repeat(colors, per_rocket, axis=0))
+
     def update(self):
-        if not self.exploded:
-            # Rising phase
-            self.y -= self.rise_speed
-            if self.y <= self.original_y - random.randint(100, 200):
-                self.exploded = True
+        """Advance rockets and particles by one frame"""
+        # Rising phase
+        rockets = self.rockets
+        rocket_y = rockets['y']
+        rocket_y -= self.RISE_SPEED
+        burst = rocket_y <= rockets['burst_y']
+        if burst.any():
+            self._explode(rockets['x'][burst], rocket_y[burst], rockets['color'][burst])
+            rockets.keep(~burst)
+
+        # Explosion phase
+        particles = self.particles
+        if not len(particles):
+            return
+        x, y, vx, vy, life = (particles[name] for name in ('x', 'y', 'vx', 'vy', 'life'))
+        x += vx
+        y += vy
+        vy += self.GRAVITY
+        vx *= self.AIR_RESISTANCE
+        life -= 1
+
+        # Compact burnt-out particles in batches rather than every frame
+        alive = life > 0
+        dead = len(particles) - int(np.count_nonzero(alive))
+        if dead == len(particles):
+            particles.count = 0
+        elif dead >= self.COMPACT_AT:
+            particles.keep(alive)
+
+    def _draw_circles(self, frame, x, y, radius, colors, alive=None):
+        """Draw filled circles; culling and colour math are done up front in NumPy"""
+        h, w = frame.shape[:2]
+        xs = x.astype(np.int32)
+        ys = y.astype(np.int32)
+        radius = np.broadcast_to(np.asarray(radius, dtype=np.int32), xs.shape)
+        visible = (xs + radius >= 0) & (xs - radius < w) & (ys + radius >= 0) & (ys - radius < h)
+        if alive is not None:
+            visible &= alive
+        for cx, cy, r, color in zip(xs[visible].tolist(), ys[visible].tolist(),
+                                    radius[visible].tolist(),
+                                    colors[visible].astype(np.int32).tolist()):
+            cv2.circle(frame, (cx, cy), r, color, -1)
+
+    def draw(self, frame):
+        """Draw rockets with their fading trails, then every particle"""
+        rockets = self.rockets
+        if len(rockets):
+            x, y, color = rockets['x'], rockets['y'], rockets['color']
+            # Trail effect, faintest first so the rocket heads end on top; one batch for all of it
+            steps = np.arange(self.TRAIL_LENGTH - 1, -1, -1)
+            fades = (1.0 - steps * 0.2).astype(np.float32)
+            self._draw_circles(frame,
+                               np.tile(x, self.TRAIL_LENGTH + 1),
+                               np.concatenate([(y + steps[:, None].astype(np.float32) * 5).ravel(), y]),
+                               np.repeat(np.array([2] * self.TRAIL_LENGTH + [3], np.int32), len(x)),
+                               np.concatenate([(color * fades[:, None, None]).reshape(-1, 3), color]))
+
+        particles = self.particles
+        if len(particles):
+            life = particles['life']
+            colors = particles['color'] * (life / 60.0)[:, None]
+            self._draw_circles(frame, particles['x'], particles['y'], particles['size'], colors, alive=life > 0)
+
+class SpriteAtlas:
+    """Emoji sprites pre-rendered at every size the effects draw them.
+
+    Each sprite is stored premultiplied as uint8 colour plus an inverse
+    alpha plane, so a blit is one saturating multiply and one add on the
+    frame region: dst = colour * alpha + dst * (1 - alpha).
+    """
+
+    def __init__(self, icons, sizes=None):
+        self.icons = icons
+        self._sprites = {}
+        for name, name_sizes in (sizes or {}).items():
+            for size in name_sizes:
+                self.get(name, size)
+
+    def _render(self, icon, size):
+        if icon.ndim == 2:
+            icon = cv2.cvtColor(icon, cv2.COLOR_GRAY2BGR)
+        if icon.shape[2] == 4:
+            # Premultiply before resizing so edges filter correctly
+            alpha = icon[:, :, 3:4].astype(np.float32) / 255.0
+            premultiplied = np.dstack([icon[:, :, :3] * alpha, alpha * 255.0])
         else:
-            # Explosion phase
-            for particle in self.particles:
-                particle['x'] += particle['vx']
-                particle['y'] += particle['vy']
-                particle['vy'] += 0.3  # Gravity
-                particle['life'] -= 1
-                particle['vx'] *= 0.98  # Air resistance
-            
-            # Remove dead particles
-            self.particles = [p for p in self.particles if p['life'] > 0]
-            self.life -= 1
+            premultiplied = np.dstack([icon[:, :, :3].astype(np.float32),
+                                       np.full(icon.shape[:2], 255.0, np.float32)])
+        shrinking = icon.shape[0] > size or icon.shape[1] > size
+        interpolation = cv2.INTER_AREA if shrinking else cv2.INTER_LINEAR
+        resized = cv2.resize(premultiplied, (size, size), interpolation=interpolation)
+        resized = np.clip(resized + 0.5, 0, 255).astype(np.uint8)
+        colour = np.ascontiguousarray(resized[:, :, :3])
+        inverse_alpha = cv2.cvtColor(255 - resized[:, :, 3], cv2.COLOR_GRAY2BGR)
+        return colour, inverse_alpha
+
+    def get(self, name, size):
+        """Return (premultiplied colour, inverse alpha) or None if the icon is missing"""
+        key = (name, size)
+        if key not in self._sprites:
+            icon = self.icons.get(name)
+            self._sprites[key] = self._render(icon, size) if icon is not None else None
+        return self._sprites[key]
+
+    def blit(self, frame, name, x, y, size):
+        """Draw the sprite centred on (x, y), clipped to the frame"""
+        sprite = self.get(name, size)
+        if sprite is None:
+            return False
+        colour, inverse_alpha = sprite
+
+        left = x - size // 2
+        top = y - size // 2
+        x1 = max(0, left)
+        y1 = max(0, top)
+        x2 = min(frame.shape[1], left + size)
+        y2 = min(frame.shape[0], top + size)
         
-        return len(self.particles) > 0 and self.life > 0
-    
-    def draw(self, frame):
-        if not self.exploded:
-            # Draw rising firework
-            cv2.circle(frame, (int(self.x), int(self.y)), 3, self.color, -1)
-            # Trail effect
-            for i in range(5):
-                trail_y = int(self.y + i * 5)
-                if trail_y < frame.shape[0]:
-                    alpha = 1.0 - (i * 0.2)
-                    color = tuple(int(c * alpha) for c in self.color)
-                    cv2.circle(frame, (int(self.x), trail_y), 2, color, -1)
+        # Skip if completely out of bounds
+        if y2 <= y1 or x2 <= x1:
+            return False
+
+        sy = slice(y1 - top, y2 - top)
+        sx = slice(x1 - left, x2 - left)
+        roi = frame[y1:y2, x1:x2]
+        cv2.multiply(roi, inverse_alpha[sy, sx], dst=roi, scale=1.0 / 255.0)
+        cv2.add(roi, colour[sy, sx], dst=roi)
+        return True
+
+    def blit_batch(self, frame, name, size, xs, ys):
+        """Draw one sprite centred on every (xs[i], ys[i]); clipping is vectorized"""
+        sprite = self.get(name, size)
+        if sprite is None:
+            return False
+        colour, inverse_alpha = sprite
+
+        left = np.asarray(xs, dtype=np.int32) - size // 2
+        top = np.asarray(ys, dtype=np.int32) - size // 2
+        x1 = np.maximum(left, 0)
+        y1 = np.maximum(top, 0)
+        x2 = np.minimum(left + size, frame.shape[1])
+        y2 = np.minimum(top + size, frame.shape[0])
+        visible = (x2 > x1) & (y2 > y1)
+
+        columns = (left, top, x1, y1, x2, y2)
+        for l, t, a, b, c, d in zip(*(column[visible].tolist() for column in columns)):
+            roi = frame[b:d, a:c]
+            cv2.multiply(roi, inverse_alpha[b - t:d - t, a - l:c - l], dst=roi, scale=1.0 / 255.0)
+            cv2.add(roi, colour[b - t:d - t, a - l:c - l], dst=roi)
+        return True
+
+class FallingSpriteSystem:
+    """Particle system for the falling-sprite effects.
+
+    Every particle lives in one structured NumPy array and the whole set is
+    advanced with a handful of vectorized operations per frame. Particles
+    keep their x position while falling and only pick a new one when they
+    wrap back to the top of the frame.
+    """
+    PARTICLE_DTYPE = np.dtype([
+        ('x', np.float32),
+        ('y', np.float32),
+        ('vx', np.float32),
+        ('vy', np.float32),
+        ('size', np.int16),
+        ('sprite', np.int16),
+    ])
+
+    def __init__(self, sprites, sizes, count, speed, drift=0.4, seed=None):
+        self.sprites = list(sprites)
+        self.sizes = np.asarray(sizes, dtype=np.int16)
+        self.speed = speed
+        self.drift = drift
+        self.rng = np.random.default_rng(seed)
+        self.particles = np.zeros(0, dtype=self.PARTICLE_DTYPE)
+        self.frame_size = None
+        self.base_count = count
+        self.target_count = count
+
+    def _spawn(self, count, width, height):
+        new = np.zeros(count, dtype=self.PARTICLE_DTYPE)
+        new['x'] = self.rng.uniform(0, width, count)
+        # Spread the first wave over the whole frame height
+        new['y'] = self.rng.uniform(-50, height + 50, count)
+        new['vx'] = self.rng.uniform(-self.drift, self.drift, count)
+        new['vy'] = self.speed * self.rng.uniform(0.8, 1.2, count)
+        new['size'] = self.rng.choice(self.sizes, count)
+        new['sprite'] = self.rng.integers(0, len(self.sprites), count)
+        return new
+
+    def set_count(self, count):
+        """Grow or shrink the particle population"""
+        self.target_count = max(0, int(count))
+
+    def step(self, width, height):
+        """Advance all particles by one frame"""
+        if self.frame_size != (width, height):
+            # New camera resolution - start over with a fresh population
+            self.frame_size = (width, height)
+            self.particles = self._spawn(self.target_count, width, height)
+        elif len(self.particles) != self.target_count:
+            if len(self.particles) > self.target_count:
+                self.particles = self.particles[:self.target_count]
+            else:
+                extra = self._spawn(self.target_count - len(self.particles), width, height)
+                self.particles = np.concatenate([self.particles, extra])
+
+        p = self.particles
+        p['x'] += p['vx']
+        p['y'] += p['vy']
+        np.mod(p['x'], width, out=p['x'])
+
+        # Recycle particles that fell out of the frame
+        gone = p['y'] - p['size'] > height
+        count = int(np.count_nonzero(gone))
+        if count:
+            p['y'][gone] = -p['size'][gone]
+            p['x'][gone] = self.rng.uniform(0, width, count)
+
+    def draw(self, frame, atlas, fallback=None):
+        """Blit every particle; fallback(frame, x, y, size) is used for missing sprites"""
+        p = self.particles
+        xs = p['x'].astype(np.int32)
+        ys = p['y'].astype(np.int32)
+        # One batched blit per (sprite, size) group
+        for sprite in range(len(self.sprites)):
+            for size in self.sizes.tolist():
+                group = (p['sprite'] == sprite) & (p['size'] == size)
+                if not group.any():
+                    continue
+                if atlas.blit_batch(frame, self.sprites[sprite], size, xs[group], ys[group]):
+                    continue
+                if fallback:
+                    for x, y in zip(xs[group].tolist(), ys[group].tolist()):
+                        fallback(frame, x, y, size)
+
+EMOJI_FILES = {
+    "maple_leaf": "emoji_icons/maple_leaf.png",
+    "snowflake": "emoji_icons/snowflake.png",
+    "hockey": "emoji_icons/hockey.png",
+    "coffee": "emoji_icons/coffee.png",
+    "star": "emoji_icons/star.png",
+    "flag": "emoji_icons/flag.png",
+    "beaver": "emoji_icons/beaver.png",
+    "moose": "emoji_icons/moose.png",
+    "smiley": "emoji_icons/smiley.png"
+}
+
+# Sizes every sprite is pre-rendered at, as used by the effects
+SPRITE_SIZES = {
+    "maple_leaf": [20, 50],
+    "snowflake": [35],
+    "hockey": [80],
+    "coffee": [60],
+    "star": [25],
+    "flag": [70],
+    "beaver": [60],
+    "moose": [70],
+    "smiley": [40],
+}
+
+EFFECT_NAMES = [
+    "maple_rain",
+    "snow_fall",
+    "hockey_sticks",
+    "beaver_dam",
+    "flag_frame",
+    "tim_hortons",
+    "moose_trail",
+    "northern_stars",
+    "smiley_rain"
+]
+
+def load_emoji_icons():
+    """Load emoji icons if available; missing or unreadable icons map to None"""
+    icons = {}
+    for name, filepath in EMOJI_FILES.items():
+        # Use resource_path for PyInstaller compatibility
+        full_path = resource_path(filepath)
+        if os.path.exists(full_path):
+            icons[name] = cv2.imread(full_path, cv2.IMREAD_UNCHANGED)
         else:
-            # Draw explosion particles
-            for particle in self.particles:
-                if particle['life'] > 0:
-                    alpha = particle['life'] / 60.0
-                    color = tuple(int(c * alpha) for c in self.color)
-                    cv2.circle(frame, (int(particle['x']), int(particle['y'])), 
-                             particle['size'], color, -1)
+            icons[name] = None
+    return icons
 
-class ModelDownloadWorker(QThread):
-    """Worker thread for downloading rembg model"""
-    progress = pyqtSignal(int, str)  # progress percentage, status message
-    finished = pyqtSignal(bool, str)  # success, message
+class EffectRenderer:
+    """Draws the overlay effects (sprites, shapes and captions) onto BGR frames.
+
+    Holds no Qt objects, so the live preview and the headless renderer
+    share the same drawing code.
+    """
+
+    def __init__(self, sprite_atlas=None, seed=None):
+        self.sprite_atlas = sprite_atlas
+        self.seed = seed  # Same seed -> same particle animation
+        self.rng = np.random.default_rng(seed)
+        self.current_effect = None
+        self.falling_sprites = None
+        self.easter_egg_active = False
+        self.particle_scale = 1.0
     
-    def __init__(self, model_name='u2netp'):
-        super().__init__()
-        self.model_name = model_name
-        self.logger = logging.getLogger('ModelDownload')
-        
-    def run(self):
+    def set_effect(self, effect):
+        """Select an effect by name (None for no effect)"""
+        self.current_effect = effect
+        self.falling_sprites = self.create_falling_sprites(effect)
+    
+    def set_particle_scale(self, scale):
+        """Scale the particle count of falling-sprite effects"""
+        self.particle_scale = scale
+        if self.falling_sprites:
+            self.falling_sprites.set_count(round(self.falling_sprites.base_count * scale))
+    
+    def skip_frames(self, count, width, height):
+        """Advance the animation by count frames without drawing them"""
+        if self.falling_sprites:
+            for _ in range(count):
+                self.falling_sprites.step(width, height)
+        elif self.current_effect == "northern_stars":
+            for _ in range(count):
+                self.star_positions(width, height)
+    
+    def star_positions(self, w, h):
+        """Where this frame's twinkling northern_stars are drawn"""
+        return self.rng.integers(0, w, 15).tolist(), self.rng.integers(0, h // 3, 15).tolist()
+    
+    def overlay_emoji(self, frame, emoji_name, x, y, size=40):
+        """Overlay an emoji icon on the frame"""
         try:
-            self.logger.info(f"="*60)
-            self.logger.info(f"Starting model download process")
-            self.logger.info(f"Model: {self.model_name}")
-            self.logger.info(f"Platform: {platform.system()}")
-            
-            self.progress.emit(0, "Initializing download...")
-            
-            # Debug: Print environment variable
-            u2net_home = os.environ.get('U2NET_HOME', str(Path.home() / '.u2net'))
-            self.logger.info(f"U2NET_HOME: {u2net_home}")
+            return self.sprite_atlas.blit(frame, emoji_name, x, y, size)
+        except Exception:
+            return False
+    
+    def create_falling_sprites(self, effect):
+        """Create the particle system for a falling-sprite effect, if it is one"""
+        # effect -> (sprite, size, particle count, fall speed in px/frame)
+        falling_effects = {
+            "maple_rain": ("maple_leaf", 50, 15, 3.0),
+            "snow_fall": ("snowflake", 35, 25, 2.0),
+            "smiley_rain": ("smiley", 40, 20, 3.5),
+        }
+        if effect not in falling_effects:
+            return None
+        sprite, size, count, speed = falling_effects[effect]
+        system = FallingSpriteSystem([sprite], [size], count, speed, seed=self.seed)
+        system.set_count(round(count * self.particle_scale))
+        return system
+    
+    def apply_effect_overlay(self, frame):
+        """Apply the selected pattern overlay"""
+        h, w = frame.shape[:2]
+        font = cv2.FONT_HERSHEY_SIMPLEX
+        
+        if self.current_effect == "maple_rain":
+            # Falling maple leaves, drawn shape if the icon is missing
+            self.falling_sprites.step(w, h)
+            self.falling_sprites.draw(frame, self.sprite_atlas,
+                                      lambda f, x, y, size: self.draw_maple_leaf(f, x, y, 20, (0, 0, 255)))
+                
+        elif self.current_effect == "snow_fall":
+            # Falling snowflakes, drawn with blue/grey color if the icon is missing
+            self.falling_sprites.step(w, h)
+            self.falling_sprites.draw(frame, self.sprite_atlas,
+                                      lambda f, x, y, size: self.draw_snowflake(f, x, y, 8, (200, 100, 0)))
+                
+        elif self.current_effect == "hockey_sticks":
+            # Hockey sticks pattern
+            stick_positions = [(50, 100), (w-100, 100), (50, h-150), (w-100, h-150)]
+            for pos in stick_positions:
+                # Try emoji icon first, fallback to drawn shape
+                if not self.overlay_emoji(frame, "hockey", pos[0], pos[1], 80):
+                    self.draw_hockey_stick(frame, pos[0], pos[1], 40, (139, 69, 19))
+                
+        elif self.current_effect == "beaver_dam":
+            # Beaver icons in corners
+            corner_positions = [
+                (50, 50),           # Top left
+                (w-50, 50),         # Top right
+                (50, h-50),         # Bottom left
+                (w-50, h-50),       # Bottom right
+                (w//2, 100)         # Top center
+            ]
             
-            # Check if directory exists and is writable
-            u2net_dir = Path(u2net_home)
-            try:
-                u2net_dir.mkdir(parents=True, exist_ok=True)
-                test_file = u2net_dir / 'test_write.tmp'
-                test_file.write_text('test')
-                test_file.unlink()
-                self.logger.info(f"✅ Model directory is writable: {u2net_dir}")
-            except Exception as e:
-                self.logger.error(f"❌ Cannot write to model directory: {e}")
-                self.finished.emit(False, f"Cannot write to model directory: {u2net_home}")
-                return
+            for pos in corner_positions:
+                if not self.overlay_emoji(frame, "beaver", pos[0], pos[1], 60):
+                    # Fallback text if icon not loaded
+                    cv2.putText(frame, "BEAVER", (pos[0]-40, pos[1]), font, 0.8, (139, 69, 19), 2)
             
-            # Import here to catch progress
-            self.logger.info("Importing rembg.new_session...")
-            from rembg import new_session
+            # Dam logs at bottom
+            for i in range(0, w, 80):
+                cv2.rectangle(frame, (i, h-60), (i+70, h-40), (101, 67, 33), -1)
+                cv2.rectangle(frame, (i, h-60), (i+70, h-40), (61, 43, 31), 2)
+                # Wood texture lines
+                cv2.line(frame, (i+10, h-55), (i+60, h-55), (81, 53, 21), 1)
+                cv2.line(frame, (i+10, h-45), (i+60, h-45), (81, 53, 21), 1)
             
-            self.progress.emit(10, "Connecting to model server...")
+            # DAM text in the middle
+            cv2.putText(frame, "DAM GOOD!", (w//2-80, h-90), font, 1.5, (255, 255, 255), 3)
+            cv2.putText(frame, "DAM GOOD!", (w//2-80, h-90), font, 1.5, (139, 69, 19), 2)
+                
+        elif self.current_effect == "flag_frame":
+            # Canadian flags in corners
+            corner_positions = [
+                (50, 50),           # Top left
+                (w-50, 50),         # Top right
+                (50, h-50),         # Bottom left
+                (w-50, h-50),       # Bottom right
+            ]
             
-            # Check if model already exists
-            model_path = Path(u2net_home) / f'{self.model_name}.onnx'
-            self.logger.info(f"Looking for model at: {model_path}")
+            for pos in corner_positions:
+                if not self.overlay_emoji(frame, "flag", pos[0], pos[1], 70):
+                    # Fallback - draw maple leaf
+                    self.overlay_emoji(frame, "maple_leaf", pos[0], pos[1], 50)
             
-            if model_path.exists():
-                size_mb = model_path.stat().st_size / 1024 / 1024
-                self.logger.info(f"✅ Model found at: {model_path} (Size: {size_mb:.1f} MB)")
-                self.progress.emit(100, "Model already downloaded!")
-                self.finished.emit(True, "Model ready!")
-                return
+            # Add "TRUE NORTH" text
+            cv2.putText(frame, "TRUE NORTH", (w//2-80, 50), font, 1, (255, 255, 255), 3)
+            cv2.putText(frame, "TRUE NORTH", (w//2-80, 50), font, 1, (255, 0, 0), 2)
             
-            self.progress.emit(20, f"Downloading {self.model_name} model (~180MB)...")
-            self.logger.info("Starting model download via new_session()...")
+        elif self.current_effect == "tim_hortons":
+            # Coffee cups and text
+            cup_positions = [(100, 100), (w-150, 100), (w//2-25, h-100)]
+            for pos in cup_positions:
+                # Try emoji icon first, fallback to drawn shape
+                if not self.overlay_emoji(frame, "coffee", pos[0], pos[1], 60):
+                    self.draw_coffee_cup(frame, pos[0], pos[1], 30, (139, 69, 19))
+            cv2.putText(frame, "Timmies Time!", (w//2-100, 50), font, 1, (255, 0, 0), 2)
+            cv2.putText(frame, "Double Double", (w//2-100, h-50), font, 0.8, (139, 69, 19), 2)
             
-            # Log network connectivity
-            try:
-                import urllib.request
-                self.logger.info("Testing network connectivity...")
-                with urllib.request.urlopen('https://github.com', timeout=5) as response:
-                    self.logger.info(f"✅ Network connection OK (GitHub accessible)")
-            except Exception as e:
-                self.logger.warning(f"⚠️ Network test failed: {e}")
+        elif self.current_effect == "moose_trail":
+            # Moose icons in different positions
+            moose_positions = [
+                (100, 100),
+                (w-100, 100),
+                (w//2, 200),
+                (150, h-100),
+                (w-150, h-100),
+            ]
             
-            # This will trigger the download
-            self.logger.info("Creating new rembg session (this will download the model)...")
+            for i, pos in enumerate(moose_positions):
+                # Rotate moose slightly for variety
+                if not self.overlay_emoji(frame, "moose", pos[0], pos[1], 70):
+                    # Fallback - draw text
+                    cv2.putText(frame, "MOOSE", (pos[0]-30, pos[1]), font, 0.8, (101, 67, 33), 2)
             
-            # Add special handling for Windows
-            if platform.system() == 'Windows':
-                self.logger.info("Windows detected - setting up special handling...")
-                # Ensure stdout/stderr are available
-                import sys
-                if sys.stdout is None:
-                    self.logger.warning("stdout is None - creating dummy stdout")
-                    import io
-                    sys.stdout = io.StringIO()
-                if sys.stderr is None:
-                    self.logger.warning("stderr is None - creating dummy stderr")
-                    import io
-                    sys.stderr = io.StringIO()
-                    
-                # Set Windows-specific environment variables
-                os.environ['ONNX_DISABLE_POOL_ALLOCATOR'] = '1'
+            # Add "EH!" text
+            cv2.putText(frame, "MOOSE CROSSING EH!", (w//2-120, h-50), font, 1, (255, 255, 255), 3)
+            cv2.putText(frame, "MOOSE CROSSING EH!", (w//2-120, h-50), font, 1, (101, 67, 33), 2)
                 
-            try:
-                session = new_session(self.model_name)
-                self.logger.info("✅ Session created successfully")
-            except AttributeError as ae:
-                if "'NoneType' object has no attribute 'write'" in str(ae):
-                    self.logger.error("Known Windows issue with stdout/stderr")
-                    # Try alternative download method
-                    self.logger.info("Attempting manual model download...")
-                    self.manual_download_model()
-                    return
-                else:
-                    raise
-            
-            self.progress.emit(90, "Finalizing...")
-            
-            # Verify download
+        elif self.current_effect == "northern_stars":
+            # Northern lights effect
+            # Stars
+            for x, y in zip(*self.star_positions(w, h)):
+                # Try emoji icon first, fallback to drawn shape
+                if not self.overlay_emoji(frame, "star", x, y, 25):
+                    self.draw_star(frame, x, y, 5, (255, 255, 200))
+            # Aurora colors overlay
+            overlay = frame.copy()
+            cv2.ellipse(overlay, (w//2, -50), (w, 200), 0, 0, 180, (0, 255, 100), -1)
+            cv2.ellipse(overlay, (w//2, -30), (int(w*0.8), 150), 0, 0, 180, (0, 200, 255), -1)
+            cv2.addWeighted(overlay, 0.15, frame, 0.85, 0, frame)
+            
+        elif self.current_effect == "smiley_rain":
+            # Falling smiley faces, drawn smiley if the icon is missing
+            self.falling_sprites.step(w, h)
+            self.falling_sprites.draw(frame, self.sprite_atlas,
+                                      lambda f, x, y, size: self.draw_smiley(f, x, y, 20, (0, 255, 255)))
+        
+        # Special easter egg effects
+        if self.easter_egg_active:
+            # Add MOUNTIE hat effect
+            cv2.putText(frame, "MOUNTIE MODE", (10, 30), font, 0.7, (255, 255, 255), 3)
+            cv2.putText(frame, "MOUNTIE MODE", (10, 30), font, 0.7, (255, 0, 0), 2)
+            
+            # Add Canadian flag corners
+            for corner in [(10, 10), (w-60, 10), (10, h-30), (w-60, h-30)]:
+                cv2.rectangle(frame, corner, (corner[0]+50, corner[1]+20), (255, 0, 0), -1)
+                cv2.rectangle(frame, (corner[0]+17, corner[1]), (corner[0]+33, corner[1]+20), (255, 255, 255), -1)
+                # Add maple leaf using overlay_emoji or draw it
+                if not self.overlay_emoji(frame, "maple_leaf", corner[0]+25, corner[1]+10, 20):
+                    self.draw_maple_leaf(frame, corner[0]+25, corner[1]+10, 8, (255, 0, 0))
+            
+        return frame
+    
+    def draw_maple_leaf(self, frame, x, y, size, color):
+        """Draw a simple maple leaf shape"""
+        # Simplified maple leaf using lines
+        # Stem
+        cv2.line(frame, (x, y+size), (x, y+size//2), color, 2)
+        # Main body
+        points = np.array([
+            [x, y-size//2],
+            [x-size//2, y-size//4],
+            [x-size, y],
+            [x-size//2, y],
+            [x-size//3, y+size//3],
+            [x, y+size//2],
+            [x+size//3, y+size//3],
+            [x+size//2, y],
+            [x+size, y],
+            [x+size//2, y-size//4],
+            [x, y-size//2]
+        ], np.int32)
+        cv2.fillPoly(frame, [points], color)
+        
+    def draw_snowflake(self, frame, x, y, size, color):
+        """Draw a snowflake shape"""
+        # Six-pointed snowflake
+        for angle in range(0, 360, 60):
+            x2 = int(x + size * np.cos(np.radians(angle)))
+            y2 = int(y + size * np.sin(np.radians(angle)))
+            cv2.line(frame, (x, y), (x2, y2), color, 2)
+            # Small branches
+            x3 = int(x + size*0.6 * np.cos(np.radians(angle-20)))
+            y3 = int(y + size*0.6 * np.sin(np.radians(angle-20)))
+            cv2.line(frame, (x2, y2), (x3, y3), color, 1)
+            x4 = int(x + size*0.6 * np.cos(np.radians(angle+20)))
+            y4 = int(y + size*0.6 * np.sin(np.radians(angle+20)))
+            cv2.line(frame, (x2, y2), (x4, y4), color, 1)
+    
+    def draw_hockey_stick(self, frame, x, y, size, color):
+        """Draw a hockey stick shape"""
+        # Stick shaft
+        cv2.rectangle(frame, (x, y), (x+8, y+size), color, -1)
+        # Blade
+        blade_points = np.array([
+            [x, y+size],
+            [x+8, y+size],
+            [x+20, y+size+15],
+            [x+15, y+size+20],
+            [x-5, y+size+10],
+            [x, y+size]
+        ], np.int32)
+        cv2.fillPoly(frame, [blade_points], color)
+        # Tape on blade
+        cv2.line(frame, (x+2, y+size+5), (x+15, y+size+15), (255, 255, 255), 2)
+        
+    def draw_coffee_cup(self, frame, x, y, size, color):
+        """Draw a coffee cup shape"""
+        # Cup body
+        cv2.rectangle(frame, (x-size//2, y), (x+size//2, y+size), color, -1)
+        cv2.rectangle(frame, (x-size//2, y), (x+size//2, y+size), (0, 0, 0), 2)
+        # Handle
+        cv2.ellipse(frame, (x+size//2, y+size//2), (size//3, size//3), 0, -90, 90, color, 3)
+        # Steam lines
+        for i in range(3):
+            x_steam = x - size//4 + i*size//4
+            cv2.line(frame, (x_steam, y-5), (x_steam, y-15), (200, 200, 200), 2)
+        # "TH" text on cup
+        cv2.putText(frame, "TH", (x-10, y+size//2), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 255), 1)
+    
+    def draw_star(self, frame, x, y, size, color):
+        """Draw a star shape"""
+        # Five-pointed star
+        angle = -np.pi/2
+        points = []
+        for i in range(10):
+            if i % 2 == 0:
+                r = size
+            else:
+                r = size // 2
+            px = int(x + r * np.cos(angle))
+            py = int(y + r * np.sin(angle))
+            points.append([px, py])
+            angle += np.pi / 5
+        points = np.array(points, np.int32)
+        cv2.fillPoly(frame, [points], color)
+    
+    def draw_smiley(self, frame, x, y, size, color):
+        """Draw a simple smiley face"""
+        # Face circle
+        cv2.circle(frame, (x, y), size, color, -1)
+        cv2.circle(frame, (x, y), size, (0, 0, 0), 2)
+        
+        # Eyes
+        eye_offset = size // 3
+        eye_size = size // 8
+        cv2.circle(frame, (x - eye_offset, y - eye_offset), eye_size, (0, 0, 0), -1)
+        cv2.circle(frame, (x + eye_offset, y - eye_offset), eye_size, (0, 0, 0), -1)
+        
+        # Smile
+        start_angle = 0
+        end_angle = 180
+        axes = (size // 2, size // 2)
+        cv2.ellipse(frame, (x, y + eye_offset), axes, 0, start_angle, end_angle, (0, 0, 0), 2)
+    
+    def add_caption(self, frame):
+        """Add "EH!" text overlay to captured photos"""
+        font = cv2.FONT_HERSHEY_SIMPLEX
+        cv2.putText(frame, "EH!", (50, 100), font, 3, (255, 255, 255), 5)
+        cv2.putText(frame, "EH!", (50, 100), font, 3, (0, 0, 255), 3)
+        return frame
+
+class SegmentationModelSpec:
+    """Registry entry for a segmentation model rembg can download.
+
+    mean and std are the RGB normalization the model was trained with,
+    applied after scaling the frame by its brightest pixel. latency is a
+    rough class ('fast', 'medium', 'slow') used to pick models for the
+    live preview versus photo capture.
+    """
+
+    def __init__(self, name, label, url, checksum, input_size, mean, std, latency, license):
+        self.name = name
+        self.label = label
+        self.file = f'{name}.onnx'
+        self.url = url
+        self.checksum = checksum  # "<algorithm>:<hex digest>" as published by rembg
+        self.input_size = input_size
+        self.mean = mean
+        self.std = std
+        self.latency = latency
+        self.license = license
+
+_REMBG_RELEASES = 'https://github.com/danielgatis/rembg/releases/download/v0.0.0'
+_IMAGENET_MEAN = (0.485, 0.456, 0.406)
+_IMAGENET_STD = (0.229, 0.224, 0.225)
+
+MODEL_REGISTRY = OrderedDict((spec.name, spec) for spec in [
+    SegmentationModelSpec('u2netp', 'U²-Net portrait (lite)', f'{_REMBG_RELEASES}/u2netp.onnx',
+                          'md5:8e83ca70e441ab06c318d82300c84806', (320, 320),
+                          _IMAGENET_MEAN, _IMAGENET_STD, 'fast', 'Apache-2.0'),
+    SegmentationModelSpec('u2net_human_seg', 'U²-Net human', f'{_REMBG_RELEASES}/u2net_human_seg.onnx',
+                          'md5:c09ddc2e0104f800e3e1bb4652583d1f', (320, 320),
+                          _IMAGENET_MEAN, _IMAGENET_STD, 'slow', 'Apache-2.0'),
+    SegmentationModelSpec('u2net', 'U²-Net general', f'{_REMBG_RELEASES}/u2net.onnx',
+                          'md5:60024c5c889badc19c04ad937298a77b', (320, 320),
+                          _IMAGENET_MEAN, _IMAGENET_STD, 'slow', 'Apache-2.0'),
+    SegmentationModelSpec('isnet-general-use', 'IS-Net (high detail)', f'{_REMBG_RELEASES}/isnet-general-use.onnx',
+                          'md5:fc16ebd8b0c10d971d3513d564d01e29', (1024, 1024),
+                          (0.5, 0.5, 0.5), (1.0, 1.0, 1.0), 'slow', 'Apache-2.0'),
+])
+DEFAULT_LIVE_MODEL = 'u2netp'  # Light enough for every preview frame
+DEFAULT_PHOTO_MODEL = None  # None: photos use the live model's mask
+
+def models_dir():
+    """Directory rembg downloads the segmentation models into"""
+    return Path(os.environ.get('U2NET_HOME', str(Path.home() / '.u2net')))
+
+def model_file(filename):
+    """Path of a model file in U2NET_HOME; newer rembg versions keep each model in models/<name>/"""
+    path = models_dir() / filename
+    nested = models_dir() / 'models' / Path(filename).stem / filename
+    return nested if not path.exists() and nested.exists() else path
+
+MODEL_MANIFEST = 'manifest.json'  # {"<model>.onnx": {"sha256": ..., "size": ...}}
+
+def model_mirrors():
+    """Download sources to try before the registry URL, from CANADA_SELFIE_MODEL_MIRRORS.
+
+    A comma-separated list of HTTP(S) base URLs, file:// URLs or local
+    folders that hold the .onnx files under their usual names.
+    """
+    return [mirror.strip() for mirror in os.environ.get('CANADA_SELFIE_MODEL_MIRRORS', '').split(',')
+            if mirror.strip()]
+
+class ModelDownloader:
+    """Downloads segmentation models resumably and verifies them before use.
+
+    Sources are tried in order: the mirrors, then the model's registry
+    URL. Data is streamed in chunks into <model>.onnx.part next to the
+    final file; an interrupted HTTP download resumes from there with a
+    Range request. The file is only renamed to <model>.onnx (atomically)
+    once it matches every checksum known for it: the SHA-256 in
+    manifest.json in U2NET_HOME or in the mirror, and the registry
+    checksum. rembg publishes MD5s only, so the SHA-256 of a file verified
+    that way is added to the local manifest for later checks.
+    """
+    CHUNK_SIZE = 1024 * 1024
+    TIMEOUT = 30
+    PROGRESS_INTERVAL = 0.25  # Seconds between progress callbacks
+
+    def __init__(self, mirrors=None, directory=None, progress=None):
+        self.mirrors = model_mirrors() if mirrors is None else list(mirrors)
+        self.directory = Path(directory or models_dir())
+        # progress(bytes done, total bytes or 0 if unknown, source)
+        self.progress = progress
+        self._last_progress = 0.0
+        self.cancelled = threading.Event()
+
+    def cancel(self):
+        """Stop after the current chunk; the .part file is kept for resuming"""
+        self.cancelled.set()
+
+    @staticmethod
+    def source_path(source):
+        """Local path of a file:// URL or folder source, None for HTTP(S)"""
+        from urllib.parse import urlparse
+        from urllib.request import url2pathname
+        parsed = urlparse(source)
+        if parsed.scheme == 'file':
+            return Path(url2pathname(parsed.path))
+        if parsed.scheme in ('http', 'https'):
+            return None
+        return Path(source)
+
+    def sources(self, spec):
+        """Where to look for spec's file, in order"""
+        return [f"{mirror.rstrip('/')}/{spec.file}" if self.source_path(mirror) is None
+                else str(self.source_path(mirror) / spec.file)
+                for mirror in self.mirrors] + [spec.url]
+
+    def load_manifest(self, location=None):
+        """manifest.json of U2NET_HOME, or of a mirror; empty if there is none"""
+        try:
+            if location is None:
+                with open(self.directory / MODEL_MANIFEST, encoding='utf-8') as f:
+                    return json.load(f)
+            path = self.source_path(location)
+            if path is not None:
+                with open(path / MODEL_MANIFEST, encoding='utf-8') as f:
+                    return json.load(f)
+            import urllib.request
+            with urllib.request.urlopen(f"{location.rstrip('/')}/{MODEL_MANIFEST}", timeout=self.TIMEOUT) as r:
+                return json.loads(r.read().decode('utf-8'))
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.info(f"No model manifest at {location or self.directory}: {e}")
+            return {}
+
+    def record(self, spec, sha256, size):
+        manifest = self.load_manifest()
+        manifest[spec.file] = {'sha256': sha256, 'size': size}
+        try:
+            with open(self.directory / MODEL_MANIFEST, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, indent=2)
+        except OSError as e:
+            logger.warning(f"Cannot update the model manifest: {e}")
+
+    def expected_checksums(self, spec):
+        """{algorithm: hex digest} the downloaded file has to match"""
+        expected = {}
+        algorithm, _, digest = spec.checksum.partition(':')
+        if digest:
+            expected[algorithm] = digest.lower()
+        for location in [None] + self.mirrors:
+            sha256 = self.load_manifest(location).get(spec.file, {}).get('sha256')
+            if sha256:
+                expected['sha256'] = sha256.lower()
+                break
+        return expected
+
+    def download(self, spec):
+        """Fetch spec's model into the models directory and return its path"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        destination = self.directory / spec.file
+        part = destination.with_name(destination.name + '.part')
+        expected = self.expected_checksums(spec)
+        errors = []
+        for source in self.sources(spec):
+            # A leftover .part is resumed once; if it does not verify, the source gets a clean retry
+            for resume in ((True, False) if part.exists() else (False,)):
+                try:
+                    digests, size = self._fetch(source, part, set(expected) | {'sha256'}, resume)
+                except InterruptedError:
+                    raise
+                except Exception as e:
+                    errors.append(f"{source}: {e}")
+                    logger.warning(f"Model download from {source} failed: {e}")
+                    break
+                mismatched = [name for name, digest in expected.items() if digests[name] != digest]
+                if not mismatched:
+                    os.replace(part, destination)
+                    if 'sha256' not in expected:
+                        self.record(spec, digests['sha256'], size)
+                    logger.info(f"{spec.file} ({size / 1024 / 1024:.1f} MB) from {source}, "
+                                f"sha256 {digests['sha256']}")
+                    return destination
+                part.unlink()
+                errors.append(f"{source}: {', '.join(mismatched)} checksum mismatch")
+                logger.warning(f"{spec.file} from {source} failed the {', '.join(mismatched)} check")
+        raise RuntimeError(f"Could not download {spec.file}: " + "; ".join(errors))
+
+    def _fetch(self, source, part, algorithms, resume):
+        """Stream source into part (appending if resume); returns ({algorithm: digest}, size)"""
+        import hashlib
+        hashers = {name: hashlib.new(name) for name in algorithms}
+        offset = part.stat().st_size if resume and part.exists() else 0
+        stream, total, offset = self._open(source, offset)
+        with stream, open(part, 'ab' if offset else 'wb') as out:
+            if offset:
+                # Hash what is already on disk before appending to it
+                with open(part, 'rb') as existing:
+                    for chunk in iter(lambda: existing.read(self.CHUNK_SIZE), b''):
+                        for hasher in hashers.values():
+                            hasher.update(chunk)
+            done = offset
+            self._report(done, total, source, force=True)
+            for chunk in iter(lambda: stream.read(self.CHUNK_SIZE), b''):
+                if self.cancelled.is_set():
+                    raise InterruptedError(f"download of {part.name} cancelled")
+                out.write(chunk)
+                for hasher in hashers.values():
+                    hasher.update(chunk)
+                done += len(chunk)
+                self._report(done, total, source)
+            out.flush()
+            os.fsync(out.fileno())
+        if total and done != total:
+            raise IOError(f"incomplete download ({done} of {total} bytes)")
+        self._report(done, total, source, force=True)
+        return {name: hasher.hexdigest() for name, hasher in hashers.items()}, done
+
+    def _open(self, source, offset):
+        """Readable stream of source from offset; returns (stream, total size or 0, actual offset)"""
+        path = self.source_path(source)
+        if path is not None:
+            size = path.stat().st_size
+            offset = offset if offset <= size else 0
+            stream = open(path, 'rb')
+            stream.seek(offset)
+            return stream, size, offset
+        import io
+        import urllib.error
+        import urllib.request
+        headers = {'User-Agent': 'CanadaSelfieApp'}
+        if offset:
+            headers['Range'] = f'bytes={offset}-'
+        try:
+            response = urllib.request.urlopen(urllib.request.Request(source, headers=headers), timeout=self.TIMEOUT)
+        except urllib.error.HTTPError as e:
+            if e.code == 416 and offset:
+                # The .part already holds the whole file
+                return io.BytesIO(), offset, offset
+            raise
+        if offset and response.status != 206:
+            offset = 0  # The server ignored the Range header; start over
+        length = int(response.headers.get('Content-Length') or 0)
+        return response, offset + length if length else 0, offset
+
+    def _report(self, done, total, source, force=False):
+        now = time.perf_counter()
+        if self.progress and (force or now - self._last_progress >= self.PROGRESS_INTERVAL):
+            self._last_progress = now
+            self.progress(done, total, source)
+
+class SessionFactory:
+    """Creates onnxruntime sessions for the segmentation models.
+
+    Options are read from onnx_session.json in the app data directory,
+    which is written with the defaults on first use: thread counts,
+    execution mode, graph optimization level, memory arena and pattern,
+    execution providers and their options (e.g. CPU EP settings). With
+    cache_optimized_model the optimized graph is saved next to the .onnx
+    in U2NET_HOME and loaded directly on later launches. With auto_tune
+    and intra_op_threads left at 0, a few thread counts are benchmarked
+    the first time a model is loaded on this machine and the fastest is
+    stored under "tuned". precision "int8" loads the quantized variant
+    made by quantize_model.py (<model>.int8.onnx) when it exists.
+    """
+    CONFIG_FILE = 'onnx_session.json'
+    DEFAULTS = {
+        'precision': 'fp32',
+        'intra_op_threads': 0,  # 0 = auto-tuned, or onnxruntime's default
+        'inter_op_threads': 1,
+        'execution_mode': 'sequential',
+        'graph_optimization': 'all',
+        'enable_mem_arena': True,
+        'enable_mem_pattern': True,
+        'providers': ['CPUExecutionProvider'],
+        'provider_options': {'CPUExecutionProvider': {}},
+        'cache_optimized_model': True,
+        'auto_tune': True,
+        'tuned': {},
+    }
+    OPTIMIZATION_LEVELS = {
+        'disabled': 'ORT_DISABLE_ALL',
+        'basic': 'ORT_ENABLE_BASIC',
+        'extended': 'ORT_ENABLE_EXTENDED',
+        'all': 'ORT_ENABLE_ALL',
+    }
+    TUNE_RUNS = 5
+
+    def __init__(self, path=None):
+        self.path = Path(path or os.path.join(app_data_dir(), self.CONFIG_FILE))
+        self.config = self.load()
+
+    def load(self):
+        """Read the config file (creating it with defaults if missing); unknown keys are kept"""
+        config = json.loads(json.dumps(self.DEFAULTS))
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                config.update(json.load(f))
+        except FileNotFoundError:
+            self.config = config
+            self.save()
+        except (OSError, ValueError) as e:
+            logger.warning(f"Cannot read {self.path}, using default session options: {e}")
+        return config
+
+    def save(self):
+        try:
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump(self.config, f, indent=2)
+        except OSError as e:
+            logger.warning(f"Cannot write {self.path}: {e}")
+
+    def session_options(self, intra_op_threads=None, inter_op_threads=None, optimization=None):
+        """onnxruntime.SessionOptions from the config; arguments override it"""
+        import onnxruntime as ort
+        config = self.config
+        opts = ort.SessionOptions()
+        opts.intra_op_num_threads = int(config['intra_op_threads'] if intra_op_threads is None
+                                        else intra_op_threads)
+        opts.inter_op_num_threads = int(config['inter_op_threads'] if inter_op_threads is None
+                                        else inter_op_threads)
+        opts.execution_mode = (ort.ExecutionMode.ORT_PARALLEL if config['execution_mode'] == 'parallel'
+                               else ort.ExecutionMode.ORT_SEQUENTIAL)
+        level = self.OPTIMIZATION_LEVELS.get(optimization or config['graph_optimization'], 'ORT_ENABLE_ALL')
+        opts.graph_optimization_level = getattr(ort.GraphOptimizationLevel, level)
+        opts.enable_cpu_mem_arena = bool(config['enable_mem_arena'])
+        opts.enable_mem_pattern = bool(config['enable_mem_pattern'])
+        return opts
+
+    def providers(self):
+        """Configured providers that this onnxruntime build has, with their options"""
+        import onnxruntime as ort
+        available = ort.get_available_providers()
+        names = [name for name in self.config['providers'] if name in available] or ['CPUExecutionProvider']
+        options = self.config.get('provider_options', {})
+        return names, [options.get(name, {}) for name in names]
+
+    def optimized_model_path(self, model_path):
+        """Cache file for the optimized graph, per optimization level and first provider"""
+        provider = self.providers()[0][0].replace('ExecutionProvider', '').lower()
+        level = self.config['graph_optimization']
+        return model_path.with_name(f"{model_path.stem}.{level}.{provider}.optimized.onnx")
+
+    def _inference_session(self, model_path, opts):
+        import onnxruntime as ort
+        providers, provider_options = self.providers()
+        if not self.config['cache_optimized_model'] or self.config['graph_optimization'] == 'disabled':
+            return ort.InferenceSession(str(model_path), sess_options=opts,
+                                       providers=providers, provider_options=provider_options)
+        cache = self.optimized_model_path(model_path)
+        if cache.exists() and cache.stat().st_mtime >= model_path.stat().st_mtime:
+            # Already optimized: skip the graph transformations at load time
+            opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_DISABLE_ALL
+            try:
+                return ort.InferenceSession(str(cache), sess_options=opts,
+                                            providers=providers, provider_options=provider_options)
+            except Exception as e:
+                logger.warning(f"Optimized model cache {cache} is unusable, rebuilding it: {e}")
+                opts = self.session_options(intra_op_threads=opts.intra_op_num_threads,
+                                            inter_op_threads=opts.inter_op_num_threads)
+        opts.optimized_model_filepath = str(cache)
+        return ort.InferenceSession(str(model_path), sess_options=opts,
+                                   providers=providers, provider_options=provider_options)
+
+    def model_path(self, model_name, precision=None):
+        """Model file for the configured precision, falling back to FP32 if there is no variant"""
+        path = model_file(f'{model_name}.onnx')
+        precision = precision or self.config.get('precision', 'fp32')
+        if precision != 'fp32':
+            variant = models_dir() / f'{model_name}.{precision}.onnx'
+            if variant.exists():
+                return variant
+            logger.warning(f"No {precision} variant of {model_name} at {variant}, using FP32")
+        return path
+
+    def create(self, model_name, intra_op_threads=None, inter_op_threads=None, precision=None,
+               downloader=None):
+        """Session for model_name; the model is downloaded first (with downloader) if it is missing"""
+        model_path = self.model_path(model_name, precision)
+        if not model_path.exists() and model_name in MODEL_REGISTRY:
+            (downloader or ModelDownloader()).download(MODEL_REGISTRY[model_name])
+            model_path = self.model_path(model_name, precision)
+        if not model_path.exists():
+            # Models outside the registry are left to rembg
+            from rembg import new_session
+            providers, _ = self.providers()
+            return new_session(model_name, providers=providers,
+                               sess_opts=self.session_options(intra_op_threads, inter_op_threads))
+        if intra_op_threads is None and not self.config['intra_op_threads']:
+            intra_op_threads = self.tuned_threads(model_path.stem, model_path)
+        opts = self.session_options(intra_op_threads, inter_op_threads)
+        session = self._inference_session(model_path, opts)
+        logger.info(f"ONNX session for {model_path.name}: providers {session.get_providers()}, "
+                    f"intra-op threads {opts.intra_op_num_threads or 'default'}, "
+                    f"optimization {self.config['graph_optimization']}")
+        return session
+
+    @staticmethod
+    def blank_feed(session, model_name=None):
+        """All-zero input for session; dimensions the model leaves open come from its registry input_size"""
+        # A precision variant's stem ("u2netp.int8") names the same registry model
+        spec = MODEL_REGISTRY.get((model_name or '').partition('.')[0])
+        width, height = spec.input_size if spec else SegmentationEngine.DEFAULT_INPUT_SIZE
+        model_input = session.get_inputs()[0]
+        shape = [dim if isinstance(dim, int) else size
+                 for dim, size in zip(model_input.shape, [1, 3, height, width])]
+        return {model_input.name: np.zeros(shape, dtype=np.float32)}
+
+    def warm_up(self, session, model_name=None):
+        """Run one blank inference so the first real frame does not pay for lazy initialization; returns the feed"""
+        ort_session = getattr(session, 'inner_session', session)
+        feed = self.blank_feed(ort_session, model_name)
+        ort_session.run(None, feed)
+        return feed
+
+    def tuned_threads(self, model_name, model_path):
+        """Intra-op thread count from a previous auto-tune, tuning now if there is none"""
+        if not self.config['auto_tune']:
+            return None
+        cpus = os.cpu_count() or 1
+        tuned = self.config['tuned'].get(model_name)
+        # A different CPU count (e.g. a copied config) invalidates the result
+        if tuned and tuned.get('cpu_count') == cpus:
+            return tuned['intra_op_threads']
+        try:
+            tuned = self.auto_tune(model_path)
+        except Exception as e:
+            logger.warning(f"Session auto-tune failed for {model_name}: {e}")
+            return None
+        self.config['tuned'][model_name] = tuned
+        self.save()
+        return tuned['intra_op_threads']
+
+    def auto_tune(self, model_path):
+        """Time a few intra-op thread counts on a blank input and return the fastest"""
+        import onnxruntime as ort
+        cpus = os.cpu_count() or 1
+        candidates = sorted({1, 2, max(1, cpus // 2), cpus} & set(range(1, cpus + 1)))
+        providers, provider_options = self.providers()
+        results = {}
+        for threads in candidates:
+            session = ort.InferenceSession(str(model_path), sess_options=self.session_options(threads),
+                                           providers=providers, provider_options=provider_options)
+            feed = self.warm_up(session, model_path.stem)
+            times = []
+            for _ in range(self.TUNE_RUNS):
+                start = time.perf_counter()
+                session.run(None, feed)
+                times.append((time.perf_counter() - start) * 1000)
+            results[threads] = float(np.median(times))
+            logger.info(f"Auto-tune {model_path.name}: {threads} intra-op threads -> {results[threads]:.1f} ms")
+        best = min(results, key=results.get)
+        return {'intra_op_threads': best, 'ms': round(results[best], 2), 'cpu_count': cpus}
+
+class ModelDownloadWorker(QThread):
+    """Worker thread for downloading a segmentation model"""
+    progress = pyqtSignal(int, str)  # progress percentage, status message
+    finished = pyqtSignal(bool, str)  # success, message
+    
+    def __init__(self, model_name='u2netp'):
+        super().__init__()
+        self.model_name = model_name
+        self.logger = logging.getLogger('ModelDownload')
+        self.downloader = ModelDownloader(progress=self.report_progress)
+    
+    def cancel(self):
+        """Abort the download from the GUI thread; run() then reports failure"""
+        self.downloader.cancel()
+        
+    def run(self):
+        u2net_home = str(models_dir())
+        try:
+            self.logger.info(f"="*60)
+            self.logger.info(f"Starting model download process")
+            self.logger.info(f"Model: {self.model_name}")
+            self.logger.info(f"Platform: {platform.system()}")
+            
+            self.progress.emit(0, "Initializing download...")
+            self.logger.info(f"U2NET_HOME: {u2net_home}")
+            
+            # Check if directory exists and is writable
+            u2net_dir = Path(u2net_home)
+            try:
+                u2net_dir.mkdir(parents=True, exist_ok=True)
+                test_file = u2net_dir / 'test_write.tmp'
+                test_file.write_text('test')
+                test_file.unlink()
+                self.logger.info(f"✅ Model directory is writable: {u2net_dir}")
+            except Exception as e:
+                self.logger.error(f"❌ Cannot write to model directory: {e}")
+                self.finished.emit(False, f"Cannot write to model directory: {u2net_home}")
+                return
+            
+            # Check if model already exists
+            model_path = model_file(f'{self.model_name}.onnx')
+            self.logger.info(f"Looking for model at: {model_path}")
+            
             if model_path.exists():
                 size_mb = model_path.stat().st_size / 1024 / 1024
-                self.logger.info(f"✅ Model downloaded successfully!")
-                self.logger.info(f"Model size: {size_mb:.1f} MB")
-                self.logger.info(f"Model location: {model_path}")
-                self.progress.emit(100, f"Download complete! ({size_mb:.1f} MB)")
-                self.finished.emit(True, "Model downloaded successfully!")
-            else:
-                self.logger.error(f"❌ Model file not found after download: {model_path}")
-                self.finished.emit(False, "Model download failed - file not found!")
+                self.logger.info(f"✅ Model found at: {model_path} (Size: {size_mb:.1f} MB)")
+                self.progress.emit(100, "Model already downloaded!")
+                self.finished.emit(True, "Model ready!")
+                return
+            
+            if self.model_name not in MODEL_REGISTRY:
+                self.logger.error(f"Unknown model: {self.model_name}")
+                self.finished.emit(False, f"Unknown model: {self.model_name}")
+                return
+            spec = MODEL_REGISTRY[self.model_name]
+            
+            self.progress.emit(5, f"Downloading {spec.label} model...")
+            downloader = self.downloader
+            self.logger.info(f"Sources: {', '.join(downloader.sources(spec))}")
+            model_path = downloader.download(spec)
+            
+            size_mb = model_path.stat().st_size / 1024 / 1024
+            self.logger.info(f"✅ Model downloaded successfully!")
+            self.logger.info(f"Model size: {size_mb:.1f} MB")
+            self.logger.info(f"Model location: {model_path}")
+            if not downloader.cancelled.is_set():
+                self.prepare_session()
+            self.progress.emit(100, f"Download complete! ({size_mb:.1f} MB)")
+            self.finished.emit(True, "Model downloaded successfully!")
+        
+        except InterruptedError as e:
+            self.logger.info(f"Model download stopped: {e}")
+            self.finished.emit(False, "Download cancelled")
                 
         except Exception as e:
             import traceback
@@ -316,140 +1566,1849 @@ class ModelDownloadWorker(QThread):
             
             self.finished.emit(False, f"Download error: {str(e)}")
     
-    def manual_download_model(self):
-        """Manual download method for Windows when rembg fails"""
+    def report_progress(self, done, total, source):
+        """Map the downloader's (rate-limited) byte counts onto 5-90% of the dialog"""
+        done_mb = done / 1024 / 1024
+        if total:
+            self.progress.emit(5 + int(85 * done / total),
+                               f"Downloading... {done_mb:.1f} of {total / 1024 / 1024:.1f} MB")
+        else:
+            self.progress.emit(5, f"Downloading... {done_mb:.1f} MB")
+    
+    def prepare_session(self):
+        """Auto-tune and cache the optimized model here rather than on the GUI thread"""
+        try:
+            self.progress.emit(95, "Optimizing model for this computer...")
+            SessionFactory().create(self.model_name)
+        except Exception as e:
+            self.logger.warning(f"Session preparation failed, it will run at first use: {e}")
+
+class SessionLoadWorker(QThread):
+    """Imports onnxruntime, creates a model session and warms it up off the GUI thread"""
+    loaded = pyqtSignal(str, str, object)  # model name, role, session
+    failed = pyqtSignal(str, str, str)  # model name, role, error message
+    
+    def __init__(self, model_name, role):
+        super().__init__()
+        self.model_name = model_name
+        self.role = role
+        self.downloader = ModelDownloader()
+    
+    def cancel(self):
+        """Abort a model download the session creation started"""
+        self.downloader.cancel()
+    
+    def run(self):
+        try:
+            if not import_segmentation_stack():
+                raise ImportError("onnxruntime is not available")
+            factory = SessionFactory()
+            session = factory.create(self.model_name, downloader=self.downloader)
+            factory.warm_up(session, self.model_name)
+            self.loaded.emit(self.model_name, self.role, session)
+        except Exception as e:
+            logger.error(f"Cannot load the {self.model_name} model: {e}")
+            self.failed.emit(self.model_name, self.role, str(e))
+
+class PhotoSegmentationWorker(QThread):
+    """Runs the photo model on a captured frame off the GUI thread"""
+    segmented = pyqtSignal(object, object)  # captured frame, mask
+    failed = pyqtSignal(object, str)  # captured frame, error message
+    
+    def __init__(self, engine, frame, segmentation_input):
+        super().__init__()
+        self.engine = engine
+        self.frame = frame
+        self.segmentation_input = segmentation_input
+    
+    def run(self):
+        try:
+            start = time.perf_counter()
+            mask = self.engine.predict_mask(self.segmentation_input)
+            logger.info(f"Photo mask in {(time.perf_counter() - start) * 1000:.0f} ms")
+            self.segmented.emit(self.frame, mask)
+        except Exception as e:
+            logger.error(f"Photo segmentation failed: {e}")
+            self.failed.emit(self.frame, str(e))
+
+class SegmentationEngine:
+    """Real-time person segmentation that runs the ONNX model directly.
+
+    Skips rembg's PIL round-trip and alpha matting: the BGR frame is
+    downscaled to the model input size, normalized into a preallocated
+    NCHW tensor, and the predicted mask is refined at model resolution
+    before being upscaled to the frame size.
+    """
+    # ImageNet statistics used by the u2net family, in BGR order so the
+    # frame never has to be converted to RGB
+    MEAN_BGR = np.array([0.406, 0.456, 0.485], dtype=np.float32)
+    STD_BGR = np.array([0.225, 0.224, 0.229], dtype=np.float32)
+    DEFAULT_INPUT_SIZE = (320, 320)
+
+    def __init__(self, session, input_size=None, model=None):
+        # rembg sessions wrap an onnxruntime.InferenceSession
+        self.ort_session = getattr(session, 'inner_session', session)
+        self.model = model
+        if model is not None:
+            # Registry statistics are RGB; the frame stays BGR
+            self.mean_bgr = np.array(model.mean[::-1], dtype=np.float32)
+            self.std_bgr = np.array(model.std[::-1], dtype=np.float32)
+        else:
+            self.mean_bgr = self.MEAN_BGR
+            self.std_bgr = self.STD_BGR
+        model_input = self.ort_session.get_inputs()[0]
+        self.input_name = model_input.name
+        static_size = self._static_input_size(model_input.shape)
+        # Dynamic axes accept any input size; start from the size the model was trained on
+        self.dynamic_input = static_size is None
+        self.input_size = (input_size or static_size or (model.input_size if model else None)
+                           or self.DEFAULT_INPUT_SIZE)
+        self.base_input_size = self.input_size
+        self._requested_input_size = self.input_size
+        self.kernel = np.ones((3, 3), np.uint8)
+        self.last_inference_ms = 0.0
+        self._allocate_buffers()
+
+    def _static_input_size(self, shape):
+        """Return (width, height) from a [N, C, H, W] model input shape, or None for dynamic axes"""
+        try:
+            height, width = int(shape[2]), int(shape[3])
+            return (width, height)
+        except (TypeError, ValueError, IndexError):
+            return None
+
+    def _allocate_buffers(self):
+        width, height = self.input_size
+        self._hwc = np.empty((height, width, 3), dtype=np.float32)
+        self._tensor = np.empty((1, 3, height, width), dtype=np.float32)
+        self._offset = self.mean_bgr / self.std_bgr
+
+    def set_input_size(self, input_size):
+        """Change the inference resolution (only for models with dynamic axes).
+
+        Safe to call from the GUI thread: the new size is picked up by the
+        next prediction on the worker thread.
+        """
+        self._requested_input_size = tuple(input_size)
+
+    def apply_requested_size(self):
+        """Switch to the input size last passed to set_input_size, if it changed"""
+        if self._requested_input_size != self.input_size:
+            self.input_size = self._requested_input_size
+            self._allocate_buffers()
+
+    def preprocess(self, frame, out=None):
+        """Downscale and normalize a BGR frame into the model input tensor.
+
+        out may be a (1, 3, H, W) float32 array to fill instead of the
+        engine's own tensor, e.g. one per frame in flight.
+        """
+        small = cv2.resize(frame, self.input_size, interpolation=cv2.INTER_AREA)
+        # Same normalization as rembg: scale by the brightest pixel, then
+        # (x - mean) / std, folded into one multiply and one subtract
+        scale = 1.0 / (max(int(small.max()), 1) * self.std_bgr)
+        np.multiply(small, scale, out=self._hwc, casting='unsafe')
+        np.subtract(self._hwc, self._offset, out=self._hwc)
+        # HWC BGR -> NCHW RGB
+        tensor = self._tensor if out is None else out
+        tensor[0] = self._hwc[:, :, ::-1].transpose(2, 0, 1)
+        return tensor
+
+    def infer(self, tensor):
+        """Run the model and return the raw single-channel prediction"""
+        start = time.perf_counter()
+        outputs = self.ort_session.run(None, {self.input_name: tensor})
+        self.last_inference_ms = (time.perf_counter() - start) * 1000
+        return outputs[0][0, 0]
+
+    def postprocess(self, pred, frame_size):
+        """Turn a raw prediction into a uint8 mask of the given (width, height)"""
+        lo = float(pred.min())
+        hi = float(pred.max())
+        mask = ((pred - lo) * (255.0 / max(hi - lo, 1e-6))).astype(np.uint8)
+        
+        # Refine at model resolution where morphology is cheap
+        mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, self.kernel)
+        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, self.kernel)
+        mask = cv2.GaussianBlur(mask, (3, 3), 0)
+        
+        return cv2.resize(mask, frame_size, interpolation=cv2.INTER_LINEAR)
+
+    def predict_mask(self, frame):
+        """Return a uint8 foreground mask with the same size as the frame"""
+        self.apply_requested_size()
+        pred = self.infer(self.preprocess(frame))
+        return self.postprocess(pred, (frame.shape[1], frame.shape[0]))
+
+class SegmentationPipeline:
+    """Runs SegmentationEngine as three overlapping stages on their own threads.
+
+    Preprocessing (resize/normalize), ONNX inference and postprocessing
+    (morphology/blur/upscale) each have a thread, so one frame can be
+    normalized while the previous one is in the model and the one before
+    is being refined. At most in_flight frames are between submit() and
+    the result callback; every in-flight frame has its own input tensor.
+    One frame in flight keeps the mask latency of a sequential loop while
+    the stages still run off the caller's thread; more frames overlap the
+    stages for throughput, but each one adds a frame of latency.
+    When the pipeline is full, 'drop-oldest' replaces the oldest frame
+    still waiting for preprocessing (freshest result, for live preview)
+    and 'drop-newest' rejects the new frame. Results are delivered in
+    submission order to on_result(mask) on the postprocessing thread.
+    Every frame keeps the engine it was preprocessed with, so set_engine
+    swaps the model between frames without restarting the threads.
+    """
+    DROP_POLICIES = ('drop-oldest', 'drop-newest')
+
+    def __init__(self, engine, on_result, in_flight=1, drop_policy='drop-oldest'):
+        if drop_policy not in self.DROP_POLICIES:
+            raise ValueError(f"Unknown drop policy {drop_policy!r} (expected one of {self.DROP_POLICIES})")
+        self.engine = engine
+        self.on_result = on_result
+        self.in_flight = max(1, int(in_flight))
+        self.drop_policy = drop_policy
+        self._tensors = [None] * self.in_flight
+        self._next_tensor = 0
+        self._waiting = deque()
+        self._condition = threading.Condition()
+        self._active = 0  # Frames submitted and not yet delivered
+        self._infer_queue = queue.Queue()
+        self._post_queue = queue.Queue()
+        self._threads = []
+        self.running = False
+        self.frames_dropped = 0
+        self.frames_completed = 0
+        self.last_latency_ms = 0.0
+
+    def start(self):
+        self.running = True
+        self._threads = [threading.Thread(target=target, name=f"segmentation-{name}", daemon=True)
+                         for name, target in (("preprocess", self._preprocess_loop),
+                                              ("inference", self._infer_loop),
+                                              ("postprocess", self._postprocess_loop))]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self):
+        """Stop the stage threads; frames still in flight are discarded"""
+        with self._condition:
+            self.running = False
+            self._waiting.clear()
+            self._condition.notify_all()
+        self._infer_queue.put(None)
+        self._post_queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def set_engine(self, engine):
+        """Use engine for every frame not yet preprocessed"""
+        self.engine = engine
+
+    def pending(self):
+        """Number of frames submitted and not yet delivered"""
+        return self._active
+
+    def submit(self, frame):
+        """Queue a frame (owned by the pipeline from now on); False if it was dropped"""
+        with self._condition:
+            if not self.running:
+                return False
+            if self._active >= self.in_flight:
+                if self.drop_policy == 'drop-newest' or not self._waiting:
+                    self.frames_dropped += 1
+                    return False
+                self._waiting.popleft()
+                self._active -= 1
+                self.frames_dropped += 1
+            self._waiting.append((time.perf_counter(), frame))
+            self._active += 1
+            self._condition.notify()
+            return True
+
+    def _tensor_for(self, shape):
+        # A slot is reused only after in_flight newer frames were accepted,
+        # so the frame that used it has already left the inference stage
+        index = self._next_tensor
+        self._next_tensor = (index + 1) % self.in_flight
+        tensor = self._tensors[index]
+        if tensor is None or tensor.shape != shape:
+            tensor = np.empty(shape, dtype=np.float32)
+            self._tensors[index] = tensor
+        return tensor
+
+    def _finish(self):
+        with self._condition:
+            self._active -= 1
+
+    def _preprocess_loop(self):
+        while True:
+            with self._condition:
+                while self.running and not self._waiting:
+                    self._condition.wait()
+                if not self.running:
+                    return
+                submitted, frame = self._waiting.popleft()
+            engine = self.engine
+            try:
+                engine.apply_requested_size()
+                width, height = engine.input_size
+                tensor = engine.preprocess(frame, out=self._tensor_for((1, 3, height, width)))
+                self._infer_queue.put((engine, submitted, (frame.shape[1], frame.shape[0]), tensor))
+            except Exception as e:
+                logger.error(f"Segmentation preprocessing error: {e}")
+                self._finish()
+
+    def _infer_loop(self):
+        while True:
+            item = self._infer_queue.get()
+            if item is None:
+                return
+            engine, submitted, frame_size, tensor = item
+            try:
+                self._post_queue.put((engine, submitted, frame_size, engine.infer(tensor)))
+            except Exception as e:
+                logger.error(f"Segmentation inference error: {e}")
+                self._finish()
+
+    def _postprocess_loop(self):
+        while True:
+            item = self._post_queue.get()
+            if item is None:
+                return
+            engine, submitted, frame_size, pred = item
+            try:
+                mask = engine.postprocess(pred, frame_size)
+                self.last_latency_ms = (time.perf_counter() - submitted) * 1000
+                self.frames_completed += 1
+                self._finish()
+                self.on_result(mask)
+            except Exception as e:
+                logger.error(f"Segmentation postprocessing error: {e}")
+                self._finish()
+
+def segmentation_options(spec):
+    """Parse a pipeline spec such as "drop-oldest:1" or "drop-newest:3".
+
+    The number is the count of frames in flight; invalid specs fall back
+    to drop-oldest with one frame in flight.
+    """
+    policy, _, value = (spec or 'drop-oldest').strip().lower().partition(':')
+    try:
+        in_flight = int(value) if value else 1
+    except ValueError:
+        logger.warning(f"Invalid segmentation setting '{spec}', using drop-oldest:1")
+        return {'in_flight': 1, 'drop_policy': 'drop-oldest'}
+    if policy not in SegmentationPipeline.DROP_POLICIES:
+        logger.warning(f"Unknown segmentation drop policy '{policy}', using drop-oldest")
+        policy = 'drop-oldest'
+    return {'in_flight': max(1, in_flight), 'drop_policy': policy}
+
+class AlphaCompositor:
+    """Blends a foreground and a background through a single-channel mask.
+
+    Uses cv2.blendLinear, which takes per-pixel float32 weights for a
+    one-channel mask and runs multi-threaded inside OpenCV. The weight
+    planes are reused between calls as long as the frame size is unchanged.
+    """
+
+    def __init__(self):
+        self._shape = None
+        self._fg_weights = None
+        self._bg_weights = None
+        self._out = None
+
+    def _ensure_buffers(self, shape):
+        if self._shape != shape:
+            h, w = shape[:2]
+            self._fg_weights = np.empty((h, w), dtype=np.float32)
+            self._bg_weights = np.empty((h, w), dtype=np.float32)
+            self._out = np.empty(shape, dtype=np.uint8)
+            self._shape = shape
+
+    def composite(self, fg, mask, bg, out=None):
+        """Return fg * mask + bg * (1 - mask) with mask given as uint8 0-255.
+
+        out may be fg itself to blend in place; by default an internal
+        buffer is reused, so copy the result if it must outlive the next call.
+        """
+        self._ensure_buffers(fg.shape)
+        if out is None:
+            out = self._out
+        cv2.multiply(mask, 1.0 / 255.0, dst=self._fg_weights, dtype=cv2.CV_32F)
+        cv2.subtract(1.0, self._fg_weights, dst=self._bg_weights)
+        cv2.blendLinear(fg, bg, self._fg_weights, self._bg_weights, dst=out)
+        return out
+
+class BackgroundCache:
+    """Background images resized once per camera resolution.
+
+    Originals are read from disk on first use. Resized copies are keyed by
+    (background name, (width, height), colour format) and evicted in LRU
+    order, so switching backgrounds or cameras never resizes on the hot path.
+    """
+
+    def __init__(self, files, fallback_factory=None, max_entries=16):
+        self.files = files
+        self.fallback_factory = fallback_factory
+        self.max_entries = max_entries
+        self._originals = {}
+        self._resized = OrderedDict()
+
+    def names(self):
+        return list(self.files)
+
+    def original(self, name):
+        """Return the full-resolution BGR image for a background"""
+        if name not in self._originals:
+            img = None
+            full_path = resource_path(self.files[name])
+            if os.path.exists(full_path):
+                img = cv2.imread(full_path)
+            if img is None and self.fallback_factory:
+                # Fallback to generated backgrounds
+                img = self.fallback_factory(name)
+            self._originals[name] = img
+        return self._originals[name]
+
+    def get(self, name, size, color_format='bgr'):
+        """Return the background resized to size=(width, height)"""
+        key = (name, tuple(size), color_format)
+        cached = self._resized.get(key)
+        if cached is not None:
+            self._resized.move_to_end(key)
+            return cached
+
+        img = self.original(name)
+        if img is None:
+            return None
+
+        width, height = size
+        if (img.shape[1], img.shape[0]) != (width, height):
+            # Area averaging for downscaling, bicubic when the camera is larger
+            shrinking = img.shape[1] > width or img.shape[0] > height
+            interpolation = cv2.INTER_AREA if shrinking else cv2.INTER_CUBIC
+            img = cv2.resize(img, (width, height), interpolation=interpolation)
+        if color_format == 'rgb':
+            img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+
+        self._resized[key] = img
+        if len(self._resized) > self.max_entries:
+            self._resized.popitem(last=False)
+        return img
+
+BACKGROUND_FILES = {
+    "maple": "backgrounds/maple_forest.jpg",
+    "flag": "backgrounds/canada_flag.jpg",
+    "toronto": "backgrounds/toronto_skyline.jpg",
+    "niagara": "backgrounds/niagara_falls.jpg",
+    "campfire": "backgrounds/campfire.jpg",
+    "mountains": "backgrounds/rocky_mountains.jpg",
+    "northern_lights": "backgrounds/northern_lights.jpg"
+}
+
+def create_fallback_background(name):
+    """Create fallback backgrounds if images not found"""
+    if name == "maple":
+        return create_maple_leaf_bg()
+    elif name == "flag":
+        return create_canada_flag_bg()
+    elif name == "toronto":
+        return create_toronto_bg()
+    elif name == "niagara":
+        return create_niagara_bg()
+    elif name == "campfire":
+        return create_campfire_bg()
+    elif name == "mountains":
+        return create_mountains_bg()
+    else:
+        # Default background
+        bg = np.ones((480, 640, 3), dtype=np.uint8) * 255
+        bg[:, :] = [200, 150, 100]
+        return bg
+
+def create_maple_leaf_bg():
+    """Create maple leaf pattern background"""
+    bg = np.ones((480, 640, 3), dtype=np.uint8) * 255
+    # Red background
+    bg[:, :] = [0, 0, 255]
+    # Add maple leaf text pattern
+    font = cv2.FONT_HERSHEY_SIMPLEX
+    for y in range(0, 480, 80):
+        for x in range(0, 640, 100):
+            cv2.putText(bg, "MAPLE", (x, y), font, 1, (255, 255, 255), 2)
+    return bg
+
+def create_canada_flag_bg():
+    """Create Canada flag background"""
+    bg = np.ones((480, 640, 3), dtype=np.uint8) * 255
+    # Red bars on sides
+    bg[:, :160] = [0, 0, 255]
+    bg[:, 480:] = [0, 0, 255]
+    # Add maple leaf text in center
+    font = cv2.FONT_HERSHEY_SIMPLEX
+    cv2.putText(bg, "CANADA", (240, 240), font, 2, (0, 0, 255), 3)
+    return bg
+
+def create_toronto_bg():
+    """Create Toronto skyline background"""
+    bg = np.ones((480, 640, 3), dtype=np.uint8) * 255
+    # Sky gradient
+    for i in range(300):
+        bg[i, :] = [255 - i//2, 150 - i//3, 100]
+    # Simple skyline
+    bg[300:, :] = [50, 50, 50]
+    # CN Tower
+    bg[100:300, 310:330] = [100, 100, 100]
+    return bg
+
+def create_niagara_bg():
+    """Create Niagara Falls background"""
+    bg = np.ones((480, 640, 3), dtype=np.uint8) * 255
+    # Blue water effect
+    for i in range(480):
+        bg[i, :] = [200 - i//4, 100 + i//4, 50]
+    return bg
+
+def create_campfire_bg():
+    """Create camping/firepit background"""
+    bg = np.zeros((480, 640, 3), dtype=np.uint8)
+    # Dark forest
+    bg[:300, :] = [20, 40, 20]
+    # Fire glow
+    cv2.circle(bg, (320, 350), 100, (0, 100, 255), -1)
+    cv2.circle(bg, (320, 350), 80, (0, 150, 255), -1)
+    return bg
+
+def create_mountains_bg():
+    """Create mountain background"""
+    bg = np.ones((480, 640, 3), dtype=np.uint8) * 255
+    # Sky
+    bg[:300, :] = [200, 150, 100]
+    # Mountains
+    points = np.array([[0, 300], [200, 150], [400, 200], [640, 300], [640, 480], [0, 480]])
+    cv2.fillPoly(bg, [points], (100, 100, 100))
+    return bg
+
+def create_background_cache():
+    """Background cache for the Canadian scenes, with generated fallbacks for missing images"""
+    return BackgroundCache(BACKGROUND_FILES, fallback_factory=create_fallback_background)
+
+class BackgroundRemovalWorker(QObject):
+    """Background removal on a pipelined SegmentationPipeline.
+
+    Only the segmentation mask is published; the GUI composites it onto
+    the live frame every tick, so motion stays fluid even when inference
+    runs slower than the camera. mask_ready is emitted from the
+    postprocessing thread and delivered to the GUI thread by Qt.
+    """
+    mask_ready = pyqtSignal(np.ndarray)
+    
+    def __init__(self, session, in_flight=1, drop_policy='drop-oldest', model=None):
+        super().__init__()
+        self.session = session
+        self.engine = SegmentationEngine(session, model=model)
+        self.pipeline = SegmentationPipeline(self.engine, self.mask_ready.emit,
+                                             in_flight=in_flight, drop_policy=drop_policy)
+        self.enabled = False
+    
+    def set_session(self, session, model=None):
+        """Hot-swap the model; frames already in flight finish on the old one"""
+        self.session = session
+        self.engine = SegmentationEngine(session, model=model)
+        self.pipeline.set_engine(self.engine)
+    
+    def start(self):
+        self.pipeline.start()
+    
+    def submit(self, frame):
+        """Hand a frame to the pipeline; False if it was dropped"""
+        if not self.enabled:
+            return False
+        return self.pipeline.submit(frame)
+    
+    def stop(self):
+        """Stop the pipeline threads"""
+        self.pipeline.stop()
+
+CAMERA_PROBE_TIMEOUT = 4.0  # Seconds a device may take to open before discovery gives up on it
+
+def open_camera(index):
+    """Open a camera with the backend that works best on this platform"""
+    if platform.system() == "Windows":
+        # Windows: Use DirectShow backend for better compatibility
+        cap = cv2.VideoCapture(index, cv2.CAP_DSHOW)
+        # Set buffer size to reduce latency on Windows
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    else:
+        # macOS/Linux: Use default backend
+        cap = cv2.VideoCapture(index)
+    return cap
+
+def probe_camera(index):
+    """Open a device and read what it delivers; returns (info, cap), or (None, None) if it does not open"""
+    start = time.perf_counter()
+    try:
+        cap = open_camera(index)
+        if not cap.isOpened():
+            cap.release()
+            return None, None
+        try:
+            backend = cap.getBackendName()
+        except cv2.error:
+            backend = ''
+        info = {
+            'index': index,
+            'width': int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            'height': int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            'fps': round(cap.get(cv2.CAP_PROP_FPS), 1),
+            'backend': backend,
+            'open_ms': round((time.perf_counter() - start) * 1000),
+        }
+        return info, cap
+    except Exception as e:
+        logger.warning(f"Camera {index} probe failed: {e}")
+        return None, None
+
+def camera_candidates():
+    """(index, name, uid) of the devices to probe, from QtMultimedia when it is available"""
+    try:
+        from PyQt5.QtMultimedia import QCameraInfo
+    except ImportError:
+        print("QCameraInfo not available, using basic detection")
+        max_cameras = 3 if platform.system() == "Darwin" else 5
+        return [(i, f"Camera {i}", '') for i in range(max_cameras)]
+    qt_cameras = QCameraInfo.availableCameras()
+    if platform.system() == "Darwin":
+        # macOS: Sort by UID to match OpenCV order
+        qt_cameras = sorted(qt_cameras, key=lambda c: c.deviceName())
+    # Windows/Linux: Use Qt order as-is
+    return [(idx, info.description(), info.deviceName()) for idx, info in enumerate(qt_cameras)]
+
+def discover_cameras(candidates, keep=None, timeout=CAMERA_PROBE_TIMEOUT):
+    """Probe (index, name, uid) candidates concurrently.
+
+    Returns (cameras, selected, cap): the info dicts of the devices that
+    opened, in candidate order, plus the info and still-open handle of
+    device keep (or of the first camera found when keep did not open) so
+    the caller does not open it a second time. Every other handle is
+    released. A device that takes
+    longer than timeout to open is skipped, and its handle is released
+    whenever the open finally returns.
+    """
+    # Pool threads are daemons, so a device stuck in open() never blocks exit
+    from multiprocessing.pool import ThreadPool
+    if not candidates:
+        return [], None, None
+    lock = threading.Lock()
+    finished = {}
+    abandoned = set()
+
+    def probe(index):
+        result = probe_camera(index)
+        with lock:
+            if index not in abandoned:
+                finished[index] = result
+                return
+        if result[1] is not None:
+            result[1].release()
+
+    pool = ThreadPool(len(candidates))
+    pending = [(candidate, pool.apply_async(probe, (candidate[0],))) for candidate in candidates]
+    pool.close()
+    deadline = time.perf_counter() + timeout
+    found = []
+    for (index, name, uid), result in pending:
+        result.wait(max(0.0, deadline - time.perf_counter()))
+        with lock:
+            info, cap = finished.pop(index, (None, None))
+            if not result.ready():
+                abandoned.add(index)
+                logger.warning(f"Camera {index} ({name}) did not open within {timeout:.0f}s, skipping it")
+        if info is not None:
+            info.update(name=name, uid=uid)
+            found.append((info, cap))
+
+    selected, kept = next(((info, cap) for info, cap in found if info['index'] == keep),
+                          found[0] if found else (None, None))
+    for info, cap in found:
+        if cap is not kept:
+            cap.release()
+    return [info for info, _ in found], selected, kept
+
+# Modes tried when a camera is seen for the first time. OpenCV cannot list a
+# device's modes, so each one is requested and kept if a frame comes back in it.
+CAMERA_FOURCCS = ('MJPG', 'YUYV')
+CAMERA_RESOLUTIONS = ((1920, 1080), (1280, 720), (960, 540), (640, 480))
+CAMERA_PROBE_FPS = 60  # Drivers clamp this to the fastest rate of each mode
+CAMERA_FPS_TOLERANCE = 0.8  # Share of the frame rate a mode must really deliver
+DEFAULT_CAMERA_TARGET = '1280x720@30:MJPG'
+
+def camera_target(spec):
+    """Parse a capture target such as "1280x720@30:MJPG", "1920x1080@60" or "640x480".
+
+    Frame rate and pixel format are optional (30 fps, MJPG); invalid specs
+    fall back to 1280x720@30:MJPG.
+    """
+    match = re.fullmatch(r'\s*(\d+)x(\d+)(?:@(\d+))?(?::(\w{4}))?\s*', spec or DEFAULT_CAMERA_TARGET)
+    if not match:
+        logger.warning(f"Invalid camera setting '{spec}', using {DEFAULT_CAMERA_TARGET}")
+        return camera_target(DEFAULT_CAMERA_TARGET)
+    width, height, fps, fourcc = match.groups()
+    return {'width': int(width), 'height': int(height), 'fps': int(fps or 30),
+            'fourcc': (fourcc or 'MJPG').upper()}
+
+def camera_mode_label(mode):
+    label = f"{mode['width']}x{mode['height']}"
+    if mode.get('fps'):
+        label += f" @{mode['fps']:g}"
+    if mode.get('fourcc'):
+        label += f" {mode['fourcc']}"
+    return label
+
+def read_camera_mode(cap):
+    """The mode an open capture reports (fourcc is empty when the backend does not say)"""
+    code = int(cap.get(cv2.CAP_PROP_FOURCC))
+    fourcc = ''.join(chr((code >> shift) & 0xFF) for shift in (0, 8, 16, 24)).strip('\0 ')
+    return {
+        'width': int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+        'height': int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        'fps': round(cap.get(cv2.CAP_PROP_FPS), 1),
+        'fourcc': fourcc if fourcc.isprintable() else '',
+    }
+
+def apply_camera_mode(cap, mode, fps=None):
+    """Request a mode and return what the device reports afterwards"""
+    # The pixel format has to be set before the size for V4L2 and DirectShow to honour it
+    if mode.get('fourcc'):
+        cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*mode['fourcc']))
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, mode['width'])
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, mode['height'])
+    if fps or mode.get('fps'):
+        cap.set(cv2.CAP_PROP_FPS, fps or mode['fps'])
+    return read_camera_mode(cap)
+
+def probe_camera_modes(cap):
+    """Modes the device really delivers frames in, from CAMERA_FOURCCS x CAMERA_RESOLUTIONS"""
+    modes = []
+    for fourcc in CAMERA_FOURCCS:
+        for width, height in CAMERA_RESOLUTIONS:
+            actual = apply_camera_mode(cap, {'width': width, 'height': height, 'fourcc': fourcc},
+                                       fps=CAMERA_PROBE_FPS)
+            ret, frame = cap.read()
+            # Backends happily report sizes they then do not deliver
+            if not ret or frame is None or frame.shape[:2] != (height, width):
+                continue
+            if actual not in modes:
+                modes.append(actual)
+    return modes
+
+def measure_camera_fps(cap, seconds=1.0, frames=15):
+    """Frame rate the device actually delivers in its current mode"""
+    # The first read after a mode change waits for the stream to restart
+    if not cap.read()[0]:
+        return 0.0
+    count = 0
+    start = time.perf_counter()
+    while count < frames and time.perf_counter() - start < seconds:
+        if cap.read()[0]:
+            count += 1
+    elapsed = time.perf_counter() - start
+    return round(count / elapsed, 1) if elapsed > 0 else 0.0
+
+def rank_camera_modes(modes, target):
+    """Modes from best to worst for a target from camera_target().
+
+    Modes that reach the target frame rate (measured when known) come
+    first, then the largest size not above the target, then the target's
+    pixel format.
+    """
+    target_pixels = target['width'] * target['height']
+
+    def score(mode):
+        fps = mode.get('measured_fps', mode.get('fps')) or target['fps']
+        pixels = mode['width'] * mode['height']
+        fits = pixels <= target_pixels
+        return (fps >= target['fps'] * CAMERA_FPS_TOLERANCE, fits, pixels if fits else -pixels,
+                mode.get('fourcc') == target['fourcc'], -abs(fps - target['fps']))
+    return sorted(modes, key=score, reverse=True)
+
+def configure_camera(cap, stored, target, attempts=3):
+    """Put an open camera in its best mode for target.
+
+    stored is what was saved for the device ({'modes', 'mode', 'pinned'}).
+    A pinned mode is applied as is. Otherwise the device's modes are
+    probed if unknown, and the best ones are tried in turn until one
+    delivers close to its frame rate; measured rates are kept with the
+    modes so later launches pick the right one without measuring.
+    Returns the updated entry, with the mode the device reports in "mode".
+    """
+    entry = {'modes': [], 'mode': None, 'pinned': False}
+    entry.update(stored or {})
+    start = time.perf_counter()
+    if entry['pinned'] and entry['mode']:
+        mode = entry['mode']
+    else:
+        if not entry['modes']:
+            entry['modes'] = probe_camera_modes(cap)
+            logger.info(f"Camera modes: {', '.join(camera_mode_label(m) for m in entry['modes']) or 'none found'}")
+        mode = None
+        for candidate in rank_camera_modes(entry['modes'], target)[:attempts]:
+            expected = min(candidate['fps'] or target['fps'], target['fps'])
+            if 'measured_fps' not in candidate:
+                apply_camera_mode(cap, candidate, fps=expected)
+                candidate['measured_fps'] = measure_camera_fps(cap)
+            if candidate['measured_fps'] >= CAMERA_FPS_TOLERANCE * expected:
+                mode = candidate
+                break
+        if mode is None and entry['modes']:
+            mode = rank_camera_modes(entry['modes'], target)[0]
+    if mode:
+        # Automatic choices run no faster than the target; a pinned mode runs at its own rate
+        fps = mode['fps'] if entry['pinned'] else min(mode['fps'] or target['fps'], target['fps'])
+        actual = apply_camera_mode(cap, mode, fps=fps)
+        entry['mode'] = {key: mode[key] for key in ('width', 'height', 'fps', 'fourcc')}
+        logger.info(f"Camera mode {camera_mode_label(actual)} "
+                    f"(negotiated in {(time.perf_counter() - start) * 1000:.0f} ms)")
+    return entry
+
+class CameraCache:
+    """Last known good cameras and the selected one, in cameras.json in the app data directory.
+
+    Lets the camera picker list the devices right away on launch while
+    discovery runs, and reopens the camera that was used last. Each
+    device's probed modes and chosen (or pinned) mode are kept under
+    "modes" so the probe runs only once per device.
+    """
+    CACHE_FILE = 'cameras.json'
+
+    def __init__(self, path=None):
+        self.path = Path(path or os.path.join(app_data_dir(), self.CACHE_FILE))
+        self.cameras = []
+        self.selected = None  # {'index': ..., 'uid': ...}
+        self.modes = {}  # device key -> {'modes': [...], 'mode': {...}, 'pinned': bool}
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+            self.cameras = list(data.get('cameras', []))
+            self.selected = data.get('selected')
+            self.modes = dict(data.get('modes', {}))
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, AttributeError) as e:
+            logger.warning(f"Cannot read {self.path}, discovering cameras from scratch: {e}")
+
+    def save(self):
+        try:
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump({'cameras': self.cameras, 'selected': self.selected, 'modes': self.modes},
+                          f, indent=2)
+        except OSError as e:
+            logger.warning(f"Cannot write {self.path}: {e}")
+
+    def update(self, cameras):
+        """Replace the known cameras with a fresh discovery result"""
+        self.cameras = cameras
+        self.save()
+
+    def select(self, camera):
+        """Remember the camera the user picked"""
+        self.selected = {'index': camera['index'], 'uid': camera.get('uid', '')}
+        self.save()
+
+    @staticmethod
+    def device_key(camera):
+        return camera.get('uid') or f"index:{camera['index']}"
+
+    def camera_modes(self, camera):
+        """Saved mode entry of a camera, or None before it was first probed"""
+        return self.modes.get(self.device_key(camera))
+
+    def set_camera_modes(self, camera, entry):
+        self.modes[self.device_key(camera)] = entry
+        self.save()
+
+    def preferred_index(self, candidates):
+        """Device index of the last selected camera among (index, name, uid) candidates"""
+        if not self.selected:
+            return None
+        uid = self.selected.get('uid')
+        for index, _, candidate_uid in candidates:
+            # Indices shift when devices are plugged in; the uid does not
+            if uid and candidate_uid == uid:
+                return index
+        return self.selected.get('index')
+
+class CameraDiscoveryWorker(QThread):
+    """Probes the cameras off the GUI thread and hands back the preferred one open and configured"""
+    # Camera info dicts, selected info, its open cv2.VideoCapture, its mode entry for CameraCache
+    discovered = pyqtSignal(list, object, object, object)
+
+    def __init__(self, candidates, keep=None, modes=None, target=None, timeout=CAMERA_PROBE_TIMEOUT):
+        super().__init__()
+        self.candidates = candidates
+        self.keep = keep
+        # Copy of CameraCache.modes; the cache itself is only touched on the GUI thread
+        self.modes = json.loads(json.dumps(modes or {}))
+        self.target = target or camera_target(None)
+        self.timeout = timeout
+        self.cap = None
+
+    def run(self):
+        start = time.perf_counter()
+        cameras, selected, cap = discover_cameras(self.candidates, self.keep, self.timeout)
+        logger.info(f"Found {len(cameras)} of {len(self.candidates)} cameras "
+                    f"in {(time.perf_counter() - start) * 1000:.0f} ms")
+        entry = None
+        if cap is not None:
+            try:
+                entry = configure_camera(cap, self.modes.get(CameraCache.device_key(selected)), self.target)
+                selected.update(read_camera_mode(cap))
+            except Exception as e:
+                logger.warning(f"Camera mode negotiation failed, using the default mode: {e}")
+        self.cap = cap
+        self.discovered.emit(cameras, selected, cap, entry)
+
+class CameraOpenWorker(QThread):
+    """Opens a camera and negotiates its mode off the GUI thread, then waits for its first frame"""
+    opened = pyqtSignal(int, object, object, object)  # device index, cv2.VideoCapture, mode entry, first frame
+    failed = pyqtSignal(int, str)  # device index, error message
+    FIRST_FRAME_TIMEOUT = 5.0
+
+    def __init__(self, index, modes=None, target=None):
+        super().__init__()
+        self.index = index
+        # Copy of the device's CameraCache entry; the cache is only touched on the GUI thread
+        self.modes = json.loads(json.dumps(modes)) if modes else None
+        self.target = target or camera_target(None)
+        self.cap = None
+
+    def run(self):
+        start = time.perf_counter()
+        cap = None
+        try:
+            cap = open_camera(self.index)
+            if not cap.isOpened():
+                raise RuntimeError("the device did not open")
+            entry = None
+            try:
+                entry = configure_camera(cap, self.modes, self.target)
+            except Exception as e:
+                logger.warning(f"Camera mode negotiation failed, using the default mode: {e}")
+            frame = None
+            deadline = time.perf_counter() + self.FIRST_FRAME_TIMEOUT
+            while frame is None and time.perf_counter() < deadline:
+                ret, frame = cap.read()
+                if not ret:
+                    frame = None
+            if frame is None:
+                raise RuntimeError("no frames from the device")
+        except Exception as e:
+            if cap is not None:
+                cap.release()
+            self.failed.emit(self.index, str(e))
+            return
+        logger.info(f"Camera {self.index} streaming after {(time.perf_counter() - start) * 1000:.0f} ms")
+        self.cap = cap
+        self.opened.emit(self.index, cap, entry, frame)
+
+class CameraModeWorker(QThread):
+    """Negotiates (or pins) the mode of an already open camera off the GUI thread"""
+    configured = pyqtSignal(object, object, object)  # cv2.VideoCapture, mode entry, mode the device reports
+    failed = pyqtSignal(object, str)  # cv2.VideoCapture, error message
+
+    def __init__(self, cap, entry, target):
+        super().__init__()
+        self.cap = cap
+        # Copy of the device's CameraCache entry; the cache is only touched on the GUI thread
+        self.entry = json.loads(json.dumps(entry))
+        self.target = target
+
+    def run(self):
+        start = time.perf_counter()
+        try:
+            entry = configure_camera(self.cap, self.entry, self.target)
+            reported = read_camera_mode(self.cap)
+        except Exception as e:
+            self.failed.emit(self.cap, str(e))
+            return
+        logger.info(f"Camera mode set in {(time.perf_counter() - start) * 1000:.0f} ms")
+        self.configured.emit(self.cap, entry, reported)
+
+class CameraCaptureWorker(QThread):
+    """Worker thread that reads camera frames as fast as the device delivers them"""
+
+    def __init__(self, cap, first_frame=None):
+        super().__init__()
+        self.cap = cap
+        self.running = True
+        # In standby the device keeps streaming but frames are only grabbed,
+        # not decoded, so switching back to it is instant and cheap
+        self.standby = False
+        # Single-slot buffer: (sequence, capture timestamp, frame). The tuple is
+        # replaced with one reference assignment, so readers never see a torn
+        # value and never need a lock. Older frames are simply overwritten.
+        self._latest = (0, 0.0, None)
+        self.frames_captured = 0
+        self.read_failures = 0
+        if first_frame is not None:
+            # Frame read while the camera was being opened; shown right away
+            self.frames_captured = 1
+            self._latest = (1, time.perf_counter(), first_frame)
+
+    def latest(self):
+        """Return the newest (sequence, timestamp, frame) tuple"""
+        return self._latest
+
+    def set_standby(self, standby):
+        """Grab without decoding (standby) or go back to delivering frames"""
+        if standby:
+            # Drop the last frame so it is not shown stale when the camera becomes active again
+            self._latest = (self.frames_captured, 0.0, None)
+        self.standby = standby
+
+    def run(self):
+        """Main capture loop"""
+        while self.running:
+            try:
+                if self.standby:
+                    if not self.cap.grab():
+                        time.sleep(0.01)
+                    continue
+                ret, frame = self.cap.read()
+                if not ret or frame is None:
+                    self.read_failures += 1
+                    time.sleep(0.01)
+                    continue
+
+                timestamp = time.perf_counter()
+                self.frames_captured += 1
+                self._latest = (self.frames_captured, timestamp, frame)
+            except Exception as e:
+                logger.error(f"Camera capture error: {e}")
+                time.sleep(0.05)
+
+    def stop(self):
+        """Stop the capture thread (the caller still owns the capture device)"""
+        self.running = False
+        self.wait()
+
+class VideoDisplayWidget(QWidget):
+    """Shows BGR frames without an RGB copy or a pre-scaled pixmap.
+
+    The frame buffer is wrapped in a Format_BGR888 QImage as is, and scaling
+    to the widget size happens while painting. The widget only repaints when
+    a new frame or message arrives (or Qt asks for an expose).
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._frame = None
+        self._image = None
+        self._text = ""
+        self.smooth = True
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+        self.setMinimumSize(320, 240)
+
+    def set_frame(self, frame):
+        """Display a BGR frame; the array must stay untouched until the next frame"""
+        if not frame.flags['C_CONTIGUOUS']:
+            frame = np.ascontiguousarray(frame)
+        h, w = frame.shape[:2]
+        # Keep a reference so the QImage never outlives its pixel data
+        self._frame = frame
+        self._image = QImage(frame.data, w, h, frame.strides[0], QImage.Format_BGR888)
+        self._text = ""
+        self.update()
+
+    def setText(self, text):
+        """Show a message instead of video"""
+        self._frame = None
+        self._image = None
+        self._text = text
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), Qt.black)
+        if self._image is not None:
+            # Fit the frame into the widget, keeping the aspect ratio
+            size = self._image.size().scaled(self.size(), Qt.KeepAspectRatio)
+            x = (self.width() - size.width()) // 2
+            y = (self.height() - size.height()) // 2
+            painter.setRenderHint(QPainter.SmoothPixmapTransform, self.smooth)
+            painter.drawImage(QRect(x, y, size.width(), size.height()), self._image)
+        elif self._text:
+            painter.setPen(Qt.white)
+            painter.drawText(self.rect(), Qt.AlignCenter, self._text)
+        painter.end()
+
+class RingBuffer:
+    """Fixed-size ring buffer of floats; memory stays constant however long the app runs"""
+
+    def __init__(self, capacity):
+        self.data = np.zeros(capacity, dtype=np.float64)
+        self.count = 0  # Total number of values ever appended
+
+    def __len__(self):
+        return min(self.count, len(self.data))
+
+    def append(self, value):
+        self.data[self.count % len(self.data)] = value
+        self.count += 1
+
+    def values(self):
+        """Stored values, oldest first"""
+        if self.count <= len(self.data):
+            return self.data[:self.count]
+        start = self.count % len(self.data)
+        return np.concatenate([self.data[start:], self.data[:start]])
+
+class RateMeter:
+    """Events per second over a sliding time window, kept in ring buffers"""
+
+    def __init__(self, window=2.0, capacity=256):
+        self.window = window
+        self.times = RingBuffer(capacity)
+        self.totals = RingBuffer(capacity)
+        self.total = 0
+
+    def add(self, count=1, now=None):
+        self.total += count
+        self.times.append(time.perf_counter() if now is None else now)
+        self.totals.append(self.total)
+
+    def rate(self, now=None):
+        now = time.perf_counter() if now is None else now
+        times = self.times.values()
+        recent = times >= now - self.window
+        if np.count_nonzero(recent) < 2:
+            return 0.0
+        times = times[recent]
+        totals = self.totals.values()[recent]
+        elapsed = times[-1] - times[0]
+        return float(totals[-1] - totals[0]) / elapsed if elapsed > 0 else 0.0
+
+class PerformanceStats:
+    """Local frame statistics for the performance HUD and JSON dumps.
+
+    Works without Sentry or a network connection. Every stage keeps its last
+    `capacity` timings in a ring buffer, so p50/p95/p99 always describe the
+    recent frames in fixed memory. Rates (capture, display, segmentation)
+    are measured over a sliding window; counters (e.g. dropped frames) and
+    gauges (e.g. queue depth) are plain numbers.
+    """
+    PERCENTILES = (50, 95, 99)
+
+    def __init__(self, capacity=600, rate_window=2.0):
+        self.capacity = capacity
+        self.rate_window = rate_window
+        self.stages = {}
+        self.rates = {}
+        self.counters = {}
+        self.gauges = {}
+        self.started = time.time()
+
+    def record_timings(self, timings):
+        """Add one frame's stage timings (milliseconds)"""
+        for name, ms in timings.items():
+            buffer = self.stages.get(name)
+            if buffer is None:
+                buffer = self.stages[name] = RingBuffer(self.capacity)
+            buffer.append(ms)
+
+    def add_event(self, name, count=1, now=None):
+        """Count events of a rate such as 'display' or 'segmentation'"""
+        meter = self.rates.get(name)
+        if meter is None:
+            meter = self.rates[name] = RateMeter(self.rate_window)
+        meter.add(count, now)
+
+    def increment(self, name, count=1):
+        self.counters[name] = self.counters.get(name, 0) + count
+
+    def set_gauge(self, name, value):
+        self.gauges[name] = value
+
+    def percentiles(self, name):
+        """Return {'p50': ..., 'p95': ..., 'p99': ...} for a stage, in milliseconds"""
+        values = self.stages[name].values()
+        if not len(values):
+            return {f"p{p}": 0.0 for p in self.PERCENTILES}
+        return {f"p{p}": float(v) for p, v in zip(self.PERCENTILES, np.percentile(values, self.PERCENTILES))}
+
+    def snapshot(self, now=None):
+        """All statistics as a JSON-serializable dict"""
+        return {
+            'rates_fps': {name: round(meter.rate(now), 2) for name, meter in self.rates.items()},
+            'counters': dict(self.counters),
+            'gauges': dict(self.gauges),
+            'stages_ms': {name: dict(self.percentiles(name), samples=len(buffer))
+                          for name, buffer in self.stages.items()},
+        }
+
+    def hud_lines(self, now=None):
+        """Short text lines for the on-screen HUD"""
+        rates = "  ".join(f"{name} {meter.rate(now):.1f}" for name, meter in self.rates.items())
+        counters = "  ".join(f"{name} {value}" for name, value in
+                             list(self.gauges.items()) + list(self.counters.items()))
+        lines = [f"fps: {rates}"]
+        if counters:
+            lines.append(counters)
+        for name in self.stages:
+            p = self.percentiles(name)
+            lines.append(f"{name:<12} p50 {p['p50']:6.2f}  p95 {p['p95']:6.2f}  p99 {p['p99']:6.2f} ms")
+        return lines
+
+    def dump_json(self, path, extra=None):
+        """Write a snapshot (plus machine info and any extra fields) to a JSON file"""
+        data = {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'uptime_s': round(time.time() - self.started, 1),
+            'platform': f"{platform.system()} {platform.release()} {platform.machine()}",
+            'python': platform.python_version(),
+            'cpu_count': os.cpu_count(),
+        }
+        data.update(self.snapshot())
+        if extra:
+            data.update(extra)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+        return path
+
+class NullSpan:
+    """Span that records nothing.
+
+    A single shared instance is returned for every unsampled transaction and
+    all of its children, so tracing that is switched off costs a method
+    call per span and no allocations.
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def start_child(self, op=None, **kwargs):
+        return self
+
+NULL_SPAN = NullSpan()
+
+class Tracer:
+    """No-op tracer; the base class of the tracing modes.
+
+    start_transaction() returns a context manager whose start_child(op=...)
+    opens nested spans, the same interface as a Sentry transaction.
+    """
+    mode = 'off'
+
+    def start_transaction(self, op, name):
+        return NULL_SPAN
+
+    def flush(self):
+        pass
+
+class SentryTracer(Tracer):
+    """Sends every Nth transaction to Sentry; the rest get the shared NullSpan.
+
+    The decision is a counter check made before any Sentry object exists,
+    so unsampled frames pay nothing.
+    """
+    mode = 'sentry'
+
+    def __init__(self, sample_rate=0.01):
+        self.sample_rate = sample_rate
+        self.interval = max(1, round(1.0 / sample_rate)) if sample_rate > 0 else 0
+        self._count = 0
+
+    def start_transaction(self, op, name):
+        if not self.interval:
+            return NULL_SPAN
+        self._count += 1
+        if self._count % self.interval:
+            return NULL_SPAN
+        return sentry_sdk.start_transaction(op=op, name=name, sampled=True)
+
+class _AggregateSpan:
+    """Reusable timing span of an AggregateTracer (one per op)"""
+    __slots__ = ('tracer', 'samples', 'start')
+
+    def __init__(self, tracer, capacity):
+        self.tracer = tracer
+        self.samples = RingBuffer(capacity)
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.samples.append((time.perf_counter() - self.start) * 1000)
+        return False
+
+    def start_child(self, op=None, **kwargs):
+        return self.tracer._span(op)
+
+class AggregateTracer(Tracer):
+    """Keeps span durations in local ring-buffer histograms instead of sending them.
+
+    Every flush_interval seconds the percentiles of the spans recorded since
+    the previous flush are logged and attached to the Sentry scope as the
+    "frame_timings" context, so error reports still carry recent timings.
+    Spans are reused per op, so this mode does not allocate per frame either.
+    """
+    mode = 'aggregate'
+
+    def __init__(self, flush_interval=60.0, capacity=2048):
+        self.flush_interval = flush_interval
+        self.capacity = capacity
+        self.spans = {}
+        self._flushed_counts = {}
+        self._last_flush = time.perf_counter()
+
+    def _span(self, op):
+        span = self.spans.get(op)
+        if span is None:
+            span = self.spans[op] = _AggregateSpan(self, self.capacity)
+        return span
+
+    def start_transaction(self, op, name):
+        if time.perf_counter() - self._last_flush >= self.flush_interval:
+            self.flush()
+        return self._span(op)
+
+    def summary(self):
+        """Percentiles (ms) of every op recorded since the last flush"""
+        summary = {}
+        for op, span in self.spans.items():
+            new = span.samples.count - self._flushed_counts.get(op, 0)
+            if new <= 0:
+                continue
+            values = span.samples.values()[-min(new, self.capacity):]
+            p50, p95, p99 = np.percentile(values, (50, 95, 99))
+            summary[op] = {'count': new, 'p50': round(float(p50), 2),
+                           'p95': round(float(p95), 2), 'p99': round(float(p99), 2)}
+        return summary
+
+    def flush(self):
+        summary = self.summary()
+        self._last_flush = time.perf_counter()
+        self._flushed_counts = {op: span.samples.count for op, span in self.spans.items()}
+        if not summary:
+            return
+        logger.info("Frame timings: " + ", ".join(
+            f"{op} p50 {s['p50']} / p95 {s['p95']} / p99 {s['p99']} ms (n={s['count']})"
+            for op, s in summary.items()))
+        sentry_sdk.set_context("frame_timings", summary)
+
+def create_tracer(spec):
+    """Build a tracer from a spec such as "off", "aggregate", "aggregate:30" or "sentry:0.01".
+
+    The number is the flush interval in seconds for "aggregate" and the
+    fraction of frames sent to Sentry for "sentry".
+    """
+    mode, _, value = (spec or 'off').strip().lower().partition(':')
+    try:
+        if mode == 'sentry':
+            return SentryTracer(float(value) if value else 0.01)
+        if mode == 'aggregate':
+            return AggregateTracer(float(value) if value else 60.0)
+    except ValueError:
+        logger.warning(f"Invalid tracing setting '{spec}', tracing disabled")
+        return Tracer()
+    if mode != 'off':
+        logger.warning(f"Unknown tracing mode '{mode}', tracing disabled")
+    return Tracer()
+
+class QualityGovernor:
+    """Adaptive quality controller for the live preview.
+
+    Every displayed frame reports its per-stage cost, its capture-to-display
+    latency and the latest inference time. Once per window of frames the
+    governor compares the smoothed numbers with the frame budget and the
+    latency target: over budget it steps down one quality level, and after
+    a few windows with comfortable headroom it steps back up. Each level
+    sets the segmentation input scale, the segmentation interval, the
+    particle count scale and whether the display scales smoothly. The
+    input scale only applies to models with dynamic input axes; with
+    input_scaling off it is left out of the reported settings.
+    """
+    LEVELS = [
+        {'input_scale': 1.0, 'interval': 1, 'particles': 1.0, 'smooth': True},
+        {'input_scale': 1.0, 'interval': 1, 'particles': 1.0, 'smooth': False},
+        {'input_scale': 1.0, 'interval': 2, 'particles': 0.75, 'smooth': False},
+        {'input_scale': 0.75, 'interval': 2, 'particles': 0.5, 'smooth': False},
+        {'input_scale': 0.75, 'interval': 3, 'particles': 0.5, 'smooth': False},
+        {'input_scale': 0.5, 'interval': 4, 'particles': 0.25, 'smooth': False},
+    ]
+    HEADROOM = 0.6  # Step up only below this fraction of the budgets
+    UPGRADE_WINDOWS = 3  # ...for this many windows in a row
+
+    def __init__(self, target_fps=30, target_latency_ms=100, window=30, smoothing=0.1):
+        self.target_fps = target_fps
+        self.target_latency_ms = target_latency_ms
+        self.window = window
+        self.smoothing = smoothing
+        self.level = 0
+        self.input_scaling = False  # Whether the segmentation engine can take a smaller input
+        self.frame_ms = 0.0
+        self.latency_ms = 0.0
+        self.inference_ms = 0.0
+        self.fps = 0.0
+        self.stage_ms = {}
+        self.last_decision = "warming up"
+        self._frames = 0
+        self._headroom_windows = 0
+        self._last_frame_time = None
+
+    @property
+    def settings(self):
+        return self.LEVELS[self.level]
+
+    @property
+    def effective_settings(self):
+        """The current level's settings that actually take effect"""
+        settings = dict(self.settings)
+        if not self.input_scaling:
+            del settings['input_scale']
+        return settings
+
+    @property
+    def frame_budget_ms(self):
+        return 1000.0 / self.target_fps
+
+    def _ema(self, average, value):
+        return value if average == 0.0 else average + self.smoothing * (value - average)
+
+    def observe(self, timings, latency_ms, inference_ms=None, now=None):
+        """Record one displayed frame; return True when the quality level changed"""
+        now = time.perf_counter() if now is None else now
+        if self._last_frame_time is not None and now > self._last_frame_time:
+            self.fps = self._ema(self.fps, 1.0 / (now - self._last_frame_time))
+        self._last_frame_time = now
+
+        for name, ms in timings.items():
+            self.stage_ms[name] = self._ema(self.stage_ms.get(name, 0.0), ms)
+        self.frame_ms = self._ema(self.frame_ms, sum(timings.values()))
+        self.latency_ms = self._ema(self.latency_ms, latency_ms)
+        # Inference runs on the worker thread; only count it while segmentation is on
+        self.inference_ms = self._ema(self.inference_ms, inference_ms) if inference_ms else 0.0
+
+        self._frames += 1
+        if self._frames < self.window:
+            return False
+        self._frames = 0
+        return self._decide()
+
+    def _decide(self):
+        budget = self.frame_budget_ms
+        reasons = []
+        if self.frame_ms > budget:
+            reasons.append(f"frame {self.frame_ms:.1f} > {budget:.1f} ms")
+        if self.latency_ms > self.target_latency_ms:
+            reasons.append(f"latency {self.latency_ms:.0f} > {self.target_latency_ms} ms")
+        if self.inference_ms > self.target_latency_ms:
+            reasons.append(f"inference {self.inference_ms:.0f} > {self.target_latency_ms} ms")
+
+        if reasons:
+            self._headroom_windows = 0
+            if self.level < len(self.LEVELS) - 1:
+                self.level += 1
+                self.last_decision = f"down to {self.level}: " + ", ".join(reasons)
+                return True
+            self.last_decision = "at lowest quality: " + ", ".join(reasons)
+            return False
+
+        headroom = (self.frame_ms < budget * self.HEADROOM
+                    and self.latency_ms < self.target_latency_ms * self.HEADROOM
+                    and self.inference_ms < self.target_latency_ms * self.HEADROOM)
+        self._headroom_windows = self._headroom_windows + 1 if headroom else 0
+        if self.level > 0 and self._headroom_windows >= self.UPGRADE_WINDOWS:
+            self._headroom_windows = 0
+            self.level -= 1
+            self.last_decision = f"up to {self.level}: headroom"
+            return True
+        return False
+
+    def overlay_lines(self):
+        """Short text lines describing the current state, for the stats overlay"""
+        settings = self.effective_settings
+        stages = " ".join(f"{name} {ms:.1f}" for name, ms in self.stage_ms.items())
+        seg_scale = f"seg x{settings['input_scale']:.2f} " if 'input_scale' in settings else "seg "
+        return [
+            f"FPS {self.fps:.1f}/{self.target_fps}  frame {self.frame_ms:.1f} ms  "
+            f"latency {self.latency_ms:.0f}/{self.target_latency_ms} ms  infer {self.inference_ms:.0f} ms",
+            f"quality {self.level}/{len(self.LEVELS) - 1}  {seg_scale}"
+            f"every {settings['interval']}  particles x{settings['particles']:.2f}  "
+            f"smooth {'on' if settings['smooth'] else 'off'}",
+            f"stages ms: {stages}",
+            f"last: {self.last_decision}",
+        ]
+
+VIDEO_EXTENSIONS = {'.mp4', '.avi', '.mov', '.mkv', '.m4v', '.webm'}
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.bmp', '.tif', '.tiff', '.webp'}
+
+def iter_input_frames(source):
+    """Yield (name, BGR frame) from a video file, an image file or a folder of images.
+
+    Frames are decoded one at a time, so a long video is never held in memory.
+    """
+    source = Path(source)
+    if source.is_dir():
+        for path in sorted(p for p in source.iterdir() if p.suffix.lower() in IMAGE_EXTENSIONS):
+            frame = cv2.imread(str(path))
+            if frame is None:
+                logger.warning(f"Skipping unreadable image: {path}")
+                continue
+            yield path.name, frame
+    elif source.suffix.lower() in IMAGE_EXTENSIONS:
+        frame = cv2.imread(str(source))
+        if frame is None:
+            raise IOError(f"Cannot read image: {source}")
+        yield source.name, frame
+    else:
+        cap = cv2.VideoCapture(str(source))
+        if not cap.isOpened():
+            raise IOError(f"Cannot open video: {source}")
         try:
-            import urllib.request
-            import hashlib
-            
-            # Model URLs (from rembg repository)
-            model_urls = {
-                'u2netp': 'https://github.com/danielgatis/rembg/releases/download/v0.0.0/u2netp.onnx',
-                'u2net': 'https://github.com/danielgatis/rembg/releases/download/v0.0.0/u2net.onnx',
-                'u2net_human_seg': 'https://github.com/danielgatis/rembg/releases/download/v0.0.0/u2net_human_seg.onnx',
-                'u2net_cloth_seg': 'https://github.com/danielgatis/rembg/releases/download/v0.0.0/u2net_cloth_seg.onnx'
-            }
-            
-            if self.model_name not in model_urls:
-                self.logger.error(f"Unknown model: {self.model_name}")
-                self.finished.emit(False, f"Unknown model: {self.model_name}")
-                return
-                
-            url = model_urls[self.model_name]
-            u2net_home = os.environ.get('U2NET_HOME', str(Path.home() / '.u2net'))
-            model_path = Path(u2net_home) / f'{self.model_name}.onnx'
-            
-            self.logger.info(f"Downloading from: {url}")
-            self.logger.info(f"Saving to: {model_path}")
-            
-            # Create directory if needed
-            model_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            # Download with progress
-            def download_hook(block_num, block_size, total_size):
-                downloaded = block_num * block_size
-                percent = min(downloaded * 100 / total_size, 100)
-                self.progress.emit(int(percent), f"Downloading... {percent:.1f}%")
-                
-            urllib.request.urlretrieve(url, str(model_path), reporthook=download_hook)
-            
-            # Verify download
-            if model_path.exists():
-                size_mb = model_path.stat().st_size / 1024 / 1024
-                self.logger.info(f"✅ Model downloaded successfully!")
-                self.logger.info(f"Model size: {size_mb:.1f} MB")
-                self.progress.emit(100, f"Download complete! ({size_mb:.1f} MB)")
-                self.finished.emit(True, "Model downloaded successfully!")
-            else:
-                self.logger.error(f"❌ Model file not found after download")
-                self.finished.emit(False, "Download failed - file not found!")
-                
-        except Exception as e:
-            self.logger.error(f"Manual download failed: {str(e)}")
-            sentry_sdk.capture_exception(e)
-            self.finished.emit(False, f"Manual download failed: {str(e)}")
+            index = 0
+            while True:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                index += 1
+                yield f"frame_{index:06d}.jpg", frame
+        finally:
+            cap.release()
 
-class BackgroundRemovalWorker(QThread):
-    """Worker thread for background removal processing"""
-    frame_ready = pyqtSignal(np.ndarray)
-    
-    def __init__(self, session):
-        super().__init__()
-        self.session = session
-        self.input_queue = queue.Queue(maxsize=2)
-        self.running = True
-        self.current_bg = None
-        self.enabled = False
-        
-    def process_frame(self, frame, bg):
-        """Process a single frame with background removal"""
-        if not self.enabled or bg is None:
+def input_fps(source):
+    """Frame rate of a video file, or None for images"""
+    if Path(source).is_dir() or Path(source).suffix.lower() in IMAGE_EXTENSIONS:
+        return None
+    cap = cv2.VideoCapture(str(source))
+    fps = cap.get(cv2.CAP_PROP_FPS) if cap.isOpened() else 0
+    cap.release()
+    return fps if fps and fps > 0 else None
+
+class FrameSink:
+    """Writes rendered frames to a video file or to a folder of images.
+
+    The output is a video (cv2.VideoWriter, opened on the first frame) when
+    its extension is a video extension, otherwise a folder that receives
+    one image per frame under the frame's name.
+    """
+
+    def __init__(self, output, fps=30.0, codec='mp4v'):
+        self.output = Path(output)
+        self.fps = fps
+        self.codec = codec
+        self.to_video = self.output.suffix.lower() in VIDEO_EXTENSIONS
+        self.writer = None
+        self.size = None
+        if not self.to_video:
+            self.output.mkdir(parents=True, exist_ok=True)
+
+    def write(self, name, frame):
+        if not self.to_video:
+            if not cv2.imwrite(str(self.output / name), frame):
+                raise IOError(f"Cannot write {self.output / name}")
+            return
+        if self.writer is None:
+            self.size = (frame.shape[1], frame.shape[0])
+            self.writer = cv2.VideoWriter(str(self.output), cv2.VideoWriter_fourcc(*self.codec),
+                                          self.fps, self.size)
+            if not self.writer.isOpened():
+                raise IOError(f"Cannot open video writer for {self.output} ({self.codec})")
+        if (frame.shape[1], frame.shape[0]) != self.size:
+            frame = cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)
+        self.writer.write(frame)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.release()
+            self.writer = None
+
+class OfflineRenderer:
+    """Applies background replacement, a colour filter and an effect to files.
+
+    Uses the same FramePipeline, ColorFilter, SegmentationEngine and
+    EffectRenderer as the live preview, without Qt or a camera. Decoding,
+    processing and encoding run on three threads connected by bounded
+    queues; the pipeline has enough rotating buffers for every frame that
+    can be waiting in the output queue, so frames are never copied.
+    """
+
+    def __init__(self, effect=None, color_filter=None, background=None, session=None,
+                 caption=False, mirror=False, queue_size=8, seed=None, model=None):
+        self.effects = EffectRenderer(SpriteAtlas(load_emoji_icons(), SPRITE_SIZES), seed=seed)
+        self.effects.set_effect(effect)
+        self.color_filter = create_color_filters(seed)[color_filter] if color_filter else None
+        self.background = background
+        self.background_cache = create_background_cache()
+        self.engine = (SegmentationEngine(session, model=MODEL_REGISTRY.get(model))
+                       if session is not None and background else None)
+        self.compositor = AlphaCompositor()
+        self.queue_size = queue_size
+        self.frames_rendered = 0
+
+        stages = []
+        if self.engine:
+            stages.append(FrameStage("background", self.replace_background))
+        if self.color_filter:
+            stages.append(FrameStage("filter", self.color_filter.apply))
+        if effect:
+            stages.append(FrameStage("effect", self.effects.apply_effect_overlay))
+        if caption:
+            stages.append(FrameStage("caption", self.effects.add_caption))
+        # One buffer per queued frame, one being encoded and one being processed
+        self.pipeline = FramePipeline(stages, mirror=mirror, buffers=queue_size + 2)
+
+    def skip_frames(self, count, width, height):
+        """Advance the random state of the animated stages as if count frames were rendered"""
+        if self.color_filter:
+            self.color_filter.skip_frames(count, height, width)
+        self.effects.skip_frames(count, width, height)
+
+    def replace_background(self, frame):
+        """Segment the frame and composite it onto the selected background"""
+        h, w = frame.shape[:2]
+        mask = self.engine.predict_mask(frame)
+        bg = self.background_cache.get(self.background, (w, h))
+        if bg is None:
             return frame
-            
+        return self.compositor.composite(frame, mask, bg, out=frame)
+
+    def _read(self, source, frames_in, errors):
         try:
-            # Remove background
-            input_img = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            output = remove(input_img, session=self.session, alpha_matting=True, 
-                          alpha_matting_foreground_threshold=240,
-                          alpha_matting_background_threshold=50,
-                          alpha_matting_erode_size=10)
-            
-            # Convert to BGRA
-            if len(output.shape) == 2:
-                output = cv2.cvtColor(output, cv2.COLOR_GRAY2BGRA)
-            elif output.shape[2] == 3:
-                output = cv2.cvtColor(output, cv2.COLOR_RGB2BGRA)
-            
-            # Get mask from alpha channel
-            mask = output[:, :, 3]
-            
-            # Apply morphological operations to refine mask
-            kernel = np.ones((3,3), np.uint8)
-            mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel)
-            mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)
-            
-            # Apply gaussian blur for smoother edges
-            mask = cv2.GaussianBlur(mask, (3, 3), 0)
-            
-            # Resize background to match frame
-            bg_resized = cv2.resize(bg, (frame.shape[1], frame.shape[0]))
-            
-            # Create 3-channel mask
-            mask_3ch = cv2.cvtColor(mask, cv2.COLOR_GRAY2BGR)
-            
-            # Blend using weighted addition for smoother edges
-            fg = frame.astype(float) * (mask_3ch.astype(float) / 255.0)
-            bg = bg_resized.astype(float) * (1.0 - mask_3ch.astype(float) / 255.0)
-            
-            # Combine and convert back to uint8
-            result = (fg + bg).astype(np.uint8)
-            return result
+            for item in iter_input_frames(source):
+                frames_in.put(item)
         except Exception as e:
-            print(f"Background removal error in worker: {e}")
-            return frame
-    
-    def run(self):
-        """Main worker loop"""
-        while self.running:
+            errors.append(e)
+        finally:
+            frames_in.put(None)
+
+    def _write(self, output, fps, codec, frames_out, errors):
+        sink = None
+        while True:
+            item = frames_out.get()
+            if item is None:
+                break
+            if errors:
+                continue  # Keep draining so the processing thread never blocks
             try:
-                # Get frame from queue with timeout
-                frame, bg = self.input_queue.get(timeout=0.1)
-                processed = self.process_frame(frame, bg)
-                self.frame_ready.emit(processed)
-            except queue.Empty:
-                continue
+                sink = sink or FrameSink(output, fps, codec)
+                sink.write(*item)
             except Exception as e:
-                print(f"Worker error: {e}")
-    
-    def stop(self):
-        """Stop the worker thread"""
-        self.running = False
-        self.wait()
+                errors.append(e)
+        if sink is not None:
+            sink.close()
+
+    def render(self, source, output, fps=None, codec='mp4v'):
+        """Render every frame of source into output (a video file or a folder)"""
+        fps = fps or input_fps(source) or 30.0
+        frames_in = queue.Queue(maxsize=self.queue_size)
+        frames_out = queue.Queue(maxsize=self.queue_size)
+        errors = []
+        reader = threading.Thread(target=self._read, args=(source, frames_in, errors), daemon=True)
+        writer = threading.Thread(target=self._write, args=(output, fps, codec, frames_out, errors),
+                                  daemon=True)
+        reader.start()
+        writer.start()
+
+        start = time.perf_counter()
+        try:
+            while True:
+                item = frames_in.get()
+                if item is None:
+                    break
+                name, frame = item
+                if not errors:
+                    frames_out.put((name, self.pipeline.run(frame, 'render')))
+                    self.frames_rendered += 1
+        finally:
+            frames_out.put(None)
+            writer.join()
+        reader.join()
+        if errors:
+            raise errors[0]
+
+        elapsed = time.perf_counter() - start
+        logger.info(f"Rendered {self.frames_rendered} frames to {output} in {elapsed:.1f}s "
+                    f"({self.frames_rendered / max(elapsed, 1e-6):.1f} fps)")
+        return self.frames_rendered
+
+def _create_worker_session(config):
+    """ONNX session for one ParallelRenderer worker (None without --background)"""
+    if not config['renderer'].get('background'):
+        return None
+    if config['session_factory'] is not None:
+        return config['session_factory']()
+    # Split the cores between the workers instead of every session using all of them
+    return SessionFactory().create(config['model'], intra_op_threads=config['threads'], inter_op_threads=1)
+
+def _parallel_render_worker(config, slot_names, tasks, results):
+    """Worker process of ParallelRenderer: renders frames in place in shared memory"""
+    from multiprocessing import shared_memory
+    slots = [shared_memory.SharedMemory(name=name) for name in slot_names]
+    try:
+        renderer = OfflineRenderer(session=_create_worker_session(config), queue_size=1, model=config['model'],
+                                   **config['renderer'])
+        last_index = -1
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            index, slot, shape, payload = task
+            if payload is None:
+                frame = np.ndarray(shape, dtype=np.uint8, buffer=slots[slot].buf)
+            else:
+                frame = payload
+            # Step over the frames other workers render so the animation matches a sequential run
+            renderer.skip_frames(index - last_index - 1, shape[1], shape[0])
+            last_index = index
+            try:
+                result = renderer.pipeline.run(frame, 'render')
+            except Exception as e:
+                results.put((index, slot, None, repr(e)))
+                continue
+            if payload is None:
+                np.copyto(frame, result)
+                results.put((index, slot, None, None))
+            else:
+                # Queue.put pickles on a feeder thread; the pipeline buffer gets reused before that
+                results.put((index, slot, result.copy(), None))
+    finally:
+        for shm in slots:
+            shm.close()
+
+class ParallelRenderer:
+    """OfflineRenderer spread over several worker processes.
+
+    Every worker has its own ONNX session and effect state. Frames travel
+    through a fixed pool of shared-memory slots: the main process decodes a
+    frame into a free slot, a worker renders it in place, and the main
+    process writes the results in input order before recycling the slot.
+    Only (index, slot) messages are pickled. Frames larger than a slot
+    (sized from the first frame) fall back to being pickled. All workers
+    use the same seed and step the random state of the filter and effect
+    over frames rendered elsewhere, so animated effects look the same as
+    in a sequential OfflineRenderer with that seed.
+    """
+
+    def __init__(self, workers=None, slots_per_worker=2, model=DEFAULT_LIVE_MODEL, session_factory=None,
+                 queue_size=None, **options):
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        # queue_size caps the frames in flight, but every worker gets at least one slot
+        self.slot_count = max(self.workers, queue_size) if queue_size else self.workers * slots_per_worker
+        options.setdefault('seed', 0)
+        self.config = {
+            'renderer': options,
+            'model': model,
+            'session_factory': session_factory,
+            'threads': max(1, (os.cpu_count() or 1) // self.workers),
+        }
+        self.frames_rendered = 0
+
+    def _next_result(self, results, processes):
+        while True:
+            try:
+                return results.get(timeout=1.0)
+            except queue.Empty:
+                dead = [p for p in processes if p.exitcode not in (None, 0)]
+                if dead:
+                    raise RuntimeError(f"Render worker exited with code {dead[0].exitcode}")
+
+    def render(self, source, output, fps=None, codec='mp4v'):
+        """Render every frame of source into output (a video file or a folder)"""
+        import multiprocessing
+        from multiprocessing import shared_memory
+
+        fps = fps or input_fps(source) or 30.0
+        frames = iter_input_frames(source)
+        first = next(frames, None)
+        if first is None:
+            raise IOError(f"No frames found in {source}")
+        slot_bytes = first[1].nbytes
+
+        # spawn: forking a process that already runs Qt/onnxruntime threads is unsafe
+        ctx = multiprocessing.get_context('spawn')
+        slots = [shared_memory.SharedMemory(create=True, size=slot_bytes) for _ in range(self.slot_count)]
+        tasks = ctx.Queue()
+        results = ctx.Queue()
+        processes = [ctx.Process(target=_parallel_render_worker, daemon=True,
+                                 args=(self.config, [shm.name for shm in slots], tasks, results))
+                     for _ in range(self.workers)]
+        for process in processes:
+            process.start()
+
+        sink = FrameSink(output, fps, codec)
+        start = time.perf_counter()
+        try:
+            free = list(range(self.slot_count))
+            names, shapes, done = {}, {}, {}
+            submitted = written = 0
+            pending_input = first
+            while pending_input is not None or written < submitted:
+                # Keep every slot busy, but never more frames in flight than slots
+                while pending_input is not None and free and submitted - written < self.slot_count:
+                    name, frame = pending_input
+                    names[submitted] = name
+                    shapes[submitted] = frame.shape
+                    if frame.nbytes <= slot_bytes:
+                        slot = free.pop()
+                        np.copyto(np.ndarray(frame.shape, dtype=np.uint8, buffer=slots[slot].buf), frame)
+                        tasks.put((submitted, slot, frame.shape, None))
+                    else:
+                        tasks.put((submitted, None, frame.shape, frame))
+                    submitted += 1
+                    pending_input = next(frames, None)
+                if written == submitted:
+                    continue
+
+                index, slot, result, error = self._next_result(results, processes)
+                if error:
+                    raise RuntimeError(f"Rendering {names[index]} failed: {error}")
+                done[index] = (slot, result)
+
+                # Reassemble in input order
+                while written in done:
+                    slot, result = done.pop(written)
+                    if slot is not None:
+                        result = np.ndarray(shapes[written], dtype=np.uint8, buffer=slots[slot].buf)
+                    sink.write(names.pop(written), result)
+                    del shapes[written]
+                    if slot is not None:
+                        free.append(slot)
+                    written += 1
+            self.frames_rendered = written
+        finally:
+            for _ in processes:
+                tasks.put(None)
+            for process in processes:
+                process.join(timeout=5)
+                if process.is_alive():
+                    process.terminate()
+            sink.close()
+            for shm in slots:
+                shm.close()
+                shm.unlink()
+
+        elapsed = time.perf_counter() - start
+        logger.info(f"Rendered {self.frames_rendered} frames to {output} with {self.workers} workers "
+                    f"in {elapsed:.1f}s ({self.frames_rendered / max(elapsed, 1e-6):.1f} fps)")
+        return self.frames_rendered
 
 class CanadaSelfieApp(QMainWindow):
-    def __init__(self):
+    def __init__(self, tracer=None, segmentation=None, camera=None, camera_standby=False):
         super().__init__()
         self.cap = None
+        self.capture_worker = None
+        self.last_frame_seq = 0
+        self.last_capture_timestamp = 0.0
         self.timer = QTimer()
         self.timer.timeout.connect(self.update_frame)
         self.is_recording = False
@@ -457,6 +3416,21 @@ class CanadaSelfieApp(QMainWindow):
         self.beaver_overlay = False
         self.current_camera = 0
         self.available_cameras = []
+        self.camera_list = []
+        self.cameras = []
+        self.camera_cache = CameraCache()
+        self.camera_discovery = None
+        self.start_when_discovered = False
+        # Capture mode to aim for, from camera_target()
+        self.camera_target = camera or camera_target(None)
+        # Camera switches open the new device in the background and swap on its first frame
+        self.requested_camera = None
+        self.camera_openers = []
+        # Mode changes are negotiated on this thread while the capture thread is stopped
+        self.camera_mode_worker = None
+        # With camera_standby the previous camera stays open: (device index, cap, capture worker or None)
+        self.camera_standby = camera_standby
+        self.standby_camera = None
         
         # Canadian memes and phrases
         self.canadian_memes = [
@@ -515,7 +3489,8 @@ class CanadaSelfieApp(QMainWindow):
         
         # Background removal
         self.bg_removal_enabled = False
-        self.current_bg = None
+        self.current_bg_name = None
+        self.frame_size = (640, 480)  # Last preview frame (width, height)
         
         # Easter egg variables
         self.secret_sequence = []
@@ -528,23 +3503,47 @@ class CanadaSelfieApp(QMainWindow):
                            Qt.Key_Left, Qt.Key_Right, Qt.Key_Left, Qt.Key_Right]
         
         # Fireworks system
-        self.fireworks = []
+        self.fireworks = FireworksSystem()
         self.fireworks_active = False
         self.fireworks_timer = 0
-        self.current_model = 'u2netp'  # Better for portraits
+        self.fireworks_scale = 1
+        self.current_model = DEFAULT_LIVE_MODEL  # Better for portraits
+        self.photo_model = DEFAULT_PHOTO_MODEL  # Heavier model for photo capture, None = live mask
+        self.photo_engine = None
+        self.photo_worker = None
+        self.capture_mask = None  # Photo model mask, only set while a capture runs through the pipeline
+        self.requested_models = {'live': self.current_model, 'photo': self.photo_model}
+        self.model_loaders = []
+        self.download_worker = None
+        self.after_download = None
         self.bg_worker = None
-        self.last_processed_frame = None
+        self.last_mask = None
+        self.compositor = AlphaCompositor()
         self.frame_skip_counter = 0
+        self.segmentation_interval = 1  # Run segmentation every N frames
+        # Frames in flight and drop policy of the segmentation pipeline
+        self.segmentation_options = segmentation or segmentation_options(None)
         self.frame_counter = 0
         
+        # Adaptive quality: holds the preview near the target FPS and latency
+        self.governor = QualityGovernor(target_fps=30, target_latency_ms=100)
+        self.perf_stats = PerformanceStats()
+        # Overlay effects; sprites are attached once the icons are loaded
+        self.effects = EffectRenderer()
+        # Per-frame tracing (Sentry sampling, local aggregates, or off)
+        self.tracer = tracer or Tracer()
+        self.show_stats = False  # Performance HUD, toggled with F3
+        self.first_frame_shown = False
+        
         # Background removal will be initialized after UI is ready
         self.rembg_session = None
         self.bg_removal_available = False
         
         
         self.init_ui()
+        self.pipeline = self.create_pipeline()
+        # Opens and configures the selected camera too, on a background thread
         self.detect_cameras()
-        self.setup_camera()
         self.create_background_images()
         self.load_emoji_icons()
         
@@ -554,7 +3553,7 @@ class CanadaSelfieApp(QMainWindow):
             logger.info("Scheduling background removal initialization...")
             QTimer.singleShot(100, self.initialize_background_removal)
         else:
-            logger.warning("Background removal not available - rembg import failed")
+            logger.warning("Background removal not available - rembg or onnxruntime is not installed")
         
     def init_ui(self):
         """Initialize the user interface with Canada theme"""
@@ -682,11 +3681,9 @@ class CanadaSelfieApp(QMainWindow):
         video_layout = QVBoxLayout()
         self.video_frame.setLayout(video_layout)
         
-        self.video_label = QLabel()
-        self.video_label.setAlignment(Qt.AlignCenter)
-        self.video_label.setStyleSheet("QLabel { background-color: black; color: white; border: none; }")
-        self.video_label.setText("🍁 Initializing Canadian Webcam... 🍁")
-        video_layout.addWidget(self.video_label)
+        self.video_display = VideoDisplayWidget()
+        self.video_display.setText("🍁 Initializing Canadian Webcam... 🍁")
+        video_layout.addWidget(self.video_display)
         
         main_layout.addWidget(self.video_frame, 1)
         
@@ -720,6 +3717,14 @@ class CanadaSelfieApp(QMainWindow):
         """)
         camera_layout.addWidget(self.camera_combo, 0, 0, 1, 2)
         
+        # Capture mode: negotiated automatically unless the user pins one
+        self.camera_mode_combo = QComboBox()
+        self.camera_mode_combo.currentIndexChanged.connect(self.select_camera_mode)
+        self.camera_mode_combo.setStyleSheet(self.camera_combo.styleSheet())
+        self.camera_mode_combo.setToolTip("Capture resolution, frame rate and pixel format")
+        self.camera_mode_combo.setEnabled(False)
+        camera_layout.addWidget(self.camera_mode_combo, 1, 0, 1, 2)
+        
         self.start_btn = QPushButton("▶")
         self.start_btn.clicked.connect(self.start_camera)
         self.start_btn.setStyleSheet("""
@@ -740,7 +3745,7 @@ class CanadaSelfieApp(QMainWindow):
                 background-color: #008833;
             }
         """)
-        camera_layout.addWidget(self.start_btn, 1, 0)
+        camera_layout.addWidget(self.start_btn, 2, 0)
         
         self.stop_btn = QPushButton("■")
         self.stop_btn.clicked.connect(self.stop_camera)
@@ -768,7 +3773,7 @@ class CanadaSelfieApp(QMainWindow):
                 color: #FFFFFF;
             }
         """)
-        camera_layout.addWidget(self.stop_btn, 1, 1)
+        camera_layout.addWidget(self.stop_btn, 2, 1)
         
         self.capture_btn = QPushButton("SNAP")
         self.capture_btn.clicked.connect(self.capture_photo)
@@ -798,7 +3803,7 @@ class CanadaSelfieApp(QMainWindow):
                 border: 1px solid #FFEEEE;
             }
         """)
-        camera_layout.addWidget(self.capture_btn, 2, 0, 1, 2)
+        camera_layout.addWidget(self.capture_btn, 3, 0, 1, 2)
         
         camera_group.setLayout(camera_layout)
         controls_layout.addWidget(camera_group)
@@ -972,6 +3977,27 @@ class CanadaSelfieApp(QMainWindow):
         
         bg_layout.addLayout(bg_combo_layout, 0, 0, 1, 2)
         
+        # Segmentation models: a light one for every preview frame, optionally a heavier one for photos
+        self.live_model_combo = QComboBox()
+        for spec in MODEL_REGISTRY.values():
+            self.live_model_combo.addItem(f"🎥 {spec.label} ({spec.latency})", spec.name)
+        self.live_model_combo.setCurrentIndex(list(MODEL_REGISTRY).index(self.current_model))
+        self.live_model_combo.currentIndexChanged.connect(
+            lambda index: self.select_model(self.live_model_combo.itemData(index), 'live'))
+        self.live_model_combo.setEnabled(False)
+        self.live_model_combo.setToolTip("Segmentation model for the live preview")
+        bg_layout.addWidget(self.live_model_combo, 1, 0, 1, 2)
+        
+        self.photo_model_combo = QComboBox()
+        self.photo_model_combo.addItem("📸 Photos: same as preview", None)
+        for spec in MODEL_REGISTRY.values():
+            self.photo_model_combo.addItem(f"📸 Photos: {spec.label} ({spec.latency})", spec.name)
+        self.photo_model_combo.currentIndexChanged.connect(
+            lambda index: self.select_model(self.photo_model_combo.itemData(index), 'photo'))
+        self.photo_model_combo.setEnabled(False)
+        self.photo_model_combo.setToolTip("Segmentation model used when a photo is taken")
+        bg_layout.addWidget(self.photo_model_combo, 2, 0, 1, 2)
+        
         bg_group.setLayout(bg_layout)
         controls_layout.addWidget(bg_group)
         
@@ -1023,6 +4049,7 @@ class CanadaSelfieApp(QMainWindow):
         
         # Initialize counters
         self.current_filter = None
+        self.color_filters = create_color_filters()
         self.current_effect = None
         
         # Status label for notifications (hidden but kept for compatibility)
@@ -1048,21 +4075,11 @@ class CanadaSelfieApp(QMainWindow):
     
     def change_effect(self, index):
         """Change the current overlay effect"""
-        effects = [
-            None,  # None
-            "maple_rain",
-            "snow_fall",
-            "hockey_sticks",
-            "beaver_dam",
-            "flag_frame",
-            "tim_hortons",
-            "moose_trail",
-            "northern_stars",
-            "smiley_rain"
-        ]
+        effects = [None] + EFFECT_NAMES
         
         if index < len(effects):
             self.current_effect = effects[index]
+            self.effects.set_effect(self.current_effect)
             
             # Check for easter egg sequence
             if self.current_effect:
@@ -1081,165 +4098,250 @@ class CanadaSelfieApp(QMainWindow):
                 self.status_label.setText(f"Effect: {effect_names}")
         
     @pyqtSlot(np.ndarray)
-    def on_processed_frame(self, frame):
-        """Handle processed frame from worker thread"""
-        self.last_processed_frame = frame
+    def on_mask_ready(self, mask):
+        """Cache the newest segmentation mask from the worker thread"""
+        self.last_mask = mask
+        self.perf_stats.add_event('segmentation')
         
     def detect_cameras(self):
-        """Detect available cameras"""
-        self.available_cameras = []
-        self.camera_list = []
-        
-        # Cross-platform camera detection
-        import platform
-        system = platform.system()
+        """List the cached cameras right away and probe the devices on a background thread"""
+        self.cameras = list(self.camera_cache.cameras)
+        self.populate_camera_combo()
+        # Picking a camera has to wait until discovery hands back the open device
+        self.camera_combo.setEnabled(False)
+        self.status_label.setText("Looking for cameras, eh...")
         
-        try:
-            from PyQt5.QtMultimedia import QCameraInfo
-            qt_cameras = QCameraInfo.availableCameras()
-            
-            if system == "Darwin":
-                # macOS: Sort by UID to match OpenCV order
-                sorted_cameras = sorted(qt_cameras, key=lambda c: c.deviceName())
-            else:
-                # Windows/Linux: Use Qt order as-is
-                sorted_cameras = qt_cameras
-            
-            for idx, camera_info in enumerate(sorted_cameras):
-                # Test if this camera works with OpenCV
-                if system == "Windows":
-                    # Windows: Use DirectShow backend for better compatibility
-                    cap = cv2.VideoCapture(idx, cv2.CAP_DSHOW)
-                else:
-                    cap = cv2.VideoCapture(idx)
-                    
-                if cap.isOpened():
-                    self.available_cameras.append(idx)
-                    camera_name = camera_info.description()
-                    self.camera_list.append((idx, camera_name))
-                    print(f"{idx}: {camera_name} | uid={camera_info.deviceName()}")
-                    cap.release()
-                    
-        except ImportError:
-            print("QCameraInfo not available, using basic detection")
-            # Fallback detection for all platforms
-            max_cameras = 3 if system == "Darwin" else 5
-            
-            for i in range(max_cameras):
-                try:
-                    if system == "Windows":
-                        cap = cv2.VideoCapture(i, cv2.CAP_DSHOW)
-                    else:
-                        cap = cv2.VideoCapture(i)
-                        
-                    if cap.isOpened():
-                        self.available_cameras.append(i)
-                        self.camera_list.append((i, f"Camera {i}"))
-                        cap.release()
-                except:
-                    continue
+        candidates = camera_candidates()
+        self.camera_discovery = CameraDiscoveryWorker(candidates, self.camera_cache.preferred_index(candidates),
+                                                      self.camera_cache.modes, self.camera_target)
+        self.camera_discovery.discovered.connect(self.on_cameras_discovered)
+        self.camera_discovery.start()
+    
+    def populate_camera_combo(self, selected=None):
+        """Fill the camera picker from self.cameras without triggering a camera switch"""
+        self.camera_list = [(camera['index'], camera['name']) for camera in self.cameras]
+        self.available_cameras = [idx for idx, _ in self.camera_list]
+        self.camera_combo.blockSignals(True)
+        self.camera_combo.clear()
+        for idx, name in self.camera_list:
+            self.camera_combo.addItem(name)
+        if selected is not None and selected in self.available_cameras:
+            self.camera_combo.setCurrentIndex(self.available_cameras.index(selected))
+        self.camera_combo.blockSignals(False)
+    
+    @pyqtSlot(list, object, object, object)
+    def on_cameras_discovered(self, cameras, selected, cap, modes):
+        """Take over the device discovery left open and remember the cameras for the next launch"""
+        self.camera_discovery = None
+        self.cameras = cameras
+        for camera in cameras:
+            logger.info(f"Camera {camera['index']}: {camera['name']} | uid={camera['uid']} | "
+                        f"{camera['width']}x{camera['height']}@{camera['fps']:g} {camera['backend']}")
+        self.camera_cache.update(cameras)
+        self.mark_startup('cameras_ready')
         
-        # Add cameras to combo box
-        if self.camera_list:
-            for idx, name in self.camera_list:
-                self.camera_combo.addItem(name)
-            # Select first camera
-            self.camera_combo.setCurrentIndex(0)
-            self.current_camera = self.camera_list[0][0]
-        else:
+        if selected is None:
+            self.populate_camera_combo()
             self.camera_combo.addItem("No camera found - Grant permission & restart")
+            self.status_label.setText("No camera found!")
+            self.start_when_discovered = False
+            self.show_camera_error()
+            return
+        
+        self.current_camera = selected['index']
+        self.cap = cap
+        if modes:
+            self.camera_cache.set_camera_modes(selected, modes)
+        self.populate_camera_combo(self.current_camera)
+        self.populate_camera_mode_combo()
+        self.camera_combo.setEnabled(True)
+        self.status_label.setText(f"Found {len(cameras)} camera{'s' if len(cameras) != 1 else ''}, eh!")
+        if self.start_when_discovered:
+            self.start_when_discovered = False
+            self.start_camera()
+    
+    def current_camera_info(self):
+        return next((camera for camera in self.cameras if camera['index'] == self.current_camera), None)
+    
+    def populate_camera_mode_combo(self):
+        """List the current camera's known modes, with the pinned or automatic choice selected"""
+        camera = self.current_camera_info()
+        entry = (self.camera_cache.camera_modes(camera) if camera else None) or {}
+        self.camera_mode_combo.blockSignals(True)
+        self.camera_mode_combo.clear()
+        auto = entry.get('mode') if not entry.get('pinned') else None
+        self.camera_mode_combo.addItem(f"Auto ({camera_mode_label(auto)})" if auto else "Auto", None)
+        for mode in entry.get('modes', []):
+            self.camera_mode_combo.addItem(camera_mode_label(mode), mode)
+            if entry.get('pinned') and entry.get('mode') == {key: mode[key] for key in entry['mode']}:
+                self.camera_mode_combo.setCurrentIndex(self.camera_mode_combo.count() - 1)
+        self.camera_mode_combo.setEnabled(bool(entry.get('modes')))
+        self.camera_mode_combo.blockSignals(False)
+    
+    def configure_current_camera(self, pinned=None):
+        """Negotiate (or pin) the capture mode of the open camera in the background; False if it cannot start"""
+        camera = self.current_camera_info()
+        if camera is None or not (self.cap and self.cap.isOpened()):
+            return False
+        entry = dict(self.camera_cache.camera_modes(camera) or {})
+        if pinned is not None:
+            entry['pinned'] = bool(pinned)
+            if pinned:
+                entry['mode'] = {key: pinned[key] for key in ('width', 'height', 'fps', 'fourcc')}
+        # Mode changes must not race the capture thread's reads; it is restarted once the mode is set
+        self.stop_capture_worker()
+        self.camera_combo.setEnabled(False)
+        self.camera_mode_combo.setEnabled(False)
+        self.camera_mode_worker = CameraModeWorker(self.cap, entry, self.camera_target)
+        self.camera_mode_worker.configured.connect(self.on_camera_mode_configured)
+        self.camera_mode_worker.failed.connect(self.on_camera_mode_failed)
+        self.camera_mode_worker.start()
+        return True
+    
+    def select_camera_mode(self, index):
+        """Pin the picked mode, or go back to automatic negotiation"""
+        if index < 0 or not (self.cap and self.cap.isOpened()):
+            return
+        if self.camera_mode_worker is not None or self.requested_camera is not None:
+            # One camera change at a time
+            self.populate_camera_mode_combo()
+            return
+        mode = self.camera_mode_combo.itemData(index)
+        if self.configure_current_camera(pinned=mode or False):
+            self.status_label.setText(f"Setting camera mode {camera_mode_label(mode) if mode else 'auto'}, eh...")
+    
+    @pyqtSlot(object, object, object)
+    def on_camera_mode_configured(self, cap, entry, reported):
+        """Remember the negotiated mode for the device and resume the preview"""
+        camera = self.current_camera_info()
+        if camera is not None and cap is self.cap:
+            camera.update(reported)
+            self.camera_cache.set_camera_modes(camera, entry)
+        mode = entry.get('mode')
+        self.finish_camera_mode_change(
+            f"Camera mode: {camera_mode_label(mode) if entry.get('pinned') and mode else 'auto'}, eh!")
+    
+    @pyqtSlot(object, str)
+    def on_camera_mode_failed(self, cap, message):
+        logger.warning(f"Camera mode negotiation failed, using the default mode: {message}")
+        self.finish_camera_mode_change("Couldn't change the camera mode, eh!")
+    
+    def finish_camera_mode_change(self, status):
+        self.camera_mode_worker = None
+        self.camera_combo.setEnabled(True)
+        self.populate_camera_mode_combo()
+        if self.is_recording:
+            self.start_capture_worker()
+        self.status_label.setText(status)
     
     def change_camera(self, index):
-        """Change to selected camera"""
-        if index >= 0 and index < len(self.camera_list):
-            # Store recording state
-            was_recording = self.is_recording
-            
-            # Stop current camera if running
-            if self.is_recording:
-                self.stop_camera()
-            
-            # Release current camera
-            if self.cap:
-                self.cap.release()
-                self.cap = None
-            
-            # Update camera index from camera_list
-            self.current_camera = self.camera_list[index][0]
-            camera_name = self.camera_list[index][1]
-            print(f"Switching to camera index {self.current_camera}: {camera_name}")
-            
-            # Setup new camera
-            self.setup_camera()
-            
-            # Restart if was recording
-            if was_recording:
-                self.start_camera()
+        """Switch cameras without a gap: the new one opens in the background while the current one keeps streaming"""
+        if index < 0 or index >= len(self.camera_list):
+            return
+        device, camera_name = self.camera_list[index]
+        self.camera_cache.select(self.cameras[index])
+        if device == self.current_camera and self.cap is not None:
+            # Back to the camera that is still streaming; a switch in progress is dropped
+            self.requested_camera = None
+            return
+        logger.info(f"Switching to camera index {device}: {camera_name}")
+        self.requested_camera = device
+        if self.standby_camera and self.standby_camera[0] == device:
+            _, cap, worker = self.standby_camera
+            self.standby_camera = None
+            self.activate_camera(device, cap, worker)
+            return
+        self.status_label.setText(f"Opening {camera_name}, eh...")
+        if any(opener.index == device for opener in self.camera_openers):
+            return  # Already opening; it becomes active when it is ready
+        opener = CameraOpenWorker(device, self.camera_cache.camera_modes(self.cameras[index]), self.camera_target)
+        opener.opened.connect(self.on_camera_opened)
+        opener.failed.connect(self.on_camera_open_failed)
+        opener.finished.connect(lambda: self.camera_openers.remove(opener))
+        self.camera_openers.append(opener)
+        opener.start()
     
-    def create_background_images(self):
-        """Load Canadian-themed background images"""
-        self.backgrounds = {}
-        
-        # Try to load real images first
-        bg_files = {
-            "maple": "backgrounds/maple_forest.jpg",
-            "flag": "backgrounds/canada_flag.jpg",
-            "toronto": "backgrounds/toronto_skyline.jpg",
-            "niagara": "backgrounds/niagara_falls.jpg",
-            "campfire": "backgrounds/campfire.jpg",
-            "mountains": "backgrounds/rocky_mountains.jpg",
-            "northern_lights": "backgrounds/northern_lights.jpg"
-        }
+    @pyqtSlot(int, object, object, object)
+    def on_camera_opened(self, index, cap, modes, first_frame):
+        """Swap the new camera in once it delivers frames, unless another camera was picked meanwhile"""
+        camera = next((camera for camera in self.cameras if camera['index'] == index), None)
+        if camera is not None and modes:
+            self.camera_cache.set_camera_modes(camera, modes)
+        if index != self.requested_camera:
+            cap.release()
+            return
+        if camera is not None:
+            camera.update(read_camera_mode(cap))
+        self.activate_camera(index, cap, first_frame=first_frame)
+    
+    @pyqtSlot(int, str)
+    def on_camera_open_failed(self, index, message):
+        """Stay on the current camera when the new one cannot be opened"""
+        logger.error(f"Cannot open camera {index}: {message}")
+        if index != self.requested_camera:
+            return
+        self.requested_camera = None
+        self.populate_camera_combo(self.current_camera)
+        if self.cap is None:
+            self.show_camera_error()
+        else:
+            self.show_error(f"Couldn't switch cameras, eh: {message}")
+    
+    def activate_camera(self, index, cap, worker=None, first_frame=None):
+        """Make an open camera the active one in a single step and retire the previous one"""
+        previous = (self.current_camera, self.cap, self.capture_worker)
+        if self.is_recording:
+            if worker is None:
+                worker = CameraCaptureWorker(cap, first_frame)
+                worker.start()
+            worker.set_standby(False)
+        elif worker is not None:
+            worker.stop()
+            worker = None
+        # The frame timer reads from whichever worker is active on its next tick
+        self.current_camera, self.cap, self.capture_worker = index, cap, worker
+        self.last_frame_seq = 0
+        self.requested_camera = None
+        self.retire_camera(*previous)
         
-        for name, filepath in bg_files.items():
-            # Use resource_path for PyInstaller compatibility
-            full_path = resource_path(filepath)
-            if os.path.exists(full_path):
-                img = cv2.imread(full_path)
-                if img is not None:
-                    # Resize to standard size
-                    self.backgrounds[name] = cv2.resize(img, (640, 480))
-                else:
-                    # Fallback to generated backgrounds
-                    self.backgrounds[name] = self._create_fallback_bg(name)
-            else:
-                # Fallback to generated backgrounds
-                self.backgrounds[name] = self._create_fallback_bg(name)
+        self.populate_camera_combo(index)
+        self.populate_camera_mode_combo()
+        camera = self.current_camera_info()
+        self.status_label.setText(f"Switched to {camera['name'] if camera else f'camera {index}'}, eh!")
+    
+    def retire_camera(self, index, cap, worker):
+        """Keep the camera that was just replaced warm for instant switching back, or release it"""
+        if cap is None:
+            return
+        if not self.camera_standby:
+            self.release_camera(cap, worker)
+            return
+        if self.standby_camera:
+            self.release_camera(*self.standby_camera[1:])
+        if worker is not None:
+            worker.set_standby(True)
+        self.standby_camera = (index, cap, worker)
+    
+    def release_camera(self, cap, worker):
+        if worker is not None:
+            worker.stop()
+        cap.release()
+    
+    def create_background_images(self):
+        """Set up the Canadian-themed background cache (images load lazily)"""
+        self.background_cache = create_background_cache()
     
     def load_emoji_icons(self):
-        """Load emoji icons if available, otherwise use None"""
-        self.emoji_icons = {}
-        emoji_files = {
-            "maple_leaf": "emoji_icons/maple_leaf.png",
-            "snowflake": "emoji_icons/snowflake.png",
-            "hockey": "emoji_icons/hockey.png",
-            "coffee": "emoji_icons/coffee.png",
-            "star": "emoji_icons/star.png",
-            "flag": "emoji_icons/flag.png",
-            "beaver": "emoji_icons/beaver.png",
-            "moose": "emoji_icons/moose.png",
-            "smiley": "emoji_icons/smiley.png"
-        }
-        
-        for name, filepath in emoji_files.items():
-            # Use resource_path for PyInstaller compatibility
-            full_path = resource_path(filepath)
-            if os.path.exists(full_path):
-                img = cv2.imread(full_path, cv2.IMREAD_UNCHANGED)
-                if img is not None:
-                    self.emoji_icons[name] = img
-                else:
-                    self.emoji_icons[name] = None
-            else:
-                self.emoji_icons[name] = None
+        """Load emoji icons and pre-render every sprite at the sizes the effects use"""
+        self.emoji_icons = load_emoji_icons()
+        self.effects.sprite_atlas = SpriteAtlas(self.emoji_icons, SPRITE_SIZES)
     
     def initialize_background_removal(self):
         """Initialize background removal with model download if needed"""
         logger.info("Initializing background removal...")
         try:
             # Check if model exists
-            u2net_home = os.environ.get('U2NET_HOME', str(Path.home() / '.u2net'))
-            model_path = Path(u2net_home) / f'{self.current_model}.onnx'
+            model_path = model_file(f'{self.current_model}.onnx')
             logger.info(f"Checking for model at: {model_path}")
             
             if not model_path.exists():
@@ -1266,36 +4368,43 @@ class CanadaSelfieApp(QMainWindow):
                     self.status_label.setText("Background removal disabled - model not downloaded")
                     return
                 
-                # Create progress dialog
-                self.progress_dialog = QProgressDialog(
-                    "Downloading AI model...",
-                    "Cancel",
-                    0,
-                    100,
-                    self
-                )
-                self.progress_dialog.setWindowTitle("🍁 Canada Selfie - Model Download")
-                self.progress_dialog.setWindowModality(Qt.WindowModal)
-                self.progress_dialog.setMinimumDuration(0)
-                self.progress_dialog.setAutoReset(False)
-                self.progress_dialog.setAutoClose(False)
-                
-                # Start download worker
-                self.download_worker = ModelDownloadWorker(self.current_model)
-                self.download_worker.progress.connect(self.on_download_progress)
-                self.download_worker.finished.connect(self.on_download_finished)
-                self.download_worker.start()
-                
-                self.progress_dialog.show()
+                self.start_model_download(self.current_model, lambda: self.load_model(self.current_model, 'live'))
             else:
-                # Model exists, initialize directly
+                # Model exists: load it on a worker thread while the preview runs
                 logger.info(f"Model found, initializing background removal...")
-                self._setup_background_removal()
+                self.load_model(self.current_model, 'live')
                 
         except Exception as e:
             logger.error(f"Error initializing background removal: {e}")
             logger.exception("Full traceback:")
     
+    def start_model_download(self, model_name, after_download):
+        """Download a model with a progress dialog, then call after_download()"""
+        self.after_download = after_download
+        
+        # Create progress dialog
+        self.progress_dialog = QProgressDialog(
+            "Downloading AI model...",
+            "Cancel",
+            0,
+            100,
+            self
+        )
+        self.progress_dialog.setWindowTitle("🍁 Canada Selfie - Model Download")
+        self.progress_dialog.setWindowModality(Qt.WindowModal)
+        self.progress_dialog.setMinimumDuration(0)
+        self.progress_dialog.setAutoReset(False)
+        self.progress_dialog.setAutoClose(False)
+        
+        # Start download worker
+        self.download_worker = ModelDownloadWorker(model_name)
+        self.download_worker.progress.connect(self.on_download_progress)
+        self.download_worker.finished.connect(self.on_download_finished)
+        self.progress_dialog.canceled.connect(self.download_worker.cancel)
+        self.download_worker.start()
+        
+        self.progress_dialog.show()
+    
     def on_download_progress(self, value, message):
         """Update download progress"""
         if hasattr(self, 'progress_dialog') and self.progress_dialog:
@@ -1314,26 +4423,32 @@ class CanadaSelfieApp(QMainWindow):
                 "Download Complete!",
                 f"🍁 {message}\n\nBackground removal is now ready to use!"
             )
-            self._setup_background_removal()
+            if self.after_download:
+                self.after_download()
         else:
             QMessageBox.warning(
                 self,
                 "Download Failed",
                 f"❌ {message}\n\nBackground removal will not be available."
             )
+            self.reset_model_combos()
+        self.after_download = None
     
-    def _setup_background_removal(self):
-        """Setup background removal session and worker"""
+    def _setup_background_removal(self, session):
+        """Start background removal with a session loaded by SessionLoadWorker"""
         try:
-            logger.info("Setting up background removal session...")
-            from rembg import new_session
-            self.rembg_session = new_session(self.current_model)
-            logger.info("✅ rembg session created successfully")
+            self.rembg_session = session
             
-            # Initialize background removal worker
-            self.bg_worker = BackgroundRemovalWorker(self.rembg_session)
-            self.bg_worker.frame_ready.connect(self.on_processed_frame)
-            self.bg_worker.start()
+            # Initialize background removal worker (or swap the model of the running one)
+            spec = MODEL_REGISTRY.get(self.current_model)
+            if self.bg_worker:
+                self.bg_worker.set_session(self.rembg_session, model=spec)
+            else:
+                self.bg_worker = BackgroundRemovalWorker(self.rembg_session, model=spec, **self.segmentation_options)
+                self.bg_worker.mask_ready.connect(self.on_mask_ready)
+                self.bg_worker.start()
+            # Apply the current quality level to the new engine
+            self.apply_quality_settings()
             
             self.bg_removal_available = True
             
@@ -1343,6 +4458,9 @@ class CanadaSelfieApp(QMainWindow):
                 self.bg_up_btn.setEnabled(True)
                 self.bg_down_btn.setEnabled(True)
                 self.bg_combo.setToolTip("Select a Canadian background scene")
+                self.live_model_combo.setEnabled(True)
+                self.photo_model_combo.setEnabled(True)
+            self.mark_startup('segmentation_ready')
                 
         except Exception as e:
             logger.error(f"❌ Failed to setup background removal: {e}")
@@ -1356,150 +4474,93 @@ class CanadaSelfieApp(QMainWindow):
                 self.bg_combo.setEnabled(False)
                 self.bg_combo.setToolTip("AI model required for background removal")
     
-    def overlay_emoji(self, frame, emoji_name, x, y, size=40):
-        """Overlay an emoji icon on the frame"""
-        if emoji_name in self.emoji_icons and self.emoji_icons[emoji_name] is not None:
-            emoji = self.emoji_icons[emoji_name]
-            # Resize emoji
-            emoji_resized = cv2.resize(emoji, (size, size))
-            
-            # Get region of interest with bounds checking
-            y1 = max(0, y - size//2)
-            y2 = min(frame.shape[0], y + size//2)
-            x1 = max(0, x - size//2)
-            x2 = min(frame.shape[1], x + size//2)
-            
-            # Skip if completely out of bounds
-            if y2 <= y1 or x2 <= x1:
-                return False
-            
-            # Adjust emoji crop if partially out of bounds
-            emoji_y1 = max(0, size//2 - y)
-            emoji_y2 = emoji_y1 + (y2 - y1)
-            emoji_x1 = max(0, size//2 - x)
-            emoji_x2 = emoji_x1 + (x2 - x1)
-            
-            try:
-                # Handle transparency if available
-                if emoji_resized.shape[2] == 4:
-                    # Extract alpha channel
-                    emoji_crop = emoji_resized[emoji_y1:emoji_y2, emoji_x1:emoji_x2]
-                    alpha = emoji_crop[:, :, 3] / 255.0
-                    for c in range(3):
-                        frame[y1:y2, x1:x2, c] = (1 - alpha) * frame[y1:y2, x1:x2, c] + alpha * emoji_crop[:, :, c]
-                else:
-                    # No transparency, just overlay
-                    frame[y1:y2, x1:x2] = emoji_resized[emoji_y1:emoji_y2, emoji_x1:emoji_x2, :3]
-                
-                return True
-            except:
-                return False
-        return False
-    
-    def _create_fallback_bg(self, name):
-        """Create fallback backgrounds if images not found"""
-        if name == "maple":
-            return self.create_maple_leaf_bg()
-        elif name == "flag":
-            return self.create_canada_flag_bg()
-        elif name == "toronto":
-            return self.create_toronto_bg()
-        elif name == "niagara":
-            return self.create_niagara_bg()
-        elif name == "campfire":
-            return self.create_campfire_bg()
-        elif name == "mountains":
-            return self.create_mountains_bg()
-        else:
-            # Default background
-            bg = np.ones((480, 640, 3), dtype=np.uint8) * 255
-            bg[:, :] = [200, 150, 100]
-            return bg
-    
-    def create_maple_leaf_bg(self):
-        """Create maple leaf pattern background"""
-        bg = np.ones((480, 640, 3), dtype=np.uint8) * 255
-        # Red background
-        bg[:, :] = [0, 0, 255]
-        # Add maple leaf text pattern
-        font = cv2.FONT_HERSHEY_SIMPLEX
-        for y in range(0, 480, 80):
-            for x in range(0, 640, 100):
-                cv2.putText(bg, "MAPLE", (x, y), font, 1, (255, 255, 255), 2)
-        return bg
+    def select_model(self, name, role='live'):
+        """Switch the live or the photo segmentation model without restarting"""
+        self.requested_models[role] = name
+        if role == 'photo' and (name is None or name == self.current_model):
+            # Photos reuse the live mask
+            self.photo_model = name
+            self.photo_engine = None
+            self.status_label.setText("Photo model: same as preview")
+            return
+        if role == 'live' and name == self.current_model:
+            return
+        spec = MODEL_REGISTRY[name]
+        if not model_file(spec.file).exists():
+            reply = QMessageBox.question(
+                self,
+                "🍁 Download Model",
+                f"The {spec.label} model ({spec.license}) has to be downloaded first.\n\nDownload now?",
+                QMessageBox.Yes | QMessageBox.No,
+                QMessageBox.Yes
+            )
+            if reply == QMessageBox.No:
+                self.reset_model_combos()
+                return
+            self.start_model_download(name, lambda: self.load_model(name, role))
+            return
+        self.load_model(name, role)
     
-    def create_canada_flag_bg(self):
-        """Create Canada flag background"""
-        bg = np.ones((480, 640, 3), dtype=np.uint8) * 255
-        # Red bars on sides
-        bg[:, :160] = [0, 0, 255]
-        bg[:, 480:] = [0, 0, 255]
-        # Add maple leaf text in center
-        font = cv2.FONT_HERSHEY_SIMPLEX
-        cv2.putText(bg, "CANADA", (240, 240), font, 2, (0, 0, 255), 3)
-        return bg
+    def load_model(self, name, role):
+        """Create the model session on a background thread; the preview keeps running meanwhile"""
+        self.status_label.setText(f"Loading {MODEL_REGISTRY[name].label} model...")
+        loader = SessionLoadWorker(name, role)
+        loader.loaded.connect(self.on_model_loaded)
+        loader.failed.connect(self.on_model_failed)
+        loader.finished.connect(lambda: self.model_loaders.remove(loader))
+        self.model_loaders.append(loader)
+        loader.start()
     
-    def create_toronto_bg(self):
-        """Create Toronto skyline background"""
-        bg = np.ones((480, 640, 3), dtype=np.uint8) * 255
-        # Sky gradient
-        for i in range(300):
-            bg[i, :] = [255 - i//2, 150 - i//3, 100]
-        # Simple skyline
-        bg[300:, :] = [50, 50, 50]
-        # CN Tower
-        bg[100:300, 310:330] = [100, 100, 100]
-        return bg
+    def on_model_loaded(self, name, role, session):
+        """Swap a freshly loaded session in, unless another model was picked meanwhile"""
+        if self.requested_models[role] != name:
+            return
+        spec = MODEL_REGISTRY[name]
+        if role == 'photo':
+            self.photo_model = name
+            self.photo_engine = SegmentationEngine(session, model=spec)
+            self.status_label.setText(f"Photo model: {spec.label}")
+            return
+        self.current_model = name
+        if self.bg_worker:
+            self.rembg_session = session
+            self.bg_worker.set_session(session, model=spec)
+            # Re-apply the quality level's input scale to the new engine
+            self.apply_quality_settings()
+        else:
+            self._setup_background_removal(session)
+        if self.photo_model == name:
+            self.photo_engine = None  # Same model, the live mask is as good
+        self.status_label.setText(f"Preview model: {spec.label}")
+        logger.info(f"Switched the live segmentation model to {name}")
     
-    def create_niagara_bg(self):
-        """Create Niagara Falls background"""
-        bg = np.ones((480, 640, 3), dtype=np.uint8) * 255
-        # Blue water effect
-        for i in range(480):
-            bg[i, :] = [200 - i//4, 100 + i//4, 50]
-        return bg
+    def on_model_failed(self, name, role, message):
+        if self.requested_models[role] != name:
+            return
+        if not self.bg_worker:
+            # Initial load at startup: leave background removal disabled, as before
+            self.bg_combo.setToolTip("AI model required for background removal")
+            self.status_label.setText("Background removal unavailable - see log")
+            return
+        QMessageBox.warning(self, "Model Error", f"❌ Cannot load the {MODEL_REGISTRY[name].label} model:\n\n{message}")
+        self.reset_model_combos()
     
-    def create_campfire_bg(self):
-        """Create camping/firepit background"""
-        bg = np.zeros((480, 640, 3), dtype=np.uint8)
-        # Dark forest
-        bg[:300, :] = [20, 40, 20]
-        # Fire glow
-        cv2.circle(bg, (320, 350), 100, (0, 100, 255), -1)
-        cv2.circle(bg, (320, 350), 80, (0, 150, 255), -1)
-        return bg
+    def reset_model_combos(self):
+        """Show the models actually in use again, e.g. after a cancelled switch"""
+        self.requested_models = {'live': self.current_model, 'photo': self.photo_model}
+        for combo, name in ((self.live_model_combo, self.requested_models['live']),
+                            (self.photo_model_combo, self.requested_models['photo'])):
+            combo.blockSignals(True)
+            combo.setCurrentIndex(max(0, combo.findData(name)))
+            combo.blockSignals(False)
     
-    def create_mountains_bg(self):
-        """Create mountain background"""
-        bg = np.ones((480, 640, 3), dtype=np.uint8) * 255
-        # Sky
-        bg[:300, :] = [200, 150, 100]
-        # Mountains
-        points = np.array([[0, 300], [200, 150], [400, 200], [640, 300], [640, 480], [0, 480]])
-        cv2.fillPoly(bg, [points], (100, 100, 100))
-        return bg
+    def overlay_emoji(self, frame, emoji_name, x, y, size=40):
+        """Overlay an emoji icon on the frame"""
+        return self.effects.overlay_emoji(frame, emoji_name, x, y, size)
     
-    def setup_camera(self):
-        """Initialize camera"""
-        try:
-            if self.cap:
-                self.cap.release()
-            
-            # Platform-specific camera initialization
-            import platform
-            if platform.system() == "Windows":
-                # Windows: Use DirectShow backend for better compatibility
-                self.cap = cv2.VideoCapture(self.current_camera, cv2.CAP_DSHOW)
-                # Set buffer size to reduce latency on Windows
-                self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
-            else:
-                # macOS/Linux: Use default backend
-                self.cap = cv2.VideoCapture(self.current_camera)
-                
-            if not self.cap.isOpened():
-                self.show_error("Sorry buddy, couldn't access camera!\n\nIf this is your first time running the app, please:\n1. Grant camera permission when prompted\n2. Restart the app after granting permission\n\nThe app needs to restart to access the camera, eh!")
-        except Exception as e:
-            self.show_error(f"Camera error, eh: {str(e)}")
+    def show_camera_error(self):
+        """Explain how to grant camera access"""
+        self.show_error("Sorry buddy, couldn't access camera!\n\nIf this is your first time running the app, please:\n1. Grant camera permission when prompted\n2. Restart the app after granting permission\n\nThe app needs to restart to access the camera, eh!")
     
     def change_combo_index(self, combo, direction):
         """Change combo box index by direction (-1 for up, 1 for down)"""
@@ -1512,8 +4573,16 @@ class CanadaSelfieApp(QMainWindow):
     
     def start_camera(self):
         """Start the camera feed"""
+        if self.camera_discovery is not None:
+            # Start as soon as discovery hands over the camera
+            self.start_when_discovered = True
+            self.status_label.setText("Looking for cameras, eh...")
+            return
         if self.cap and self.cap.isOpened():
-            self.timer.start(30)  # 30ms = ~33 FPS
+            # Camera reads happen on the capture thread; the timer only picks up
+            # the newest frame, so it can poll faster than the camera delivers
+            self.start_capture_worker()
+            self.timer.start(10)
             self.is_recording = True
             self.start_btn.setEnabled(False)
             self.stop_btn.setEnabled(True)
@@ -1530,6 +4599,7 @@ class CanadaSelfieApp(QMainWindow):
     def stop_camera(self):
         """Stop the camera feed"""
         self.timer.stop()
+        self.stop_capture_worker()
         self.is_recording = False
         self.start_btn.setEnabled(True)
         self.stop_btn.setEnabled(False)
@@ -1537,142 +4607,238 @@ class CanadaSelfieApp(QMainWindow):
         self.effect_combo.setEnabled(False)
         self.red_filter_btn.setEnabled(False)
         self.hockey_filter_btn.setEnabled(False)
-        self.video_label.setText("🍁 Camera stopped - Click Start! 🍁")
+        self.video_display.setText("🍁 Camera stopped - Click Start! 🍁")
         self.status_label.setText("Camera stopped!")
     
+    def start_capture_worker(self):
+        """Start reading frames from the current camera on a background thread"""
+        if self.camera_mode_worker is not None:
+            return  # Started when the camera mode is set
+        self.stop_capture_worker()
+        self.capture_worker = CameraCaptureWorker(self.cap)
+        self.last_frame_seq = 0
+        self.capture_worker.start()
+    
+    def stop_capture_worker(self):
+        """Stop the capture thread before the camera is released or reopened"""
+        if self.capture_worker:
+            self.capture_worker.stop()
+            self.capture_worker = None
+    
+    def get_latest_frame(self):
+        """Return the newest captured frame, or None if nothing new arrived"""
+        if not self.capture_worker:
+            return None
+        seq, timestamp, frame = self.capture_worker.latest()
+        if frame is None or seq == self.last_frame_seq:
+            return None
+        if self.last_frame_seq:
+            # Frames overwritten on the capture thread before the GUI picked them up
+            self.perf_stats.increment('dropped_frames', max(0, seq - self.last_frame_seq - 1))
+        self.perf_stats.add_event('capture', seq - self.last_frame_seq, timestamp)
+        self.last_frame_seq = seq
+        self.last_capture_timestamp = timestamp
+        return frame
     
     def update_frame(self):
         """Update video frame"""
-        with sentry_sdk.start_transaction(op="video.frame_update", name="update_frame") as transaction:
+        with self.tracer.start_transaction(op="video.frame_update", name="update_frame") as transaction:
             try:
                 if self.cap and self.cap.isOpened():
-                    ret, frame = self.cap.read()
-                    if ret:
-                        # Flip frame horizontally for selfie effect
-                        frame = cv2.flip(frame, 1)
+                    frame = self.get_latest_frame()
+                    if frame is not None:
+                        self.frame_size = (frame.shape[1], frame.shape[0])
                         
                         # Increment frame counter for animations
                         self.frame_counter += 1
                         
-                        # Handle background removal with threading
-                        with transaction.start_child(op="video.background_removal"):
-                            if self.bg_removal_enabled and REMBG_AVAILABLE and self.current_bg is not None:
-                                # Skip frames to reduce load (process 1 frame per second at 30 FPS)
-                                self.frame_skip_counter += 1
-                                if self.frame_skip_counter >= 30:  # Process every 30th frame (1 per second)
-                                    self.frame_skip_counter = 0
-                                    # Send frame to worker if queue is not full
-                                    try:
-                                        self.bg_worker.enabled = True
-                                        self.bg_worker.input_queue.put_nowait((frame.copy(), self.current_bg))
-                                    except queue.Full:
-                                        pass
-                                
-                                # Use last processed frame if available
-                                if self.last_processed_frame is not None:
-                                    frame = self.last_processed_frame
-                            else:
-                                if self.bg_worker:
-                                    self.bg_worker.enabled = False
-                        
-                        # Apply current filter
-                        with transaction.start_child(op="video.apply_filter"):
-                            if self.current_filter == "red":
-                                frame = self.apply_red_filter_to_frame(frame)
-                            elif self.current_filter == "hockey":
-                                frame = self.apply_hockey_effect_to_frame(frame)
-                        
-                        # Apply current effect overlay
-                        with transaction.start_child(op="video.apply_effect"):
-                            if self.current_effect:
-                                frame = self.apply_effect_overlay(frame)
-                        
-                        # Update fireworks (easter egg)
-                        frame = self.update_fireworks(frame)
+                        frame = self.pipeline.run(frame, 'preview', span=transaction)
                         
-                        # Convert to Qt format and display
+                        # Hand the BGR buffer to the display; scaling happens at paint time
+                        display_start = time.perf_counter()
                         with transaction.start_child(op="video.convert_display"):
-                            rgb_image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                            h, w, ch = rgb_image.shape
-                            bytes_per_line = ch * w
-                            qt_image = QImage(rgb_image.data, w, h, bytes_per_line, QImage.Format_RGB888)
-                            
-                            # Scale image to fit the label
-                            pixmap = QPixmap.fromImage(qt_image)
-                            scaled_pixmap = pixmap.scaled(self.video_label.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                            self.video_label.setPixmap(scaled_pixmap)
+                            self.video_display.set_frame(frame)
+                        
+                        self.record_frame_stats(display_start)
+                        self.update_quality()
             except Exception as e:
                 sentry_sdk.capture_exception(e)
                 logger.error(f"Error in update_frame: {e}")
                 self.status_label.setText(f"Frame error: {str(e)}")
     
+    def mark_startup(self, milestone):
+        """Record a startup milestone and save the startup report next to the logs"""
+        if milestone in STARTUP.milestones:
+            return
+        STARTUP.mark(milestone)
+        if milestone == 'first_frame':
+            elapsed = STARTUP.milestones[milestone]
+            if elapsed > STARTUP.TARGET_FIRST_FRAME_MS:
+                logger.warning(f"First preview frame after {elapsed:.0f} ms "
+                               f"(target {STARTUP.TARGET_FIRST_FRAME_MS} ms)")
+        if 'first_frame' in STARTUP.milestones and 'segmentation_ready' in STARTUP.milestones:
+            logger.info(STARTUP.format())
+        try:
+            STARTUP.save(os.path.join(app_data_dir(), 'startup_report.json'))
+        except OSError as e:
+            logger.error(f"Could not save the startup report: {e}")
+    
+    def record_frame_stats(self, display_start):
+        """Add the frame that was just shown to the local performance stats"""
+        if not self.first_frame_shown:
+            self.first_frame_shown = True
+            self.mark_startup('first_frame')
+        now = time.perf_counter()
+        timings = dict(self.pipeline.timings)
+        timings['display'] = (now - display_start) * 1000
+        self.perf_stats.record_timings(timings)
+        self.perf_stats.add_event('display', now=now)
+        if self.bg_worker:
+            self.perf_stats.set_gauge('seg_in_flight', self.bg_worker.pipeline.pending())
+        if self.capture_worker:
+            self.perf_stats.set_gauge('read_failures', self.capture_worker.read_failures)
+    
+    def update_quality(self):
+        """Feed the frame that was just shown to the quality governor"""
+        latency_ms = (time.perf_counter() - self.last_capture_timestamp) * 1000
+        inference_ms = None
+        if self.bg_worker and self.bg_worker.enabled:
+            inference_ms = self.bg_worker.engine.last_inference_ms
+        if self.governor.observe(self.pipeline.timings, latency_ms, inference_ms):
+            logger.info(f"Quality {self.governor.last_decision}")
+            self.apply_quality_settings()
+    
+    def apply_quality_settings(self):
+        """Push the governor's current quality level to the components it tunes"""
+        settings = self.governor.settings
+        self.segmentation_interval = settings['interval']
+        self.video_display.smooth = settings['smooth']
+        self.effects.set_particle_scale(settings['particles'])
+        # Fixed-shape models (e.g. u2netp at 320x320) cannot take a smaller input
+        self.governor.input_scaling = bool(self.bg_worker and self.bg_worker.engine.dynamic_input)
+        if self.governor.input_scaling:
+            base_w, base_h = self.bg_worker.engine.base_input_size
+            # Keep the model input a multiple of 32 for the u2net down-sampling stages
+            scale = settings['input_scale']
+            size = (max(32, int(base_w * scale) // 32 * 32), max(32, int(base_h * scale) // 32 * 32))
+            self.bg_worker.engine.set_input_size(size)
+    
+    def toggle_stats_overlay(self):
+        """Show or hide the performance HUD on the preview"""
+        self.show_stats = not self.show_stats
+        self.status_label.setText(f"Stats overlay {'on' if self.show_stats else 'off'}")
+    
+    def draw_stats_overlay(self, frame):
+        """Draw the performance HUD and the governor state in the top-left corner"""
+        font = cv2.FONT_HERSHEY_SIMPLEX
+        lines = self.governor.overlay_lines() + self.perf_stats.hud_lines()
+        for i, line in enumerate(lines):
+            y = 20 + i * 18
+            cv2.putText(frame, line, (10, y), font, 0.45, (0, 0, 0), 3)
+            cv2.putText(frame, line, (10, y), font, 0.45, (255, 255, 255), 1)
+        return frame
+    
+    def dump_performance_stats(self):
+        """Save the current performance stats to a JSON file next to the logs"""
+        filename = f"perf_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        path = os.path.join(app_data_dir(), filename)
+        try:
+            self.perf_stats.dump_json(path, extra={
+                'frame_size': list(self.frame_size),
+                'quality_level': self.governor.level,
+                'quality_settings': self.governor.effective_settings,
+                'effect': self.current_effect,
+                'filter': self.current_filter,
+                'background': self.current_bg_name,
+                'startup': STARTUP.summary(),
+            })
+            logger.info(f"Performance stats saved to {path}")
+            self.status_label.setText(f"Stats saved: {filename}")
+        except OSError as e:
+            logger.error(f"Could not save performance stats: {e}")
+            self.status_label.setText("Could not save stats!")
+    
     def capture_photo(self):
-        """Capture and save a photo"""
+        """Capture a photo; with a photo model the cut-out is computed on a worker thread first"""
+        if not self.capture_worker or self.photo_worker is not None:
+            return
+        frame = self.capture_worker.latest()[2]
+        if frame is None:
+            return
+        if (self.photo_engine is None or not self.bg_removal_enabled or not REMBG_AVAILABLE
+                or self.current_bg_name is None):
+            self.save_photo(frame)
+            return
+        # The preview segments mirrored frames; give the photo model the same orientation
+        segmentation_input = cv2.flip(frame, 1) if self.pipeline.mirror else frame
+        self.capture_btn.setEnabled(False)
+        self.status_label.setText(f"Cutting out with {MODEL_REGISTRY[self.photo_model].label}, eh...")
+        self.photo_worker = PhotoSegmentationWorker(self.photo_engine, frame, segmentation_input)
+        self.photo_worker.segmented.connect(self.on_photo_segmented)
+        self.photo_worker.failed.connect(self.on_photo_segmentation_failed)
+        self.photo_worker.start()
+    
+    @pyqtSlot(object, object)
+    def on_photo_segmented(self, frame, mask):
+        self.photo_worker = None
+        self.capture_btn.setEnabled(self.is_recording)
+        self.save_photo(frame, mask)
+    
+    @pyqtSlot(object, str)
+    def on_photo_segmentation_failed(self, frame, message):
+        """Save the photo with the live preview's mask instead"""
+        self.photo_worker = None
+        self.capture_btn.setEnabled(self.is_recording)
+        self.save_photo(frame)
+    
+    def save_photo(self, frame, mask=None):
+        """Run a captured frame through the capture pipeline and save it to the Desktop"""
         with sentry_sdk.start_transaction(op="photo.capture", name="capture_photo") as transaction:
             try:
-                if self.cap and self.cap.isOpened():
-                    ret, frame = self.cap.read()
-                    if ret:
-                        # Flip frame for selfie
-                        frame = cv2.flip(frame, 1)
-                        
-                        # For photo capture, use the last processed frame if available
-                        if self.bg_removal_enabled and REMBG_AVAILABLE and self.current_bg is not None:
-                            if self.last_processed_frame is not None:
-                                frame = self.last_processed_frame.copy()
-                        
-                        # Apply current filter
-                        if self.current_filter == "red":
-                            frame = self.apply_red_filter_to_frame(frame)
-                        elif self.current_filter == "hockey":
-                            frame = self.apply_hockey_effect_to_frame(frame)
-                        
-                        # Apply current effect overlay
-                        if self.current_effect:
-                            frame = self.apply_effect_overlay(frame)
-                        
-                        # Add "EH!" text overlay
-                        font = cv2.FONT_HERSHEY_SIMPLEX
-                        cv2.putText(frame, "EH!", (50, 100), font, 3, (255, 255, 255), 5)
-                        cv2.putText(frame, "EH!", (50, 100), font, 3, (0, 0, 255), 3)
-                        
-                        # Create filename with timestamp
-                        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                        filename = f"canada_selfie_{timestamp}.jpg"
-                        
-                        # Get Desktop path (cross-platform)
-                        if platform.system() == 'Windows':
-                            desktop_path = Path.home() / 'Desktop'
-                        elif platform.system() == 'Darwin':  # macOS
-                            desktop_path = Path.home() / 'Desktop'
-                        else:  # Linux
-                            desktop_path = Path.home() / 'Desktop'
-                            if not desktop_path.exists():
-                                # Some Linux systems use lowercase
-                                desktop_path = Path.home() / 'desktop'
-                                if not desktop_path.exists():
-                                    # Fallback to home directory
-                                    desktop_path = Path.home()
-                        
-                        # Create full path
-                        full_path = desktop_path / filename
-                        
-                        # Save the photo
-                        cv2.imwrite(str(full_path), frame)
-                        
-                        # Play Canadian sound if available
-                        self.play_snap_sound()
-                        
-                        # Show random Canadian meme
-                        meme = random.choice(self.canadian_memes)
-                        self.status_label.setText(f"Saved: {filename}")
-                        
-                        # Show success message
-                        QMessageBox.information(self, "Photo Saved, EH!", 
-                                              f"🍁 {meme} 🍁\n\nSaved to Desktop as: {filename}")
-                        
-                        # Add custom event to Sentry
-                        sentry_sdk.capture_message(f"Photo captured: {filename}", level="info")
+                # The photo model's mask is only used for this frame, never for the preview
+                self.capture_mask = mask
+                try:
+                    frame = self.pipeline.run(frame, 'capture', span=transaction)
+                finally:
+                    self.capture_mask = None
+                
+                # Create filename with timestamp
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                filename = f"canada_selfie_{timestamp}.jpg"
+                
+                # Get Desktop path (cross-platform)
+                if platform.system() == 'Windows':
+                    desktop_path = Path.home() / 'Desktop'
+                elif platform.system() == 'Darwin':  # macOS
+                    desktop_path = Path.home() / 'Desktop'
+                else:  # Linux
+                    desktop_path = Path.home() / 'Desktop'
+                    if not desktop_path.exists():
+                        # Some Linux systems use lowercase
+                        desktop_path = Path.home() / 'desktop'
+                        if not desktop_path.exists():
+                            # Fallback to home directory
+                            desktop_path = Path.home()
+                
+                # Create full path
+                full_path = desktop_path / filename
+                
+                # Save the photo
+                cv2.imwrite(str(full_path), frame)
+                
+                # Play Canadian sound if available
+                self.play_snap_sound()
+                
+                # Show random Canadian meme
+                meme = random.choice(self.canadian_memes)
+                self.status_label.setText(f"Saved: {filename}")
+                
+                # Show success message
+                QMessageBox.information(self, "Photo Saved, EH!", 
+                                        f"🍁 {meme} 🍁\n\nSaved to Desktop as: {filename}")
+                
+                # Add custom event to Sentry
+                sentry_sdk.capture_message(f"Photo captured: {filename}", level="info")
             except Exception as e:
                 sentry_sdk.capture_exception(e)
                 logger.error(f"Error capturing photo: {e}")
@@ -1742,273 +4908,80 @@ class CanadaSelfieApp(QMainWindow):
     
     def apply_effect_overlay(self, frame):
         """Apply the selected pattern overlay"""
-        h, w = frame.shape[:2]
-        font = cv2.FONT_HERSHEY_SIMPLEX
-        
-        if self.current_effect == "maple_rain":
-            # Falling maple leaves
-            for i in range(15):
-                x = np.random.randint(20, w-20)
-                y = int((self.frame_counter * 3 + i * 100) % (h + 100) - 50)
-                # Try emoji icon first, fallback to drawn shape
-                if not self.overlay_emoji(frame, "maple_leaf", x, y, 50):
-                    self.draw_maple_leaf(frame, x, y, 20, (0, 0, 255))
-                
-        elif self.current_effect == "snow_fall":
-            # Falling snowflakes
-            for i in range(25):
-                x = np.random.randint(0, w)
-                y = int((self.frame_counter * 2 + i * 80) % (h + 100) - 50)
-                # Try emoji icon first, fallback to drawn shape
-                if not self.overlay_emoji(frame, "snowflake", x, y, 35):
-                    # Draw snowflake with blue/grey color for visibility
-                    self.draw_snowflake(frame, x, y, 8, (200, 100, 0))
-                
-        elif self.current_effect == "hockey_sticks":
-            # Hockey sticks pattern
-            stick_positions = [(50, 100), (w-100, 100), (50, h-150), (w-100, h-150)]
-            for pos in stick_positions:
-                # Try emoji icon first, fallback to drawn shape
-                if not self.overlay_emoji(frame, "hockey", pos[0], pos[1], 80):
-                    self.draw_hockey_stick(frame, pos[0], pos[1], 40, (139, 69, 19))
-                
-        elif self.current_effect == "beaver_dam":
-            # Beaver icons in corners
-            corner_positions = [
-                (50, 50),           # Top left
-                (w-50, 50),         # Top right
-                (50, h-50),         # Bottom left
-                (w-50, h-50),       # Bottom right
-                (w//2, 100)         # Top center
-            ]
-            
-            for pos in corner_positions:
-                if not self.overlay_emoji(frame, "beaver", pos[0], pos[1], 60):
-                    # Fallback text if icon not loaded
-                    cv2.putText(frame, "BEAVER", (pos[0]-40, pos[1]), font, 0.8, (139, 69, 19), 2)
-            
-            # Dam logs at bottom
-            for i in range(0, w, 80):
-                cv2.rectangle(frame, (i, h-60), (i+70, h-40), (101, 67, 33), -1)
-                cv2.rectangle(frame, (i, h-60), (i+70, h-40), (61, 43, 31), 2)
-                # Wood texture lines
-                cv2.line(frame, (i+10, h-55), (i+60, h-55), (81, 53, 21), 1)
-                cv2.line(frame, (i+10, h-45), (i+60, h-45), (81, 53, 21), 1)
-            
-            # DAM text in the middle
-            cv2.putText(frame, "DAM GOOD!", (w//2-80, h-90), font, 1.5, (255, 255, 255), 3)
-            cv2.putText(frame, "DAM GOOD!", (w//2-80, h-90), font, 1.5, (139, 69, 19), 2)
-                
-        elif self.current_effect == "flag_frame":
-            # Canadian flags in corners
-            corner_positions = [
-                (50, 50),           # Top left
-                (w-50, 50),         # Top right
-                (50, h-50),         # Bottom left
-                (w-50, h-50),       # Bottom right
-            ]
-            
-            for pos in corner_positions:
-                if not self.overlay_emoji(frame, "flag", pos[0], pos[1], 70):
-                    # Fallback - draw maple leaf
-                    self.overlay_emoji(frame, "maple_leaf", pos[0], pos[1], 50)
-            
-            # Add "TRUE NORTH" text
-            cv2.putText(frame, "TRUE NORTH", (w//2-80, 50), font, 1, (255, 255, 255), 3)
-            cv2.putText(frame, "TRUE NORTH", (w//2-80, 50), font, 1, (255, 0, 0), 2)
-            
-        elif self.current_effect == "tim_hortons":
-            # Coffee cups and text
-            cup_positions = [(100, 100), (w-150, 100), (w//2-25, h-100)]
-            for pos in cup_positions:
-                # Try emoji icon first, fallback to drawn shape
-                if not self.overlay_emoji(frame, "coffee", pos[0], pos[1], 60):
-                    self.draw_coffee_cup(frame, pos[0], pos[1], 30, (139, 69, 19))
-            cv2.putText(frame, "Timmies Time!", (w//2-100, 50), font, 1, (255, 0, 0), 2)
-            cv2.putText(frame, "Double Double", (w//2-100, h-50), font, 0.8, (139, 69, 19), 2)
-            
-        elif self.current_effect == "moose_trail":
-            # Moose icons in different positions
-            moose_positions = [
-                (100, 100),
-                (w-100, 100),
-                (w//2, 200),
-                (150, h-100),
-                (w-150, h-100),
-            ]
-            
-            for i, pos in enumerate(moose_positions):
-                # Rotate moose slightly for variety
-                if not self.overlay_emoji(frame, "moose", pos[0], pos[1], 70):
-                    # Fallback - draw text
-                    cv2.putText(frame, "MOOSE", (pos[0]-30, pos[1]), font, 0.8, (101, 67, 33), 2)
-            
-            # Add "EH!" text
-            cv2.putText(frame, "MOOSE CROSSING EH!", (w//2-120, h-50), font, 1, (255, 255, 255), 3)
-            cv2.putText(frame, "MOOSE CROSSING EH!", (w//2-120, h-50), font, 1, (101, 67, 33), 2)
-                
-        elif self.current_effect == "northern_stars":
-            # Northern lights effect
-            # Stars
-            for i in range(15):
-                x = np.random.randint(0, w)
-                y = np.random.randint(0, h//3)
-                # Try emoji icon first, fallback to drawn shape
-                if not self.overlay_emoji(frame, "star", x, y, 25):
-                    self.draw_star(frame, x, y, 5, (255, 255, 200))
-            # Aurora colors overlay
-            overlay = frame.copy()
-            cv2.ellipse(overlay, (w//2, -50), (w, 200), 0, 0, 180, (0, 255, 100), -1)
-            cv2.ellipse(overlay, (w//2, -30), (int(w*0.8), 150), 0, 0, 180, (0, 200, 255), -1)
-            cv2.addWeighted(overlay, 0.15, frame, 0.85, 0, frame)
-            
-        elif self.current_effect == "smiley_rain":
-            # Falling smiley faces
-            for i in range(20):
-                x = np.random.randint(20, w-20)
-                y = int((self.frame_counter * 3.5 + i * 90) % (h + 100) - 50)
-                # Try emoji icon first, fallback to drawn smiley
-                if not self.overlay_emoji(frame, "smiley", x, y, 40):
-                    self.draw_smiley(frame, x, y, 20, (0, 255, 255))
-        
-        # Special easter egg effects
-        if self.easter_egg_active:
-            # Add MOUNTIE hat effect
-            cv2.putText(frame, "MOUNTIE MODE", (10, 30), font, 0.7, (255, 255, 255), 3)
-            cv2.putText(frame, "MOUNTIE MODE", (10, 30), font, 0.7, (255, 0, 0), 2)
-            
-            # Add Canadian flag corners
-            for corner in [(10, 10), (w-60, 10), (10, h-30), (w-60, h-30)]:
-                cv2.rectangle(frame, corner, (corner[0]+50, corner[1]+20), (255, 0, 0), -1)
-                cv2.rectangle(frame, (corner[0]+17, corner[1]), (corner[0]+33, corner[1]+20), (255, 255, 255), -1)
-                # Add maple leaf using overlay_emoji or draw it
-                if not self.overlay_emoji(frame, "maple_leaf", corner[0]+25, corner[1]+10, 20):
-                    self.draw_maple_leaf(frame, corner[0]+25, corner[1]+10, 8, (255, 0, 0))
-            
-        return frame
+        return self.effects.apply_effect_overlay(frame)
     
-    def draw_maple_leaf(self, frame, x, y, size, color):
-        """Draw a simple maple leaf shape"""
-        # Simplified maple leaf using lines
-        # Stem
-        cv2.line(frame, (x, y+size), (x, y+size//2), color, 2)
-        # Main body
-        points = np.array([
-            [x, y-size//2],
-            [x-size//2, y-size//4],
-            [x-size, y],
-            [x-size//2, y],
-            [x-size//3, y+size//3],
-            [x, y+size//2],
-            [x+size//3, y+size//3],
-            [x+size//2, y],
-            [x+size, y],
-            [x+size//2, y-size//4],
-            [x, y-size//2]
-        ], np.int32)
-        cv2.fillPoly(frame, [points], color)
+    def create_pipeline(self):
+        """Build the frame pipeline shared by preview and photo capture"""
+        def background_active():
+            return self.bg_removal_enabled and REMBG_AVAILABLE and self.current_bg_name is not None
         
-    def draw_snowflake(self, frame, x, y, size, color):
-        """Draw a snowflake shape"""
-        # Six-pointed snowflake
-        for angle in range(0, 360, 60):
-            x2 = int(x + size * np.cos(np.radians(angle)))
-            y2 = int(y + size * np.sin(np.radians(angle)))
-            cv2.line(frame, (x, y), (x2, y2), color, 2)
-            # Small branches
-            x3 = int(x + size*0.6 * np.cos(np.radians(angle-20)))
-            y3 = int(y + size*0.6 * np.sin(np.radians(angle-20)))
-            cv2.line(frame, (x2, y2), (x3, y3), color, 1)
-            x4 = int(x + size*0.6 * np.cos(np.radians(angle+20)))
-            y4 = int(y + size*0.6 * np.sin(np.radians(angle+20)))
-            cv2.line(frame, (x2, y2), (x4, y4), color, 1)
+        return FramePipeline([
+            FrameStage("segmentation", self.submit_segmentation, modes={'preview'}),
+            FrameStage("background", self.apply_background_to_frame, background_active,
+                       op="video.background_removal"),
+            FrameStage("filter", self.apply_current_filter, lambda: self.current_filter is not None,
+                       op="video.apply_filter"),
+            FrameStage("effect", self.apply_effect_overlay, lambda: self.current_effect is not None,
+                       op="video.apply_effect"),
+            FrameStage("fireworks", self.update_fireworks, lambda: self.fireworks_active,
+                       modes={'preview'}),
+            FrameStage("caption", self.effects.add_caption, modes={'capture'}),
+            FrameStage("stats", self.draw_stats_overlay, lambda: self.show_stats,
+                       modes={'preview'}),
+        ])
     
-    def draw_hockey_stick(self, frame, x, y, size, color):
-        """Draw a hockey stick shape"""
-        # Stick shaft
-        cv2.rectangle(frame, (x, y), (x+8, y+size), color, -1)
-        # Blade
-        blade_points = np.array([
-            [x, y+size],
-            [x+8, y+size],
-            [x+20, y+size+15],
-            [x+15, y+size+20],
-            [x-5, y+size+10],
-            [x, y+size]
-        ], np.int32)
-        cv2.fillPoly(frame, [blade_points], color)
-        # Tape on blade
-        cv2.line(frame, (x+2, y+size+5), (x+15, y+size+15), (255, 255, 255), 2)
-        
-    def draw_coffee_cup(self, frame, x, y, size, color):
-        """Draw a coffee cup shape"""
-        # Cup body
-        cv2.rectangle(frame, (x-size//2, y), (x+size//2, y+size), color, -1)
-        cv2.rectangle(frame, (x-size//2, y), (x+size//2, y+size), (0, 0, 0), 2)
-        # Handle
-        cv2.ellipse(frame, (x+size//2, y+size//2), (size//3, size//3), 0, -90, 90, color, 3)
-        # Steam lines
-        for i in range(3):
-            x_steam = x - size//4 + i*size//4
-            cv2.line(frame, (x_steam, y-5), (x_steam, y-15), (200, 200, 200), 2)
-        # "TH" text on cup
-        cv2.putText(frame, "TH", (x-10, y+size//2), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 255), 1)
+    def submit_segmentation(self, frame):
+        """Hand every Nth frame to the background removal worker"""
+        if not self.bg_worker:
+            return frame
+        if self.bg_removal_enabled and REMBG_AVAILABLE and self.current_bg_name is not None:
+            # Segment every Nth frame; the pipeline applies its drop policy while full
+            self.frame_skip_counter += 1
+            if self.frame_skip_counter >= self.segmentation_interval:
+                self.frame_skip_counter = 0
+                self.bg_worker.enabled = True
+                dropped = self.bg_worker.pipeline.frames_dropped
+                # The pipeline frame buffer is reused next tick, the worker needs its own copy
+                self.bg_worker.submit(frame.copy())
+                self.perf_stats.increment('seg_dropped', self.bg_worker.pipeline.frames_dropped - dropped)
+        else:
+            self.bg_worker.enabled = False
+        return frame
     
-    def draw_star(self, frame, x, y, size, color):
-        """Draw a star shape"""
-        # Five-pointed star
-        angle = -np.pi/2
-        points = []
-        for i in range(10):
-            if i % 2 == 0:
-                r = size
-            else:
-                r = size // 2
-            px = int(x + r * np.cos(angle))
-            py = int(y + r * np.sin(angle))
-            points.append([px, py])
-            angle += np.pi / 5
-        points = np.array(points, np.int32)
-        cv2.fillPoly(frame, [points], color)
+    def apply_current_filter(self, frame):
+        """Apply the selected colour filter"""
+        if self.current_filter == "red":
+            return self.apply_red_filter_to_frame(frame)
+        elif self.current_filter == "hockey":
+            return self.apply_hockey_effect_to_frame(frame)
+        return frame
     
-    def draw_smiley(self, frame, x, y, size, color):
-        """Draw a simple smiley face"""
-        # Face circle
-        cv2.circle(frame, (x, y), size, color, -1)
-        cv2.circle(frame, (x, y), size, (0, 0, 0), 2)
+    def apply_background_to_frame(self, frame):
+        """Blend the frame with the current background using the cached mask"""
+        mask = self.capture_mask if self.capture_mask is not None else self.last_mask
+        if mask is None or self.current_bg_name is None:
+            return frame
         
-        # Eyes
-        eye_offset = size // 3
-        eye_size = size // 8
-        cv2.circle(frame, (x - eye_offset, y - eye_offset), eye_size, (0, 0, 0), -1)
-        cv2.circle(frame, (x + eye_offset, y - eye_offset), eye_size, (0, 0, 0), -1)
+        h, w = frame.shape[:2]
+        if mask.shape[:2] != (h, w):
+            # Camera resolution changed since the mask was computed
+            mask = cv2.resize(mask, (w, h), interpolation=cv2.INTER_LINEAR)
         
-        # Smile
-        start_angle = 0
-        end_angle = 180
-        axes = (size // 2, size // 2)
-        cv2.ellipse(frame, (x, y + eye_offset), axes, 0, start_angle, end_angle, (0, 0, 0), 2)
+        # Background already resized for this resolution
+        bg_resized = self.background_cache.get(self.current_bg_name, (w, h))
+        if bg_resized is None:
+            return frame
+        
+        # Blend in place - the frame is a fresh copy owned by this tick
+        return self.compositor.composite(frame, mask, bg_resized, out=frame)
     
     def apply_red_filter_to_frame(self, frame):
         """Apply red color filter to frame"""
-        # Increase red channel, decrease others
-        frame[:,:,0] = np.clip(frame[:,:,0] * 0.3, 0, 255)  # Blue
-        frame[:,:,1] = np.clip(frame[:,:,1] * 0.3, 0, 255)  # Green
-        frame[:,:,2] = np.clip(frame[:,:,2] * 1.5, 0, 255)  # Red
-        return frame
+        return self.color_filters["red"].apply(frame)
     
     def apply_hockey_effect_to_frame(self, frame):
         """Apply hockey-themed effect"""
-        # Add blue tint and increase contrast
-        frame[:,:,0] = np.clip(frame[:,:,0] * 1.3, 0, 255)  # Blue
-        frame[:,:,1] = np.clip(frame[:,:,1] * 0.8, 0, 255)  # Green
-        frame[:,:,2] = np.clip(frame[:,:,2] * 0.8, 0, 255)  # Red
-        
-        # Add some "ice" effect by increasing brightness in certain areas
-        mask = np.random.random(frame.shape[:2]) > 0.95
-        frame[mask] = np.clip(frame[mask] * 1.5, 0, 255)
-        
-        return frame
+        return self.color_filters["hockey"].apply(frame)
     
     def add_maple_leaf_overlay(self, frame):
         """Add maple leaf overlay to frame - improved version"""
@@ -2025,7 +4998,7 @@ class CanadaSelfieApp(QMainWindow):
             # Use overlay_emoji instead of putText for emojis
             if not self.overlay_emoji(frame, "maple_leaf", pos[0], pos[1], 50):
                 # Fallback - draw maple leaf shape
-                self.draw_maple_leaf(frame, pos[0], pos[1], 25, (255, 0, 0))
+                self.effects.draw_maple_leaf(frame, pos[0], pos[1], 25, (255, 0, 0))
         
         # Add Canadian phrases
         phrases = ["TRUE NORTH", "STRONG & FREE", "EH!", "CANADA"]
@@ -2050,9 +5023,9 @@ class CanadaSelfieApp(QMainWindow):
         }
         
         if index == 0:
-            self.current_bg = None
+            self.current_bg_name = None
             self.bg_removal_enabled = False
-            self.last_processed_frame = None
+            self.last_mask = None
             self.status_label.setText("Background: None")
         elif index in bg_map:
             # Check if we need to download the model first
@@ -2064,7 +5037,9 @@ class CanadaSelfieApp(QMainWindow):
                     self.bg_combo.setCurrentIndex(0)
                     return
             
-            self.current_bg = self.backgrounds[bg_map[index]]
+            self.current_bg_name = bg_map[index]
+            # Resize for the current camera resolution now, not on the next frame
+            self.background_cache.get(self.current_bg_name, self.frame_size)
             self.bg_removal_enabled = True
             bg_names = {
                 "maple": "Maple Forest",
@@ -2097,6 +5072,7 @@ class CanadaSelfieApp(QMainWindow):
     def activate_easter_egg(self):
         """Activate secret Canadian easter egg"""
         self.easter_egg_active = True
+        self.effects.easter_egg_active = True
         self.secret_sequence = []  # Reset sequence
         
         # Start MASSIVE fireworks show!
@@ -2129,57 +5105,53 @@ class CanadaSelfieApp(QMainWindow):
         self.status_label.setText("🍁 MOUNTIE MODE ACTIVATED! True Canadian detected! 🇨🇦")
         print("🍁 Easter egg activated! Secret Canadian sequence found!")
     
-    def start_fireworks_show(self):
-        """Start an epic fireworks show"""
+    def start_fireworks_show(self, scale=1):
+        """Start an epic fireworks show (scale multiplies the number of rockets)"""
         self.fireworks_active = True
         self.fireworks_timer = 300  # 10 seconds at 30fps
-        self.fireworks = []
+        self.fireworks_scale = scale
+        self.fireworks.clear()
         
         # Create initial burst of fireworks
-        for _ in range(5):
-            self.add_random_firework()
+        self.add_random_firework(5 * scale)
     
-    def add_random_firework(self):
-        """Add a random firework to the show"""
-        if hasattr(self, 'video_label'):
+    def add_random_firework(self, count=1):
+        """Add random fireworks to the show"""
+        if hasattr(self, 'video_display') and count > 0:
             # Get video dimensions
-            w, h = 640, 480
+            w, h = self.frame_size
             
-            # Random position
-            x = random.randint(50, w - 50)
+            # Random positions
+            x = np.random.randint(50, w - 50, count)
             y = h - 50  # Start from bottom
             
             # Canadian colors!
-            colors = [
+            colors = np.array([
                 (0, 0, 255),    # Red
                 (255, 255, 255), # White  
                 (0, 0, 255),    # Red again for more red!
                 (255, 215, 0),  # Gold
                 (255, 255, 255), # White
                 (0, 255, 255),  # Yellow
-            ]
-            color = random.choice(colors)
+            ])
+            color = colors[np.random.randint(0, len(colors), count)]
             
-            firework = Firework(x, y, color)
-            self.fireworks.append(firework)
+            self.fireworks.launch(x, y, color, count)
     
     def update_fireworks(self, frame):
         """Update and draw fireworks"""
         if not self.fireworks_active:
             return frame
-            
-        h, w = frame.shape[:2]
         
         # Update existing fireworks
-        self.fireworks = [fw for fw in self.fireworks if fw.update()]
+        self.fireworks.update()
         
-        # Add new fireworks during the show
-        if self.fireworks_timer > 0 and random.random() < 0.3:  # 30% chance each frame
-            self.add_random_firework()
+        # Add new fireworks during the show, 30% chance each frame per unit of scale
+        if self.fireworks_timer > 0:
+            self.add_random_firework(np.random.binomial(self.fireworks_scale, 0.3))
         
         # Draw all fireworks
-        for firework in self.fireworks:
-            firework.draw(frame)
+        self.fireworks.draw(frame)
         
         # No text during fireworks - just the fireworks display
         
@@ -2191,7 +5163,12 @@ class CanadaSelfieApp(QMainWindow):
         return frame
     
     def keyPressEvent(self, event):
-        """Handle key press events for Konami code easter egg"""
+        """Handle key press events for Konami code easter egg and the performance HUD"""
+        if event.key() == Qt.Key_F3:
+            self.toggle_stats_overlay()
+        elif event.key() == Qt.Key_F4:
+            self.dump_performance_stats()
+        
         # Konami code easter egg
         self.konami_sequence.append(event.key())
         
@@ -2227,14 +5204,116 @@ class CanadaSelfieApp(QMainWindow):
         if hasattr(self, 'bg_worker') and self.bg_worker:
             self.bg_worker.stop()
         
+        self.timer.stop()
+        self.stop_capture_worker()
+        if self.photo_worker is not None:
+            self.photo_worker.segmented.disconnect()
+            self.photo_worker.failed.disconnect()
+            self.photo_worker.wait()
+        # Model loads and downloads stop at the next downloaded chunk; the .part is kept for resuming
+        for loader in list(self.model_loaders):
+            loader.loaded.disconnect()
+            loader.failed.disconnect()
+            loader.finished.disconnect()
+            loader.cancel()
+            loader.wait()
+        if self.download_worker is not None and self.download_worker.isRunning():
+            self.download_worker.progress.disconnect()
+            self.download_worker.finished.disconnect()
+            self.download_worker.cancel()
+            self.download_worker.wait()
+        # Discovery, camera opening and mode changes finish within their timeouts; release what they opened
+        if self.camera_discovery is not None:
+            self.camera_discovery.discovered.disconnect()
+        if self.camera_mode_worker is not None:
+            self.camera_mode_worker.configured.disconnect()
+            self.camera_mode_worker.failed.disconnect()
+        for opener in self.camera_openers:
+            opener.opened.disconnect()
+        for worker in [self.camera_discovery, self.camera_mode_worker] + list(self.camera_openers):
+            if worker is not None:
+                worker.wait()
+                if worker.cap is not None and worker.cap is not self.cap:
+                    worker.cap.release()
+        if self.standby_camera:
+            self.release_camera(*self.standby_camera[1:])
+            self.standby_camera = None
         if self.cap:
             self.cap.release()
-        self.timer.stop()
         if hasattr(self, 'mascot_timer'):
             self.mascot_timer.stop()
+        self.tracer.flush()
         event.accept()
 
-def main():
+def render_main(argv):
+    """Headless batch rendering: python canada_selfie_app.py render INPUT OUTPUT [options]"""
+    import argparse
+    parser = argparse.ArgumentParser(
+        prog="canada_selfie_app.py render",
+        description="Apply Canada Selfie effects to a video file or a folder of images without a display.")
+    parser.add_argument("input", help="video file, image file or folder of images")
+    parser.add_argument("output", help="output video file (.mp4, .avi, ...) or output folder for images")
+    parser.add_argument("--effect", choices=EFFECT_NAMES, help="overlay effect")
+    parser.add_argument("--filter", choices=sorted(create_color_filters()), help="colour filter")
+    parser.add_argument("--background", choices=list(BACKGROUND_FILES),
+                        help="replace the background (needs rembg and the segmentation model)")
+    parser.add_argument("--model", choices=list(MODEL_REGISTRY), default=DEFAULT_LIVE_MODEL,
+                        help=f"segmentation model for --background (default: {DEFAULT_LIVE_MODEL})")
+    parser.add_argument("--caption", action="store_true", help='add the "EH!" photo caption')
+    parser.add_argument("--mirror", action="store_true", help="flip frames horizontally like the preview")
+    parser.add_argument("--fps", type=float, help="output frame rate (default: same as input, or 30)")
+    parser.add_argument("--codec", default="mp4v", help="FOURCC for video output (default: mp4v)")
+    parser.add_argument("--queue-size", type=int,
+                        help="frames buffered between stages, or shared-memory slots with --workers "
+                             "(default: 8, or 2 per worker)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="render in N processes, 0 for one per CPU core (default: 1)")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="random seed of animated effects and sparkle; renders with the same seed "
+                             "match frame for frame, whatever --workers is (default: 0)")
+    args = parser.parse_args(argv)
+    
+    options = dict(effect=args.effect, color_filter=args.filter, background=args.background,
+                   caption=args.caption, mirror=args.mirror, seed=args.seed)
+    if args.workers != 1:
+        # Every worker process loads its own model
+        renderer = ParallelRenderer(workers=args.workers or None, model=args.model,
+                                    queue_size=args.queue_size, **options)
+        try:
+            count = renderer.render(args.input, args.output, fps=args.fps, codec=args.codec)
+        except Exception as e:
+            logger.error(f"Render failed: {e}")
+            print(f"[ERROR] {e}")
+            return 1
+        print(f"[OK] Rendered {count} frames to {args.output} with {renderer.workers} workers")
+        return 0
+
+    session = None
+    if args.background:
+        if not REMBG_AVAILABLE:
+            print("[ERROR] --background needs rembg and onnxruntime")
+            return 1
+        try:
+            session = SessionFactory().create(args.model)
+        except Exception as e:
+            print(f"[ERROR] Cannot load the {args.model} model: {e}")
+            return 1
+
+    renderer = OfflineRenderer(session=session, queue_size=max(1, args.queue_size or 8), model=args.model, **options)
+    try:
+        count = renderer.render(args.input, args.output, fps=args.fps, codec=args.codec)
+    except Exception as e:
+        logger.error(f"Render failed: {e}")
+        print(f"[ERROR] {e}")
+        return 1
+    print(f"[OK] Rendered {count} frames to {args.output}")
+    return 0
+
+def init_sentry(tracer):
+    """Set up Sentry error reporting; runs on a background thread once the window is up"""
+    with STARTUP.measure_import('sentry_sdk'):
+        from sentry_sdk.integrations.logging import LoggingIntegration
+    
     # Initialize Sentry with full configuration
     sentry_logging = LoggingIntegration(
         level=logging.INFO,        # Capture info and above as breadcrumbs
@@ -2248,10 +5327,11 @@ def main():
         ],
         # Add data like request headers and IP for users
         send_default_pii=True,
-        # Performance Monitoring (APM)
-        traces_sample_rate=1.0,  # Capture 100% of transactions for tracing
+        # Performance Monitoring (APM). Frame transactions are sampled by the
+        # tracer before they are created; the rest (e.g. photo capture) are rare
+        traces_sample_rate=1.0 if tracer.mode == 'sentry' else 0.0,
         # Profiling
-        profiles_sample_rate=1.0,  # Profile 100% of sampled transactions
+        profiles_sample_rate=0.1,  # Profile 10% of sampled transactions
         # Release tracking
         release="canada-selfie-app@1.0.0",
         # Environment
@@ -2275,6 +5355,22 @@ def main():
         "platform": platform.system(),
         "python_version": sys.version
     })
+    STARTUP.mark('sentry_ready')
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "render":
+        # Headless mode: no Qt application, camera or Sentry
+        sys.exit(render_main(sys.argv[2:]))
+    
+    # Per-frame tracing mode: "sentry:<fraction of frames>", "aggregate:<flush seconds>" or "off"
+    tracer = create_tracer(os.environ.get('CANADA_SELFIE_TRACING', 'sentry:0.01'))
+    logger.info(f"Frame tracing: {tracer.mode}")
+    # Segmentation pipeline: "<drop-oldest|drop-newest>:<frames in flight>"
+    segmentation = segmentation_options(os.environ.get('CANADA_SELFIE_SEGMENTATION', 'drop-oldest:1'))
+    # Capture mode to negotiate: "<width>x<height>[@<fps>][:<fourcc>]"
+    camera = camera_target(os.environ.get('CANADA_SELFIE_CAMERA', DEFAULT_CAMERA_TARGET))
+    # Keep the previous camera open for instant switching back: "on" or "off"
+    camera_standby = os.environ.get('CANADA_SELFIE_CAMERA_STANDBY', 'off').strip().lower() in ('1', 'on', 'true', 'yes')
     
     app = QApplication(sys.argv)
     
@@ -2284,8 +5380,14 @@ def main():
     app.setApplicationVersion("1.0")
     app.setOrganizationName("Canadian Software, Eh!")
     
-    window = CanadaSelfieApp()
+    STARTUP.mark('qapplication')
+    
+    window = CanadaSelfieApp(tracer, segmentation, camera, camera_standby)
     window.show()
+    STARTUP.mark('window_shown')
+    
+    # Sentry's import and setup stay off the path to the first preview frame
+    threading.Thread(target=init_sentry, args=(tracer,), name="sentry-init", daemon=True).start()
     
     sys.exit(app.exec_())
 
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+INT8 quantization of the segmentation model, with an accuracy/speed report
+
+Usage:
+    python quantize_model.py selfies/                 # static INT8 from a folder of selfies
+    python quantize_model.py selfie_clip.mp4 --mode dynamic
+    python quantize_model.py selfies/ --report-only   # compare an existing INT8 model again
+
+The quantized model is saved next to the FP32 one in U2NET_HOME as
+<model>.int8.onnx. Set "precision": "int8" in onnx_session.json to use it
+in the app. Needs the onnx package (pip install onnx).
+"""
+
+import argparse
+import multiprocessing
+import os
+import queue
+import random
+import sys
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+import canada_selfie_app as app
+
+
+def spread(count, limit):
+    """limit indices evenly spread over range(count)"""
+    return [int(i * count / limit) for i in range(limit)] if count > limit else list(range(count))
+
+
+def load_frames(source, limit):
+    """Up to limit BGR frames from a video, an image or a folder, evenly spread over the source.
+
+    Only the chosen frames are decoded and held in memory.
+    """
+    path = Path(source)
+    if path.is_dir():
+        images = sorted(p for p in path.iterdir() if p.suffix.lower() in app.IMAGE_EXTENSIONS)
+        frames = (cv2.imread(str(images[i])) for i in spread(len(images), limit))
+        return [frame for frame in frames if frame is not None]
+    if path.suffix.lower() in app.IMAGE_EXTENSIONS:
+        return [frame for _, frame in app.iter_input_frames(source)]
+
+    cap = cv2.VideoCapture(str(source))
+    if not cap.isOpened():
+        raise IOError(f"Cannot open video: {source}")
+    try:
+        count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        if count > 0:
+            # grab() skips a frame without decoding it
+            wanted = set(spread(count, limit))
+            frames = []
+            for index in range(count):
+                if not cap.grab():
+                    break
+                if index in wanted:
+                    ret, frame = cap.retrieve()
+                    if ret:
+                        frames.append(frame)
+            return frames
+        # No frame count (e.g. some streams): keep a fixed-size random sample while reading
+        rng = random.Random(0)
+        sample = []
+        index = 0
+        while cap.grab():
+            slot = len(sample) if len(sample) < limit else rng.randint(0, index)
+            if slot < limit:
+                ret, frame = cap.retrieve()
+                if ret:
+                    if slot < len(sample):
+                        sample[slot] = (index, frame)
+                    else:
+                        sample.append((index, frame))
+            index += 1
+        return [frame for _, frame in sorted(sample, key=lambda item: item[0])]
+    finally:
+        cap.release()
+
+
+class FrameCalibrationReader:
+    """Feeds calibration frames to the static quantizer, normalized exactly like the app does"""
+
+    def __init__(self, model_path, frames):
+        import onnxruntime as ort
+        self.engine = app.SegmentationEngine(ort.InferenceSession(str(model_path)))
+        self.frames = iter(frames)
+
+    def get_next(self):
+        frame = next(self.frames, None)
+        if frame is None:
+            return None
+        return {self.engine.input_name: self.engine.preprocess(frame).copy()}
+
+    def rewind(self):
+        pass
+
+
+def quantize(model_path, output_path, frames, mode):
+    from onnxruntime.quantization import (CalibrationMethod, QuantFormat, QuantType,
+                                          quantize_dynamic, quantize_static)
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    # Shape inference and graph cleanup make more of the graph quantizable
+    prepared = output_path.with_name(f"{model_path.stem}.prep.onnx")
+    try:
+        quant_pre_process(str(model_path), str(prepared), skip_symbolic_shape=True)
+        source = prepared
+    except Exception as e:
+        print(f"[WARN] Pre-processing skipped: {e}")
+        source = model_path
+    try:
+        if mode == 'dynamic':
+            quantize_dynamic(str(source), str(output_path), weight_type=QuantType.QUInt8)
+        else:
+            quantize_static(str(source), str(output_path), FrameCalibrationReader(source, frames),
+                            quant_format=QuantFormat.QDQ, per_channel=True,
+                            activation_type=QuantType.QUInt8, weight_type=QuantType.QInt8,
+                            calibrate_method=CalibrationMethod.MinMax)
+    finally:
+        if prepared.exists():
+            prepared.unlink()
+
+
+def rss_mb():
+    """Resident memory of this process in MB, or None when it cannot be measured"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 1024 / 1024
+    except ImportError:
+        pass
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def measure_model(model_path, frames, results):
+    """Runs in a fresh process so every model's memory is measured from the same baseline"""
+    import onnxruntime as ort
+    before = rss_mb()
+    session = ort.InferenceSession(str(model_path))
+    engine = app.SegmentationEngine(session)
+    engine.predict_mask(frames[0])  # Warm-up
+    times = []
+    masks = []
+    for frame in frames:
+        start = time.perf_counter()
+        masks.append(engine.predict_mask(frame))
+        times.append((time.perf_counter() - start) * 1000)
+    after = rss_mb()
+    results.put({
+        'p50_ms': float(np.percentile(times, 50)),
+        'p95_ms': float(np.percentile(times, 95)),
+        'memory_mb': after - before if before is not None and after is not None else None,
+        'masks': np.stack(masks) >= 128,
+    })
+
+
+def measure(model_path, frames):
+    ctx = multiprocessing.get_context('spawn')
+    results = ctx.Queue()
+    process = ctx.Process(target=measure_model, args=(model_path, frames, results))
+    process.start()
+    try:
+        while True:
+            try:
+                return results.get(timeout=1.0)
+            except queue.Empty:
+                if process.exitcode not in (None, 0):
+                    raise RuntimeError(f"Measuring {model_path.name} failed: "
+                                       f"worker exited with code {process.exitcode}")
+    finally:
+        process.join()
+
+
+def mask_iou(a, b):
+    union = np.count_nonzero(a | b)
+    return np.count_nonzero(a & b) / union if union else 1.0
+
+
+def report(fp32_path, int8_path, frames):
+    """Print latency, memory, file size and mask IoU of the INT8 model against FP32"""
+    fp32 = measure(fp32_path, frames)
+    int8 = measure(int8_path, frames)
+    ious = [mask_iou(a, b) for a, b in zip(fp32['masks'], int8['masks'])]
+
+    def memory(result):
+        return f"{result['memory_mb']:7.1f} MB" if result['memory_mb'] is not None else "    n/a   "
+
+    print(f"\n{len(frames)} frames, {frames[0].shape[1]}x{frames[0].shape[0]}")
+    print(f"  {'model':<8} {'file':>9} {'p50':>10} {'p95':>10} {'memory':>10}")
+    for name, path, result in (("FP32", fp32_path, fp32), ("INT8", int8_path, int8)):
+        size = path.stat().st_size / 1024 / 1024
+        print(f"  {name:<8} {size:6.1f} MB {result['p50_ms']:7.2f} ms {result['p95_ms']:7.2f} ms {memory(result)}")
+    print(f"  speedup x{fp32['p50_ms'] / int8['p50_ms']:.2f}   "
+          f"mask IoU mean {np.mean(ious):.3f}   min {np.min(ious):.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Quantize the segmentation model to INT8 and compare it with FP32.")
+    parser.add_argument("calibration", help="video, image or folder of selfie frames for calibration and the report")
+    parser.add_argument("--model", default="u2netp", help="model in U2NET_HOME to quantize (default: u2netp)")
+    parser.add_argument("--mode", choices=["static", "dynamic"], default="static",
+                        help="static uses the calibration frames for activation ranges (default: static)")
+    parser.add_argument("--frames", type=int, default=100, help="calibration frames to use (default: 100)")
+    parser.add_argument("--eval", help="separate frames for the report (default: the calibration frames)")
+    parser.add_argument("--report-only", action="store_true", help="only compare an existing INT8 model")
+    args = parser.parse_args()
+
+    fp32_path = app.models_dir() / f"{args.model}.onnx"
+    int8_path = app.models_dir() / f"{args.model}.int8.onnx"
+    if not fp32_path.exists():
+        print(f"[ERROR] {fp32_path} not found; run the app once to download the model")
+        sys.exit(1)
+    frames = load_frames(args.calibration, args.frames)
+    if not frames:
+        print(f"[ERROR] No frames found in {args.calibration}")
+        sys.exit(1)
+
+    if not args.report_only:
+        start = time.perf_counter()
+        quantize(fp32_path, int8_path, frames, args.mode)
+        print(f"[OK] {args.mode} INT8 model saved to {int8_path} in {time.perf_counter() - start:.1f}s")
+    elif not int8_path.exists():
+        print(f"[ERROR] {int8_path} not found")
+        sys.exit(1)
+
+    report(fp32_path, int8_path, load_frames(args.eval, args.frames) if args.eval else frames)
+
+
+if __name__ == "__main__":
+    main()